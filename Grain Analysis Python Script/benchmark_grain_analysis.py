@@ -0,0 +1,481 @@
+# Grain Analysis Benchmarks
+# This is used to time the grain analysis pipeline against the way it used to be done, on generated data so no private scans are needed.
+#
+# Run with "python benchmark_grain_analysis.py" from this folder. Every benchmark prints the seconds taken by each path and the peak memory
+# allocated while it ran (tracemalloc), so the numbers can be pasted next to each other when comparing machines.
+# BenchmarkPeakDetection() also prints how many minima per row each detection mode finds, to show how many of them are noise.
+#
+# BenchmarkPipelineStages() times every stage a scan goes through (load, split, the two Extract*() functions, the four Calculate*() functions)
+# and the whole pipeline end to end (RunGrainAnalysisPipelineOnImage(), its .npy cache is warm from the second run on), on generated scans from 256x256 up to 8192x8192.
+# Up to "largest_pixel_dimension_to_check" the same stages are also run with the pipeline exactly as grain_analysis_documented.py first ran it
+# (the Original*() functions below) and every stage is checked to give the same numbers, so a faster path can never quietly change the results.
+# An 8192x8192 scan takes minutes and a few GB of memory, pass --sizes to stop earlier.
+#
+# Save the stage timings with --save-baseline baseline.json, and later compare a new run against them with --compare baseline.json.
+# Every stage that got slower or used more memory by more than --tolerance (25% by default) is flagged and the run exits with status 1.
+# Timings only compare on the same machine, the baseline records which machine it was measured on.
+#
+# BenchmarkSyntheticSurfaces() times the diameter measurement on the grain surfaces of grain_synthetic_surfaces.py and compares what it measures
+# with their ground truth, so a change can be checked for speed and accuracy at once.
+#
+# BenchmarkProcessingDtypes() runs the same scans through the pipeline in float64 and in float32 (see processing_dtypes in grain_batch_driver.py)
+# and prints the time, the peak memory and how far every statistic of the results table moves, so the cost of single precision is written down.
+#
+# Run "python benchmark_grain_analysis.py --suite stages --sizes 256 1024 4096 --compare baseline.json" to check only the pipeline stages.
+#
+
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from scipy.signal import argrelextrema, find_peaks
+
+from grain_data_loader import LoadGwyddionExport, WriteGrainBinaryExport, WriteGwyddionExport
+from grain_segmentation import ExtractGrainPropertiesBySegmentation, CalculateAverageAndStandardDeviation_EquivalentGrainDiameter
+from grain_analysis_functions import (SmoothCrossSections, FindRelativeExtremaOfAllCrossSections, FindProminentExtremaOfAllCrossSections, default_noise_robust_detection_settings,
+                                      SplitDataMatrixIntoRows, ExtractDistancesBetweenRelativeMinima_GrainDiameter, ExtractHeightOfRelativeMaxima_GrainHeight,
+                                      CalculateAverageAndStandardDeviation_GrainDiameter, CalculateAverageAndStandardDeviation_GrainHeight,
+                                      CalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainDiameter, CalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainHeight)
+from grain_batch_driver import RunGrainAnalysisPipelineOnImage, results_table_columns
+from grain_intermediate_store import ExtractImageIntermediates, CalculateGrainStatisticsFromIntermediates
+from grain_synthetic_surfaces import CreateSyntheticGrainSurface
+
+
+# Every stage BenchmarkPipelineStages() times, in the order a scan goes through them. Each stage is timed on the output of the stages before it.
+pipeline_stages = ['load', 'split', 'extract_diameter', 'extract_height', 'calculate_diameter', 'calculate_max_min_diameter',
+                   'calculate_height', 'calculate_max_min_height', 'end_to_end']
+default_stage_pixel_dimensions = (256, 512, 1024, 2048, 4096, 8192)
+benchmark_suites = ['loaders', 'detection', 'segmentation', 'sub-pixel', 'synthetic', 'precision', 'stages']
+
+
+# Expected input: Any function and the arguments to call it with, pass "repeats" to take the best of several runs.
+# Expected Output: The function's return value, the fastest wall time in seconds and the peak memory in megabytes allocated during one call.
+def TimeAndTraceFunction(function, *arguments, repeats=3, **keyword_arguments):
+    fastest_time_in_seconds = float('inf')
+    for each_repeat in range(repeats):
+        start_time = time.perf_counter()
+        return_value = function(*arguments, **keyword_arguments)
+        fastest_time_in_seconds = min(fastest_time_in_seconds, time.perf_counter() - start_time)
+    tracemalloc.start()
+    function(*arguments, **keyword_arguments)
+    peak_memory_in_megabytes = tracemalloc.get_traced_memory()[1]/1024/1024
+    tracemalloc.stop()
+    return return_value, fastest_time_in_seconds, peak_memory_in_megabytes
+
+# Expected input: Path to write to and the pixel dimension of the square scan to fake.
+# Expected Output: None, writes a single line csv of (pixel_dimension_of_image-1) x pixel_dimension_of_image random z-values in nm,
+# the same layout the Pygwy script produces.
+def WriteRandomGwyddionExport(file_path, pixel_dimension_of_image=512, seed=0):
+    random_z_values = np.random.default_rng(seed).normal(0, 5, (pixel_dimension_of_image - 1)*pixel_dimension_of_image)
+    with open(file_path, 'w', newline='') as data_file:
+        data_writer = csv.writer(data_file, delimiter=',')
+        data_writer.writerow(random_z_values.tolist())
+
+# Expected input: Pixel dimension of the square scan to fake, the rough grain size in pixels and the standard deviation of the noise in nm.
+# Expected Output: (pixel_dimension_of_image-1) x pixel_dimension_of_image matrix of z-values in nm, a grid of smooth bumps with white noise on top.
+def CreateNoisyGrainSurface(pixel_dimension_of_image=512, grain_size_in_pixels=16, noise_in_nanometers=0.5, seed=0):
+    pixel_positions = np.arange(pixel_dimension_of_image)*2*np.pi/grain_size_in_pixels
+    bumps = 3*np.cos(pixel_positions[1:, np.newaxis])*np.cos(pixel_positions[np.newaxis, :])
+    return bumps + np.random.default_rng(seed).normal(0, noise_in_nanometers, bumps.shape)
+
+# Expected input: Path to a raw data csv exported by the Pygwy script.
+# Expected Output: Flat numpy array of z-values, read exactly the way grain_analysis_documented.py used to read every file.
+def LoadGwyddionExportWithCsvReader(file_path):
+    with open(file_path, newline='') as f:
+        reader = csv.reader(f)
+        data = list(reader)
+        data = np.array(data[0])
+        raw_data = data.astype(float)
+    return raw_data
+
+# The pipeline exactly as grain_analysis_documented.py first ran it, one argrelextrema() call and one Python loop step per cross section.
+# Nothing uses these but the benchmarks, they are what every faster version is timed against and checked to give the same numbers as.
+
+# Expected input: Flat array of z-values.
+# Expected Output: List of the cross sections, the original SplitDataMatrixIntoRows().
+def OriginalSplitDataMatrixIntoRows(data, pixel_dimension_of_image=512):
+    nested_list_of_individual_cross_sections = list()
+    for i in range(0, len(data), pixel_dimension_of_image):
+        nested_list_of_individual_cross_sections.append(data[i:i + pixel_dimension_of_image])
+    return nested_list_of_individual_cross_sections
+
+# Expected input: Output from OriginalSplitDataMatrixIntoRows().
+# Expected Output: Nested list of the locations of the relative minima in micrometers, the original ExtractDistancesBetweenRelativeMinima_GrainDiameter().
+def OriginalExtractDistancesBetweenRelativeMinima_GrainDiameter(data, length_in_micrometers=6, pixel_dimension_of_image=512):
+    scaling_factor = length_in_micrometers/pixel_dimension_of_image
+    nested_list_of_xaxis_locations_of_relative_minima_for_each_cross_section = list()
+    for each_individual_cross_section in data:
+        xaxis_locations_of_relative_minima = argrelextrema(each_individual_cross_section, np.less)[0]*scaling_factor
+        nested_list_of_xaxis_locations_of_relative_minima_for_each_cross_section.append(xaxis_locations_of_relative_minima)
+    return nested_list_of_xaxis_locations_of_relative_minima_for_each_cross_section
+
+# Expected input: Output from OriginalSplitDataMatrixIntoRows().
+# Expected Output: Nested list of the heights of the relative maxima, the original ExtractHeightOfRelativeMaxima_GrainHeight().
+def OriginalExtractHeightOfRelativeMaxima_GrainHeight(data):
+    nested_list_of_grain_heights = list()
+    for each_individual_cross_section in data:
+        nested_list_of_grain_heights.append(each_individual_cross_section[argrelextrema(each_individual_cross_section, np.greater)[0]])
+    return nested_list_of_grain_heights
+
+# Expected input: Output from OriginalExtractDistancesBetweenRelativeMinima_GrainDiameter().
+# Expected Output: Average and standard deviation of every diameter, the original CalculateAverageAndStandardDeviation_GrainDiameter().
+def OriginalCalculateAverageAndStandardDeviation_GrainDiameter(data):
+    list_of_grain_diameters_for_all_cross_sections = np.concatenate([np.diff(each_list_of_relative_minima_locations) for each_list_of_relative_minima_locations in data]).ravel()
+    return np.mean(list_of_grain_diameters_for_all_cross_sections), np.std(list_of_grain_diameters_for_all_cross_sections)
+
+# Expected input: Output from OriginalExtractHeightOfRelativeMaxima_GrainHeight().
+# Expected Output: Average and standard deviation of every height, the original CalculateAverageAndStandardDeviation_GrainHeight().
+def OriginalCalculateAverageAndStandardDeviation_GrainHeight(data):
+    list_of_grain_heights_for_all_cross_sections = np.concatenate(data).ravel()
+    return np.mean(list_of_grain_heights_for_all_cross_sections), np.std(list_of_grain_heights_for_all_cross_sections)
+
+# Expected input: Output from OriginalExtractDistancesBetweenRelativeMinima_GrainDiameter().
+# Expected Output: Average and standard deviation of the largest and of the smallest diameter of each cross section, the original
+# CalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainDiameter().
+def OriginalCalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainDiameter(data):
+    list_of_maximum_grain_diameter_from_each_cross_section = list()
+    list_of_minimum_grain_diameter_from_each_cross_section = list()
+    for each_individual_cross_section in data:
+        list_of_individual_diameters = np.diff(each_individual_cross_section)
+        list_of_maximum_grain_diameter_from_each_cross_section.append(max(list_of_individual_diameters))
+        list_of_minimum_grain_diameter_from_each_cross_section.append(min(list_of_individual_diameters))
+    return (np.mean(list_of_maximum_grain_diameter_from_each_cross_section), np.std(list_of_maximum_grain_diameter_from_each_cross_section),
+            np.mean(list_of_minimum_grain_diameter_from_each_cross_section), np.std(list_of_minimum_grain_diameter_from_each_cross_section))
+
+# Expected input: Output from OriginalExtractHeightOfRelativeMaxima_GrainHeight().
+# Expected Output: Average and standard deviation of the largest and of the smallest height of each cross section, the original
+# CalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainHeight().
+def OriginalCalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainHeight(data):
+    list_of_maximum_grain_heights_from_each_cross_section = list()
+    list_of_minimum_grain_heights_from_each_cross_section = list()
+    for each_individual_cross_section in data:
+        list_of_maximum_grain_heights_from_each_cross_section.append(max(each_individual_cross_section))
+        list_of_minimum_grain_heights_from_each_cross_section.append(min(each_individual_cross_section))
+    return (np.mean(list_of_maximum_grain_heights_from_each_cross_section), np.std(list_of_maximum_grain_heights_from_each_cross_section),
+            np.mean(list_of_minimum_grain_heights_from_each_cross_section), np.std(list_of_minimum_grain_heights_from_each_cross_section))
+
+# Expected input: Path to a raw data csv exported by the Pygwy script, its length in micrometers and pixel dimension.
+# Expected Output: Dictionary with the twelve statistics columns of the results table, worked out the original way from loading to statistics.
+def RunOriginalPipelineOnImage(file_path, length_in_micrometers=6, pixel_dimension_of_image=512):
+    data_matrix_divided = OriginalSplitDataMatrixIntoRows(LoadGwyddionExportWithCsvReader(file_path), pixel_dimension_of_image)
+    diams = OriginalExtractDistancesBetweenRelativeMinima_GrainDiameter(data_matrix_divided, length_in_micrometers, pixel_dimension_of_image)
+    heights = OriginalExtractHeightOfRelativeMaxima_GrainHeight(data_matrix_divided)
+    grain_statistics = dict()
+    grain_statistics['mean_diameter'], grain_statistics['std_diameter'] = OriginalCalculateAverageAndStandardDeviation_GrainDiameter(diams)
+    (grain_statistics['max_average_diameter'], grain_statistics['max_std_diameter'],
+     grain_statistics['min_average_diameter'], grain_statistics['min_std_diameter']) = OriginalCalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainDiameter(diams)
+    grain_statistics['mean_height'], grain_statistics['std_height'] = OriginalCalculateAverageAndStandardDeviation_GrainHeight(heights)
+    (grain_statistics['max_average_height'], grain_statistics['max_std_height'],
+     grain_statistics['min_average_height'], grain_statistics['min_std_height']) = OriginalCalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainHeight(heights)
+    return grain_statistics
+
+# Expected input: Name of a pipeline stage, what the current functions gave for it and what the Original*() functions gave.
+# Expected Output: None, raises an AssertionError unless both hold the same numbers (to floating point rounding) in the same rows.
+# Results rows are compared on the statistics columns only.
+def CheckStageGivesSameNumbers(stage, current_output, original_output):
+    if isinstance(original_output, dict):
+        current_output = [current_output[column] for column in sorted(original_output)]
+        original_output = [original_output[column] for column in sorted(original_output)]
+    if isinstance(original_output, list) and len(original_output) > 0 and np.ndim(original_output[0]) == 1:
+        current_row_lengths = [len(each_row) for each_row in current_output]
+        original_row_lengths = [len(each_row) for each_row in original_output]
+        if current_row_lengths != original_row_lengths:
+            raise AssertionError("Stage {} does not find the same number of values in every cross section as the original pipeline.".format(stage))
+        current_output = np.concatenate(list(current_output))
+        original_output = np.concatenate(original_output)
+    if np.shape(current_output) != np.shape(original_output) or not np.allclose(current_output, original_output, rtol=1e-9, atol=1e-12):
+        raise AssertionError("Stage {} does not give the same numbers as the original pipeline.".format(stage))
+
+# Expected input: Pixel dimensions of the square scans to benchmark, the number of runs to take the fastest of and the largest pixel dimension
+# to also run (and check) the Original*() functions at, they are far slower and hold the whole csv as Python strings.
+# Expected Output: List of dictionaries, one per pixel dimension, stage and implementation ('current' or 'original'), holding its 'seconds' and 'peak_megabytes'.
+# The same table is printed as it is measured. Every scan is the 16 pixel grain surface of CreateNoisyGrainSurface() written as a csv export.
+def BenchmarkPipelineStages(list_of_pixel_dimensions=default_stage_pixel_dimensions, repeats=3, largest_pixel_dimension_to_check=1024, length_in_micrometers=6):
+    print("{:<12}{:<30}{:<12}{:>12}{:>16}".format("Pixels", "Stage", "Version", "Seconds", "Peak MB"))
+    benchmark_results = list()
+    with tempfile.TemporaryDirectory() as temporary_folder:
+        for pixel_dimension_of_image in list_of_pixel_dimensions:
+            file_path = os.path.join(temporary_folder, "benchmark_{}_full.txt".format(pixel_dimension_of_image))
+            WriteGwyddionExport(file_path, CreateNoisyGrainSurface(pixel_dimension_of_image))
+            manifest_entry = {'molecule': 'benchmark', 'time_in_minutes': 1.0, 'file_path': file_path,
+                              'pixel_dimension_of_image': pixel_dimension_of_image, 'length_in_micrometers': length_in_micrometers}
+
+            stages_of_each_implementation = {'current': {
+                'load': lambda stage_outputs: LoadGwyddionExport(file_path, use_cache=False),
+                'split': lambda stage_outputs: SplitDataMatrixIntoRows(stage_outputs['load'], pixel_dimension_of_image),
+                'extract_diameter': lambda stage_outputs: ExtractDistancesBetweenRelativeMinima_GrainDiameter(stage_outputs['split'], length_in_micrometers, pixel_dimension_of_image),
+                'extract_height': lambda stage_outputs: ExtractHeightOfRelativeMaxima_GrainHeight(stage_outputs['split']),
+                'calculate_diameter': lambda stage_outputs: CalculateAverageAndStandardDeviation_GrainDiameter(stage_outputs['extract_diameter']),
+                'calculate_max_min_diameter': lambda stage_outputs: CalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainDiameter(stage_outputs['extract_diameter']),
+                'calculate_height': lambda stage_outputs: CalculateAverageAndStandardDeviation_GrainHeight(stage_outputs['extract_height']),
+                'calculate_max_min_height': lambda stage_outputs: CalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainHeight(stage_outputs['extract_height']),
+                'end_to_end': lambda stage_outputs: RunGrainAnalysisPipelineOnImage(manifest_entry),
+            }}
+            if pixel_dimension_of_image <= largest_pixel_dimension_to_check:
+                stages_of_each_implementation['original'] = {
+                    'load': lambda stage_outputs: LoadGwyddionExportWithCsvReader(file_path),
+                    'split': lambda stage_outputs: OriginalSplitDataMatrixIntoRows(stage_outputs['load'], pixel_dimension_of_image),
+                    'extract_diameter': lambda stage_outputs: OriginalExtractDistancesBetweenRelativeMinima_GrainDiameter(stage_outputs['split'], length_in_micrometers, pixel_dimension_of_image),
+                    'extract_height': lambda stage_outputs: OriginalExtractHeightOfRelativeMaxima_GrainHeight(stage_outputs['split']),
+                    'calculate_diameter': lambda stage_outputs: OriginalCalculateAverageAndStandardDeviation_GrainDiameter(stage_outputs['extract_diameter']),
+                    'calculate_max_min_diameter': lambda stage_outputs: OriginalCalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainDiameter(stage_outputs['extract_diameter']),
+                    'calculate_height': lambda stage_outputs: OriginalCalculateAverageAndStandardDeviation_GrainHeight(stage_outputs['extract_height']),
+                    'calculate_max_min_height': lambda stage_outputs: OriginalCalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainHeight(stage_outputs['extract_height']),
+                    'end_to_end': lambda stage_outputs: RunOriginalPipelineOnImage(file_path, length_in_micrometers, pixel_dimension_of_image),
+                }
+
+            outputs_of_each_implementation = dict()
+            for implementation, stages in stages_of_each_implementation.items():
+                stage_outputs = dict()
+                for stage in pipeline_stages:
+                    stage_outputs[stage], seconds, peak_megabytes = TimeAndTraceFunction(stages[stage], stage_outputs, repeats=repeats)
+                    benchmark_results.append({'pixel_dimension_of_image': pixel_dimension_of_image, 'stage': stage, 'implementation': implementation,
+                                              'seconds': seconds, 'peak_megabytes': peak_megabytes})
+                    print("{:<12}{:<30}{:<12}{:>12.4f}{:>16.1f}".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image), stage, implementation,
+                                                                      seconds, peak_megabytes))
+                outputs_of_each_implementation[implementation] = stage_outputs
+            if 'original' in outputs_of_each_implementation:
+                for stage in pipeline_stages:
+                    CheckStageGivesSameNumbers(stage, outputs_of_each_implementation['current'][stage], outputs_of_each_implementation['original'][stage])
+                print("{:<12}every stage gives the same numbers as the original pipeline".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image)))
+            del outputs_of_each_implementation, stage_outputs
+    return benchmark_results
+
+# Expected input: None.
+# Expected Output: Dictionary describing the machine and library versions the benchmarks run on, saved with every baseline.
+def DescribeBenchmarkMachine():
+    return {'platform': platform.platform(), 'processor': platform.processor(), 'cpu_count': os.cpu_count(),
+            'python_version': platform.python_version(), 'numpy_version': np.__version__}
+
+# Expected input: Output from BenchmarkPipelineStages() and the path of the json file to write.
+# Expected Output: None, writes the results and DescribeBenchmarkMachine() for CompareBenchmarkToBaseline() to compare later runs against.
+def SaveBenchmarkBaseline(benchmark_results, baseline_path):
+    with open(baseline_path, 'w') as baseline_file:
+        json.dump({'machine': DescribeBenchmarkMachine(), 'benchmark_results': benchmark_results}, baseline_file, indent=1)
+
+# Expected input: Path of a json file written by SaveBenchmarkBaseline().
+# Expected Output: Dictionary with the 'machine' it was measured on and its 'benchmark_results'.
+def LoadBenchmarkBaseline(baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    if 'benchmark_results' not in baseline:
+        raise ValueError("{} is not a benchmark baseline.".format(baseline_path))
+    return baseline
+
+# Expected input: Output from BenchmarkPipelineStages(), the 'benchmark_results' of a baseline and how much slower (or larger) a stage may get as a fraction.
+# Differences under "minimum_seconds" or "minimum_megabytes" are timer and allocator noise and never count.
+# Expected Output: List of the regressions, one dictionary per stage and measurement ('seconds' or 'peak_megabytes') that got worse, with the
+# 'baseline' and 'new' values. Every stage found in both is printed with its ratio to the baseline.
+def CompareBenchmarkToBaseline(benchmark_results, baseline_results, tolerance=0.25, minimum_seconds=0.005, minimum_megabytes=1):
+    baseline_of_each_stage = {(each_result['pixel_dimension_of_image'], each_result['stage'], each_result['implementation']): each_result for each_result in baseline_results}
+    print("{:<12}{:<30}{:<12}{:>14}{:>14}".format("Pixels", "Stage", "Version", "Time ratio", "Memory ratio"))
+    regressions = list()
+    for each_result in benchmark_results:
+        stage_key = (each_result['pixel_dimension_of_image'], each_result['stage'], each_result['implementation'])
+        if stage_key not in baseline_of_each_stage:
+            continue
+        baseline_result = baseline_of_each_stage[stage_key]
+        flags = list()
+        for measurement, minimum_difference in (('seconds', minimum_seconds), ('peak_megabytes', minimum_megabytes)):
+            if (each_result[measurement] > baseline_result[measurement]*(1 + tolerance)
+                    and each_result[measurement] - baseline_result[measurement] > minimum_difference):
+                regressions.append(dict(each_result, measurement=measurement, baseline=baseline_result[measurement], new=each_result[measurement]))
+                flags.append(measurement)
+        print("{:<12}{:<30}{:<12}{:>14.2f}{:>14.2f}  {}".format("{}x{}".format(stage_key[0], stage_key[0]), stage_key[1], stage_key[2],
+                                                               each_result['seconds']/max(baseline_result['seconds'], 1e-12),
+                                                               each_result['peak_megabytes']/max(baseline_result['peak_megabytes'], 1e-12),
+                                                               "REGRESSION ({})".format(", ".join(flags)) if flags else ""))
+    return regressions
+
+# Expected input: Pixel dimensions of the square scans to benchmark.
+# Expected Output: None, prints the time and peak memory of the csv.reader path against LoadGwyddionExport() with its default, with small chunks
+# and reading back from its memory-mapped .npy cache, and the size and load time of the same scan written as a float32 binary export.
+def BenchmarkLoaders(list_of_pixel_dimensions=(512, 2048)):
+    print("{:<12}{:<34}{:>12}{:>16}".format("Pixels", "Loader", "Seconds", "Peak MB"))
+    with tempfile.TemporaryDirectory() as temporary_folder:
+        for pixel_dimension_of_image in list_of_pixel_dimensions:
+            file_path = os.path.join(temporary_folder, "benchmark_{}_full.txt".format(pixel_dimension_of_image))
+            WriteRandomGwyddionExport(file_path, pixel_dimension_of_image)
+            reference_z_values = LoadGwyddionExportWithCsvReader(file_path)
+            binary_file_path = os.path.join(temporary_folder, "benchmark_{}_full.gwyg".format(pixel_dimension_of_image))
+            WriteGrainBinaryExport(binary_file_path, reference_z_values.reshape(-1, pixel_dimension_of_image))
+            print("{:<12}csv export {:.1f} MB, binary float32 export {:.1f} MB".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image),
+                                                                                     os.path.getsize(file_path)/1024/1024, os.path.getsize(binary_file_path)/1024/1024))
+
+            loaders = [
+                ("csv.reader + astype(float)", LoadGwyddionExportWithCsvReader, file_path, {}),
+                ("LoadGwyddionExport", LoadGwyddionExport, file_path, {'use_cache': False}),
+                ("LoadGwyddionExport float32", LoadGwyddionExport, file_path, {'dtype': np.float32, 'use_cache': False}),
+                ("LoadGwyddionExport 1MB chunks", LoadGwyddionExport, file_path, {'chunk_size_in_bytes': 1024*1024, 'expected_number_of_values': len(reference_z_values), 'use_cache': False}),
+                ("LoadGwyddionExport .npy cache", LoadGwyddionExport, file_path, {}),
+                ("LoadGwyddionExport binary float32", LoadGwyddionExport, binary_file_path, {'dtype': np.float32}),
+            ]
+            for loader_name, loader, loader_file_path, loader_arguments in loaders:
+                z_values, seconds, peak_megabytes = TimeAndTraceFunction(loader, loader_file_path, **loader_arguments)
+                if not np.allclose(z_values, reference_z_values, rtol=1e-6):
+                    raise AssertionError("{} does not return the same z-values as the csv.reader path.".format(loader_name))
+                print("{:<12}{:<34}{:>12.4f}{:>16.1f}".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image), loader_name, seconds, peak_megabytes))
+
+# Expected input: Pixel dimensions of the square scans to benchmark.
+# Expected Output: None, prints the time, peak memory and number of relative minima found by one argrelextrema() call per row (the way the script used to
+# search), FindRelativeExtremaOfAllCrossSections(), the same smoothing and prominence filter done with one scipy.signal.find_peaks() call per row,
+# and the noise-robust FindProminentExtremaOfAllCrossSections() with default_noise_robust_detection_settings,
+# on a surface of grains 16 pixels across, so about pixel_dimension_of_image/16 real minima per row.
+def BenchmarkPeakDetection(list_of_pixel_dimensions=(512, 4096)):
+    print("{:<12}{:<34}{:>12}{:>16}{:>16}".format("Pixels", "Detection", "Seconds", "Peak MB", "Minima per row"))
+    for pixel_dimension_of_image in list_of_pixel_dimensions:
+        data_matrix = CreateNoisyGrainSurface(pixel_dimension_of_image)
+        smoothing_kernel = default_noise_robust_detection_settings['smoothing_kernel']
+        smoothing_width_in_pixels = default_noise_robust_detection_settings['smoothing_width_in_pixels']
+        minimum_prominence = default_noise_robust_detection_settings['minimum_prominence']
+        detections = [
+            ("argrelextrema per row", lambda: [argrelextrema(each_row, np.less)[0] for each_row in data_matrix]),
+            ("FindRelativeExtrema", lambda: FindRelativeExtremaOfAllCrossSections(data_matrix, np.less)[1]),
+            ("smoothing + find_peaks per row", lambda: [find_peaks(-SmoothCrossSections(each_row, smoothing_kernel, smoothing_width_in_pixels)[0],
+                                                                   prominence=minimum_prominence)[0] for each_row in data_matrix]),
+            ("FindProminentExtrema", lambda: FindProminentExtremaOfAllCrossSections(data_matrix, np.less, **default_noise_robust_detection_settings)[1]),
+        ]
+        for detection_name, detection in detections:
+            minima, seconds, peak_megabytes = TimeAndTraceFunction(detection)
+            number_of_minima = sum(len(each_row) for each_row in minima) if isinstance(minima, list) else len(minima)
+            print("{:<12}{:<34}{:>12.4f}{:>16.1f}{:>16.1f}".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image), detection_name,
+                                                                  seconds, peak_megabytes, number_of_minima/data_matrix.shape[0]))
+
+# Expected input: Pixel dimensions of the square scans to benchmark.
+# Expected Output: None, prints the time and peak memory of ExtractGrainPropertiesBySegmentation() with its default settings, the number of grains found
+# and their average equivalent diameter in pixels, on the same 16 pixel grain surface as BenchmarkPeakDetection() (two grains per 16x16 pixels, about 12.8 pixels across).
+def BenchmarkSegmentation(list_of_pixel_dimensions=(512, 4096)):
+    print("{:<12}{:>12}{:>16}{:>16}{:>24}".format("Pixels", "Seconds", "Peak MB", "Grains", "Equivalent diameter px"))
+    for pixel_dimension_of_image in list_of_pixel_dimensions:
+        data_matrix = CreateNoisyGrainSurface(pixel_dimension_of_image)
+        grain_properties, seconds, peak_megabytes = TimeAndTraceFunction(ExtractGrainPropertiesBySegmentation, data_matrix, pixel_dimension_of_image, pixel_dimension_of_image)
+        average_equivalent_diameter = CalculateAverageAndStandardDeviation_EquivalentGrainDiameter(grain_properties)[0]
+        print("{:<12}{:>12.4f}{:>16.1f}{:>16}{:>24.2f}".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image), seconds, peak_megabytes,
+                                                              len(grain_properties['area']), average_equivalent_diameter))
+
+# Expected input: Pixel dimensions to sample the same 6 μm scan at.
+# Expected Output: None, prints the spread (standard deviation) and error of the average of the grain diameters measured on a perfectly regular surface
+# (every grain 0.35 μm across, every row shifted by a random phase) with whole pixel minima and with each sub-pixel refinement. The true spread is 0,
+# so the spread is the error the pixel grid adds to every diameter.
+def BenchmarkSubPixelRefinement(list_of_pixel_dimensions=(128, 256, 512, 2048), length_in_micrometers=6, grain_diameter_in_micrometers=0.35):
+    print("{:<12}{:<14}{:>12}{:>22}{:>22}".format("Pixels", "Refinement", "Seconds", "Diameter spread nm", "Average error nm"))
+    for pixel_dimension_of_image in list_of_pixel_dimensions:
+        pixel_positions_in_micrometers = np.arange(pixel_dimension_of_image)*length_in_micrometers/pixel_dimension_of_image
+        phase_of_each_row = np.random.default_rng(0).uniform(0, grain_diameter_in_micrometers, (pixel_dimension_of_image - 1, 1))
+        data_matrix = np.cos(2*np.pi*(pixel_positions_in_micrometers - phase_of_each_row)/grain_diameter_in_micrometers)
+        for sub_pixel_refinement in (None, 'parabola', 'centroid'):
+            diams, seconds, peak_megabytes = TimeAndTraceFunction(ExtractDistancesBetweenRelativeMinima_GrainDiameter, data_matrix, length_in_micrometers,
+                                                                  pixel_dimension_of_image, None, sub_pixel_refinement)
+            average_diameter, standard_deviation_diameter = CalculateAverageAndStandardDeviation_GrainDiameter(diams)
+            print("{:<12}{:<14}{:>12.4f}{:>22.2f}{:>22.2f}".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image), str(sub_pixel_refinement),
+                                                                  seconds, standard_deviation_diameter*1000, (average_diameter - grain_diameter_in_micrometers)*1000))
+
+# Expected input: Pixel dimensions of the square scans to benchmark, their length in micrometers and the white noise in nm to add to the surfaces.
+# Expected Output: None, prints how long CreateSyntheticGrainSurface() takes to make a Voronoi grain surface, and for every detection mode the time
+# ExtractDistancesBetweenRelativeMinima_GrainDiameter() takes on it, in megapixels per second, with the average diameter it measures next to the
+# true average chord length. Without noise the two agree to within the chords too short to have a minimum, the noise shows how far off every mode gets.
+def BenchmarkSyntheticSurfaces(list_of_pixel_dimensions=(512, 4096), length_in_micrometers=6, list_of_noise_in_nanometers=(0.0, 0.3)):
+    print("{:<12}{:>8}{:<4}{:<16}{:>12}{:>16}{:>18}{:>18}".format("Pixels", "Noise", "", "Detection", "Seconds", "Megapixels/s", "Measured μm", "True chord μm"))
+    for pixel_dimension_of_image in list_of_pixel_dimensions:
+        for noise_in_nanometers in list_of_noise_in_nanometers:
+            generation_start_time = time.perf_counter()
+            data_matrix, ground_truth = CreateSyntheticGrainSurface(pixel_dimension_of_image, length_in_micrometers, {'noise_in_nanometers': noise_in_nanometers})
+            print("{:<12}{:>8.2f}    {:<16}{:>12.4f}".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image), noise_in_nanometers,
+                                                        "(generating)", time.perf_counter() - generation_start_time))
+            for detection_name, detection_settings in (("every extremum", None), ("noise-robust", default_noise_robust_detection_settings)):
+                diams, seconds, peak_megabytes = TimeAndTraceFunction(ExtractDistancesBetweenRelativeMinima_GrainDiameter, data_matrix, length_in_micrometers,
+                                                                      pixel_dimension_of_image, detection_settings)
+                print("{:<12}{:>8.2f}    {:<16}{:>12.4f}{:>16.1f}{:>18.4f}{:>18.4f}".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image), noise_in_nanometers,
+                                                                                       detection_name, seconds, data_matrix.size/seconds/1e6,
+                                                                                       CalculateAverageAndStandardDeviation_GrainDiameter(diams)[0],
+                                                                                       np.mean(ground_truth['chord_lengths'])))
+
+
+# Expected input: Path to a raw data csv, its pixel dimension and length in micrometers, the dtype to process it in and the detection settings.
+# Expected Output: The intermediates and the statistics of the scan, loaded (without the .npy cache), split and searched in "processing_dtype".
+def RunPipelineInProcessingDtype(file_path, pixel_dimension_of_image, length_in_micrometers, processing_dtype, detection_settings=None):
+    data_matrix = SplitDataMatrixIntoRows(LoadGwyddionExport(file_path, processing_dtype, use_cache=False), pixel_dimension_of_image)
+    image_intermediates = ExtractImageIntermediates(data_matrix, length_in_micrometers, pixel_dimension_of_image, detection_settings)
+    return image_intermediates, CalculateGrainStatisticsFromIntermediates(image_intermediates)
+
+# Expected input: Pixel dimensions of the square scans to benchmark, their length in micrometers and the white noise in nm to add to the Voronoi grain surfaces.
+# Expected Output: None, prints for every scan and detection mode the time and peak memory of the pipeline in float64 and in float32, how many of the
+# extrema float32 finds differ from the float64 ones (in percent of all extrema) and the largest relative change of any statistic of the results table.
+# A synthetic surface has heights of a few nm with many digits each, so the changes are an upper bound on what a real scan exported by Gwyddion shows.
+def BenchmarkProcessingDtypes(list_of_pixel_dimensions=(512, 2048), length_in_micrometers=6, noise_in_nanometers=0.3):
+    print("{:<12}{:<16}{:<10}{:>12}{:>16}{:>20}{:>24}".format("Pixels", "Detection", "Dtype", "Seconds", "Peak MB", "Extrema changed %", "Largest change of stats"))
+    statistics_columns = [column for column in results_table_columns if column not in ('molecule', 'time_in_minutes', 'file_path')]
+    with tempfile.TemporaryDirectory() as temporary_folder:
+        for pixel_dimension_of_image in list_of_pixel_dimensions:
+            file_path = os.path.join(temporary_folder, "benchmark_{}_full.txt".format(pixel_dimension_of_image))
+            WriteGwyddionExport(file_path, CreateSyntheticGrainSurface(pixel_dimension_of_image, length_in_micrometers, {'noise_in_nanometers': noise_in_nanometers})[0])
+            for detection_name, detection_settings in (("every extremum", None), ("noise-robust", default_noise_robust_detection_settings)):
+                reference_intermediates, reference_statistics = None, None
+                for processing_dtype in (np.float64, np.float32):
+                    (image_intermediates, grain_statistics), seconds, peak_megabytes = TimeAndTraceFunction(RunPipelineInProcessingDtype, file_path, pixel_dimension_of_image,
+                                                                                                            length_in_micrometers, processing_dtype, detection_settings)
+                    if reference_intermediates is None:
+                        reference_intermediates, reference_statistics = image_intermediates, grain_statistics
+                    # An extremum counts as changed when it is found by only one of the two dtypes, compared as (row, pixel) pairs.
+                    number_of_changed_extrema = 0
+                    number_of_extrema = 0
+                    for row_offsets_key, locations_key in (('minima_row_offsets', 'minima_locations'), ('maxima_row_offsets', 'maxima_locations')):
+                        extrema_of_each_dtype = list()
+                        for each_intermediates in (reference_intermediates, image_intermediates):
+                            row_of_each_extremum = np.repeat(np.arange(each_intermediates['number_of_rows']), np.diff(each_intermediates[row_offsets_key]))
+                            pixel_of_each_extremum = each_intermediates[locations_key]
+                            if locations_key == 'minima_locations':
+                                pixel_of_each_extremum = np.rint(pixel_of_each_extremum*pixel_dimension_of_image/length_in_micrometers).astype(np.int64)
+                            extrema_of_each_dtype.append(row_of_each_extremum*pixel_dimension_of_image + pixel_of_each_extremum)
+                        number_of_changed_extrema += len(np.setxor1d(extrema_of_each_dtype[0], extrema_of_each_dtype[1]))
+                        number_of_extrema += len(extrema_of_each_dtype[0])
+                    largest_relative_change = max(abs(grain_statistics[column] - reference_statistics[column])/abs(reference_statistics[column])
+                                                  for column in statistics_columns if reference_statistics[column] != 0)
+                    print("{:<12}{:<16}{:<10}{:>12.4f}{:>16.1f}{:>20.4f}{:>24.2e}".format("{}x{}".format(pixel_dimension_of_image, pixel_dimension_of_image), detection_name,
+                                                                                         np.dtype(processing_dtype).name, seconds, peak_megabytes,
+                                                                                         100*number_of_changed_extrema/max(number_of_extrema, 1), largest_relative_change))
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Time the grain analysis pipeline on generated scans.")
+    argument_parser.add_argument('--suite', nargs='+', default=benchmark_suites, choices=benchmark_suites, help="benchmarks to run (default all)")
+    argument_parser.add_argument('--sizes', type=int, nargs='+', default=list(default_stage_pixel_dimensions),
+                                 help="pixel dimensions of the scans the pipeline stages are timed on (default 256 512 1024 2048 4096 8192)")
+    argument_parser.add_argument('--repeats', type=int, default=3, help="runs of every stage to take the fastest of (default 3)")
+    argument_parser.add_argument('--check-up-to', type=int, default=1024, help="largest pixel dimension the original pipeline is run and checked at (default 1024)")
+    argument_parser.add_argument('--save-baseline', metavar='PATH', help="write the stage timings to this json file")
+    argument_parser.add_argument('--compare', metavar='PATH', help="compare the stage timings to a baseline json file, exit with status 1 on a regression")
+    argument_parser.add_argument('--tolerance', type=float, default=0.25, help="fraction a stage may get slower or larger before it is a regression (default 0.25)")
+    arguments = argument_parser.parse_args()
+    if (arguments.save_baseline or arguments.compare) and 'stages' not in arguments.suite:
+        argument_parser.error("--save-baseline and --compare need the stages suite.")
+
+    if 'loaders' in arguments.suite:
+        BenchmarkLoaders()
+    if 'detection' in arguments.suite:
+        BenchmarkPeakDetection()
+    if 'segmentation' in arguments.suite:
+        BenchmarkSegmentation()
+    if 'sub-pixel' in arguments.suite:
+        BenchmarkSubPixelRefinement()
+    if 'synthetic' in arguments.suite:
+        BenchmarkSyntheticSurfaces()
+    if 'precision' in arguments.suite:
+        BenchmarkProcessingDtypes()
+    if 'stages' in arguments.suite:
+        benchmark_results = BenchmarkPipelineStages(arguments.sizes, arguments.repeats, arguments.check_up_to)
+        if arguments.save_baseline:
+            SaveBenchmarkBaseline(benchmark_results, arguments.save_baseline)
+            print("Success! Baseline written to {}.".format(arguments.save_baseline))
+        if arguments.compare:
+            regressions = CompareBenchmarkToBaseline(benchmark_results, LoadBenchmarkBaseline(arguments.compare)['benchmark_results'], arguments.tolerance)
+            if regressions:
+                print("{} regression(s) against {}.".format(len(regressions), arguments.compare))
+                sys.exit(1)
+            print("Success! No regressions against {}.".format(arguments.compare))
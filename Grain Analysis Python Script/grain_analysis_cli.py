@@ -0,0 +1,126 @@
+# Grain Analysis Command Line
+# This is used to run the three steps of the grain analysis (extracting the intermediates of every scan, working out the statistics, drawing the graphs)
+# from one command, one step at a time.
+#
+#   python grain_analysis_cli.py extract grain_analysis_manifest.csv intermediates --workers 8
+#       runs every scan of the manifest through the pipeline and saves its minima, diameters and heights (see grain_intermediate_store.py)
+#   python grain_analysis_cli.py stats grain_analysis_manifest.csv intermediates grain_analysis_results.csv
+#       works the results table out from the saved intermediates, scans with no saved intermediates are extracted first
+#   python grain_analysis_cli.py plot grain_analysis_results.csv grain_analysis_report --formats png pdf
+#       draws every graph of the results table (see grain_figure_rendering.py)
+#
+# extract and stats take the same --noise-robust, --sub-pixel, --dtype (and other detection) options as grain_batch_driver.py, give both the same options
+# or stats will not find the intermediates extract saved. Every step takes --workers and --profile.
+#
+# Only argparse is imported when this file is imported, each step imports the modules it needs when it runs. A stats run never imports scipy or matplotlib
+# and starts in a fraction of a second, which matters when the statistics are worked out again and again from saved intermediates.
+# The step functions (RunExtractStep(), RunStatsStep(), RunPlotStep()) can be imported and called like any other function of the analysis.
+#
+# Pipeline:
+# extract: ReadGrainAnalysisManifest() -> RunGrainAnalysisBatch() with an intermediate folder
+# stats:   ReadGrainAnalysisManifest() -> RunGrainAnalysisBatch() with the same intermediate folder -> WriteGrainAnalysisResultsTable()
+# plot:    ReadGrainAnalysisResultsTable() -> BuildGrainAnalysisReportSpecifications() -> RenderFigureSpecifications()
+#
+
+import argparse
+
+
+# Expected input: Path to a manifest csv (see grain_batch_driver.py), the intermediate folder to save to, the number of worker processes
+# (None for one per CPU core) and the "detection_settings", "sub_pixel_refinement" and "processing_dtype" to pass to RunGrainAnalysisBatch().
+# Expected Output: Results table of the manifest, the intermediates of every scan are saved in the intermediate folder as a side product.
+def RunExtractStep(manifest_path, intermediate_folder, number_of_workers=1, detection_settings=None, sub_pixel_refinement=None, processing_dtype='float64'):
+    from grain_batch_driver import ReadGrainAnalysisManifest, RunGrainAnalysisBatch
+    return RunGrainAnalysisBatch(ReadGrainAnalysisManifest(manifest_path), number_of_workers, detection_settings, sub_pixel_refinement, intermediate_folder,
+                                 processing_dtype)
+
+# Expected input: Path to a manifest csv, the intermediate folder filled by RunExtractStep(), the results csv to write and the same
+# number of workers, "detection_settings", "sub_pixel_refinement" and "processing_dtype" as RunExtractStep().
+# Expected Output: Results table of the manifest, also written to results_path.
+def RunStatsStep(manifest_path, intermediate_folder, results_path, number_of_workers=1, detection_settings=None, sub_pixel_refinement=None,
+                 processing_dtype='float64'):
+    from grain_batch_driver import ReadGrainAnalysisManifest, RunGrainAnalysisBatch, WriteGrainAnalysisResultsTable
+    results_table = RunGrainAnalysisBatch(ReadGrainAnalysisManifest(manifest_path), number_of_workers, detection_settings, sub_pixel_refinement, intermediate_folder,
+                                          processing_dtype)
+    WriteGrainAnalysisResultsTable(results_table, results_path)
+    return results_table
+
+# Expected input: Path to a results csv, the folder to write the graphs to, rendering settings (see default_rendering_settings in grain_figure_rendering.py)
+# and the number of worker processes (None for one per CPU core).
+# Expected Output: List of the files written.
+def RunPlotStep(results_path, output_folder, rendering_settings=None, number_of_workers=1):
+    from grain_batch_driver import ReadGrainAnalysisResultsTable
+    from grain_figure_rendering import BuildGrainAnalysisReportSpecifications, RenderFigureSpecifications
+    figure_specifications = BuildGrainAnalysisReportSpecifications(ReadGrainAnalysisResultsTable(results_path))
+    return RenderFigureSpecifications(figure_specifications, output_folder, rendering_settings, number_of_workers)
+
+
+# Expected input: Arguments parsed by the parser of CreateArgumentParser() for the extract step.
+# Expected Output: None, prints where the intermediates went.
+def _RunExtractCommand(arguments):
+    from grain_batch_driver import ReadDetectionArguments
+    detection_settings, sub_pixel_refinement, processing_dtype = ReadDetectionArguments(arguments)
+    results_table = RunExtractStep(arguments.manifest_path, arguments.intermediate_folder, arguments.workers or None, detection_settings, sub_pixel_refinement,
+                                   processing_dtype)
+    print("Success! Intermediates of {} scans saved to {}.".format(sum(each_row['file_path'] is not None for each_row in results_table), arguments.intermediate_folder))
+
+# Expected input: Arguments parsed by the parser of CreateArgumentParser() for the stats step.
+# Expected Output: None, prints where the results table went.
+def _RunStatsCommand(arguments):
+    from grain_batch_driver import ReadDetectionArguments
+    detection_settings, sub_pixel_refinement, processing_dtype = ReadDetectionArguments(arguments)
+    results_table = RunStatsStep(arguments.manifest_path, arguments.intermediate_folder, arguments.results_path, arguments.workers or None,
+                                 detection_settings, sub_pixel_refinement, processing_dtype)
+    print("Success! Results for {} scans written to {}.".format(len(results_table), arguments.results_path))
+
+# Expected input: Arguments parsed by the parser of CreateArgumentParser() for the plot step.
+# Expected Output: None, prints how many files were written.
+def _RunPlotCommand(arguments):
+    from grain_figure_rendering import default_rendering_settings
+    rendering_settings = dict(default_rendering_settings, file_formats=arguments.formats, dpi=arguments.dpi, figure_size_in_inches=arguments.figure_size)
+    written_paths = RunPlotStep(arguments.results_path, arguments.output_folder, rendering_settings, arguments.workers or None)
+    print("Success! {} files written to {}.".format(len(written_paths), arguments.output_folder))
+
+# Expected input: None.
+# Expected Output: argparse.ArgumentParser with the extract, stats and plot subcommands, the function to run is in the 'run_command' of the parsed arguments.
+# Building the parser imports grain_batch_driver, grain_figure_rendering and grain_profiling for their options and defaults, none of them imports scipy or matplotlib.
+def CreateArgumentParser():
+    from grain_batch_driver import AddDetectionArguments
+    from grain_figure_rendering import default_rendering_settings
+    from grain_profiling import AddProfilingArguments
+    argument_parser = argparse.ArgumentParser(description="Run the grain analysis one step at a time: extract, stats or plot.")
+    subparsers = argument_parser.add_subparsers(dest='command', required=True)
+
+    extract_parser = subparsers.add_parser('extract', help="save the minima, diameters and heights of every scan in a manifest")
+    extract_parser.add_argument('manifest_path', help="csv with molecule, time_in_minutes and file_path columns")
+    extract_parser.add_argument('intermediate_folder', help="folder the intermediates of every scan are saved in")
+    AddDetectionArguments(extract_parser)
+    extract_parser.set_defaults(run_command=_RunExtractCommand)
+
+    stats_parser = subparsers.add_parser('stats', help="write the results table of a manifest from its saved intermediates")
+    stats_parser.add_argument('manifest_path', help="csv with molecule, time_in_minutes and file_path columns")
+    stats_parser.add_argument('intermediate_folder', help="folder filled by the extract step")
+    stats_parser.add_argument('results_path', help="csv file the results table is written to")
+    AddDetectionArguments(stats_parser)
+    stats_parser.set_defaults(run_command=_RunStatsCommand)
+
+    plot_parser = subparsers.add_parser('plot', help="draw every graph of a results table")
+    plot_parser.add_argument('results_path', help="results csv written by the stats step")
+    plot_parser.add_argument('output_folder', help="folder the figures are written to")
+    plot_parser.add_argument('--formats', nargs='+', default=default_rendering_settings['file_formats'], choices=['png', 'svg', 'pdf'], help="file formats (default png)")
+    plot_parser.add_argument('--dpi', type=float, default=default_rendering_settings['dpi'], help="resolution of png files (default 100)")
+    plot_parser.add_argument('--figure-size', type=float, nargs=2, default=default_rendering_settings['figure_size_in_inches'], metavar=('WIDTH', 'HEIGHT'),
+                             help="figure size in inches (default 10 7)")
+    plot_parser.set_defaults(run_command=_RunPlotCommand)
+
+    for each_parser in (extract_parser, stats_parser, plot_parser):
+        each_parser.add_argument('--workers', type=int, default=1, help="number of worker processes, 0 for one per CPU core (default 1)")
+        AddProfilingArguments(each_parser)
+    return argument_parser
+
+
+if __name__ == '__main__':
+    arguments = CreateArgumentParser().parse_args()
+    from grain_profiling import ReadProfilingArguments, FinishProfiling
+    ReadProfilingArguments(arguments)
+    arguments.run_command(arguments)
+    FinishProfiling()
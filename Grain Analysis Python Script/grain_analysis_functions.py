@@ -0,0 +1,299 @@
+# Grain Analysis Functions
+# These are the functions behind grain_analysis_documented.py. They live in their own file so they can be imported (by grain_batch_driver.py,
+# a notebook or another script) without running the whole analysis and drawing every graph.
+#
+# The expected input is a raw data csv text file of n by n dimensions (square), containing values extracted from Gwyddion using the given PyGwy script.
+# See the top of grain_analysis_documented.py for the order the functions are run in.
+#
+# Importing this file does nothing but define the functions. scipy takes longer to import than a whole 512x512 scan takes to analyse, so it is
+# only imported inside the functions of the noise-robust detection mode, the first time they are called.
+#
+
+import numpy as np
+from grain_statistics import CreateStatisticsAccumulator, UpdateStatisticsAccumulator, SummarizeStatisticsAccumulator
+
+
+# A starting point for the noise-robust detection mode, z-values in nm: a light 5 pixel gaussian smoothing and extrema that stand out by at least 0.5 nm.
+default_noise_robust_detection_settings = {'smoothing_kernel': 'gaussian', 'smoothing_width_in_pixels': 5, 'minimum_prominence': 0.5, 'minimum_width_in_pixels': 0}
+
+# Rows FindRelativeExtremaOfAllCrossSections() compares at a time, 256 rows of a 4096 pixel scan are 1 million pixels.
+default_rows_per_block = 256
+
+
+# Extpected input: Outputted cross sectional data matrix from Pygwy script,
+# pass the pixel dimension of your image as the value for n, defaulted to 512 representing a SQUARE 512x512 image.
+# For a scan that is not square, n is the number of pixels in one cross section (columns), pass "number_of_rows" as well to have the row count checked.
+# Expected Output: 2D numpy array with one cross section per row. It is a reshaped view of "data", nothing is copied.
+# Raises a ValueError when the number of z-values is not a whole number of cross sections.
+def SplitDataMatrixIntoRows(data, pixel_dimension_of_image=512, number_of_rows=None):
+    data = np.asarray(data)
+    if data.ndim != 1:
+        raise ValueError("Data must be the flat array of z-values exported by the Pygwy script.")
+    if pixel_dimension_of_image <= 0 or len(data) % pixel_dimension_of_image != 0:
+        raise ValueError("{} z-values cannot be split into cross sections of {} pixels.".format(len(data), pixel_dimension_of_image))
+    if number_of_rows is not None and len(data) != number_of_rows*pixel_dimension_of_image:
+        raise ValueError("{} z-values do not make up {} cross sections of {} pixels.".format(len(data), number_of_rows, pixel_dimension_of_image))
+    return data.reshape(len(data)//pixel_dimension_of_image, pixel_dimension_of_image)
+
+# Expected input: 2D array of z-values holding one cross section per row (the output from SplitDataMatrixIntoRows()),
+# pass np.less as "comparator" to find relative minima or np.greater to find relative maxima, the same way argrelextrema() is used.
+# Expected Output: Two arrays in a CSR-style (compressed row) layout covering every cross section at once. "row_offsets" has one more entry than
+# there are rows and "xaxis_locations" holds the pixel locations of every relative extremum, row after row, so the extrema of row i are
+# xaxis_locations[row_offsets[i]:row_offsets[i+1]]. Matches argrelextrema(each_individual_cross_section, comparator) for every row, first and last pixel excluded.
+# The matrix is compared "rows_per_block" rows at a time, so the boolean masks and index arrays never cover more than one block. The locations of each block are
+# kept as int32 until they are joined, which leaves the joined output (8 bytes per extremum) as the only thing that grows with the size of the scan.
+# Measured on the noisy grain surface of benchmark_grain_analysis.py: at 512x512 this takes 1.4 ms against 12 ms for one argrelextrema() call per row,
+# at 4096x4096 (3.9 million minima) 0.09 s and 47 MB at its peak against 0.23 s and 31 MB (comparing the whole matrix at once took 0.27 s and 135 MB).
+def FindRelativeExtremaOfAllCrossSections(data_matrix, comparator=np.less, rows_per_block=default_rows_per_block):
+    data_matrix = np.atleast_2d(np.asarray(data_matrix))
+    number_of_cross_sections, number_of_columns = data_matrix.shape
+    row_offsets = np.zeros(number_of_cross_sections + 1, dtype=np.intp)
+    if number_of_cross_sections == 0 or number_of_columns < 3:
+        return row_offsets, np.empty(0, dtype=np.intp)
+    xaxis_locations_of_each_block = list()
+    for first_row in range(0, number_of_cross_sections, rows_per_block):
+        block = data_matrix[first_row:first_row + rows_per_block]
+        interior_z_values = block[:, 1:-1]
+        is_relative_extremum = comparator(interior_z_values, block[:, :-2])
+        is_relative_extremum &= comparator(interior_z_values, block[:, 2:])
+        row_offsets[first_row + 1:first_row + 1 + block.shape[0]] = np.count_nonzero(is_relative_extremum, axis=1)
+        xaxis_locations_of_block = np.flatnonzero(is_relative_extremum)
+        xaxis_locations_of_block %= number_of_columns - 2
+        xaxis_locations_of_block += 1
+        xaxis_locations_of_each_block.append(xaxis_locations_of_block.astype(np.int32))
+    np.cumsum(row_offsets, out=row_offsets)
+    return row_offsets, np.concatenate(xaxis_locations_of_each_block, dtype=np.intp)
+
+# Expected input: 2D array of z-values holding one cross section per row, the smoothing kernel to use ("gaussian", "boxcar" or a list of weights)
+# and its width in pixels. A width of 0 or 1 leaves the cross sections as they are.
+# Expected Output: 2D array of the same shape with every cross section smoothed on its own, the ends padded with their first/last z-value.
+# The kernel is applied to the whole matrix in one scipy.ndimage.correlate1d() call, there is no loop over rows.
+def SmoothCrossSections(data_matrix, smoothing_kernel='gaussian', smoothing_width_in_pixels=5):
+    from scipy.ndimage import correlate1d
+    data_matrix = np.atleast_2d(np.asarray(data_matrix))
+    if isinstance(smoothing_kernel, str):
+        if smoothing_width_in_pixels <= 1:
+            return data_matrix
+        number_of_weights = int(smoothing_width_in_pixels) | 1
+        if smoothing_kernel == 'boxcar':
+            kernel_weights = np.ones(number_of_weights)
+        elif smoothing_kernel == 'gaussian':
+            kernel_weights = np.exp(-0.5*(np.arange(number_of_weights) - number_of_weights//2)**2/(number_of_weights/4)**2)
+        else:
+            raise ValueError("Smoothing kernel must be \"gaussian\", \"boxcar\" or a list of weights.")
+    else:
+        kernel_weights = np.asarray(smoothing_kernel, dtype=np.float64)
+        if kernel_weights.ndim != 1 or len(kernel_weights) % 2 == 0 or kernel_weights.sum() == 0:
+            raise ValueError("A smoothing kernel given as weights must be an odd number of weights that do not add up to 0.")
+    kernel_weights = kernel_weights/kernel_weights.sum()
+
+    if not np.issubdtype(data_matrix.dtype, np.floating):
+        data_matrix = data_matrix.astype(np.float64)
+    return correlate1d(data_matrix, kernel_weights, axis=1, mode='nearest')
+
+# Expected input: 2D array of z-values holding one cross section per row (the output from SplitDataMatrixIntoRows() or grain_cross_sections.py),
+# np.less to find relative minima or np.greater for relative maxima, and the noise filters:
+#   smoothing_kernel, smoothing_width_in_pixels - passed to SmoothCrossSections() before searching, defaulted to no smoothing.
+#   minimum_prominence - how far (in z units) the extremum has to stand out from the deeper of the two bases around it, the same as the prominence of scipy.signal.find_peaks().
+#   minimum_width_in_pixels - width of the extremum at half its prominence, the same as the width of scipy.signal.find_peaks() (rel_height=0.5).
+# Expected Output: The same CSR-style (row_offsets, xaxis_locations) pair as FindRelativeExtremaOfAllCrossSections(), holding only the extrema that pass every filter.
+# With no smoothing and both minimums at 0 it finds exactly what FindRelativeExtremaOfAllCrossSections() finds. Plateaus are never counted as extrema.
+# The prominence and width of every extremum in the matrix are measured together, there is no loop over rows or extrema.
+# nan samples at the ends of a cross section (from ExtractCrossSectionsAtAngle()) count as the end of the cross section.
+def FindProminentExtremaOfAllCrossSections(data_matrix, comparator=np.less, smoothing_kernel='gaussian', smoothing_width_in_pixels=0,
+                                           minimum_prominence=0, minimum_width_in_pixels=0):
+    from scipy.signal import peak_prominences, peak_widths
+    data_matrix = np.atleast_2d(np.asarray(data_matrix))
+    if comparator is np.less:
+        peak_z_values = -SmoothCrossSections(data_matrix, smoothing_kernel, smoothing_width_in_pixels)
+    elif comparator is np.greater:
+        peak_z_values = SmoothCrossSections(data_matrix, smoothing_kernel, smoothing_width_in_pixels)
+    else:
+        raise ValueError("Comparator must be np.less (relative minima) or np.greater (relative maxima).")
+
+    number_of_cross_sections, number_of_columns = peak_z_values.shape
+    row_offsets, xaxis_locations = FindRelativeExtremaOfAllCrossSections(peak_z_values, np.greater)
+    if (minimum_prominence <= 0 and minimum_width_in_pixels <= 0) or len(xaxis_locations) == 0:
+        return row_offsets, xaxis_locations
+
+    row_of_each_peak = np.repeat(np.arange(number_of_cross_sections), np.diff(row_offsets))
+    flat_z_values = peak_z_values.ravel()
+    peak_indices = row_of_each_peak*number_of_columns + xaxis_locations
+
+    # Every row is split at its first pixel and at every pixel at least as high as both its neighbours (the extrema and any plateaus).
+    # Between two split points a cross section only goes down and back up, so it can be shrunk to the height of each split point followed by the lowest
+    # z-value before the next one without changing the prominence of any extremum. The start of every row (and the end of the matrix) becomes an infinitely
+    # high wall, so all rows fit in one short 1D signal and scipy.signal.peak_prominences() measures every extremum of the matrix in a single call.
+    is_split_point = np.zeros(peak_z_values.shape, dtype=bool)
+    is_split_point[:, 0] = True
+    is_split_point[:, 1:-1] = (peak_z_values[:, 1:-1] >= peak_z_values[:, :-2]) & (peak_z_values[:, 1:-1] >= peak_z_values[:, 2:])
+    split_point_indices = np.flatnonzero(is_split_point)
+    shrunk_z_values = np.empty(2*len(split_point_indices) + 1, dtype=np.float64)
+    shrunk_z_values[0:-1:2] = np.where(split_point_indices % number_of_columns == 0, np.inf, flat_z_values[split_point_indices])
+    shrunk_z_values[1:-1:2] = np.minimum.reduceat(np.where(np.isnan(flat_z_values), np.inf, flat_z_values), split_point_indices)
+    shrunk_z_values[-1] = np.inf
+    prominences = peak_prominences(shrunk_z_values, 2*np.searchsorted(split_point_indices, peak_indices))[0]
+    keep_peak = prominences >= minimum_prominence
+
+    if minimum_width_in_pixels > 0:
+        # The half prominence height is always crossed before the bases, so the width is measured on the full cross section with the finite part of its row as the bases.
+        is_finite = np.isfinite(peak_z_values)
+        left_limits = row_of_each_peak*number_of_columns + np.argmax(is_finite, axis=1)[row_of_each_peak]
+        right_limits = row_of_each_peak*number_of_columns + number_of_columns - 1 - np.argmax(is_finite[:, ::-1], axis=1)[row_of_each_peak]
+        widths = peak_widths(flat_z_values.astype(np.float64, copy=False), peak_indices, rel_height=0.5, prominence_data=(prominences, left_limits, right_limits))[0]
+        keep_peak &= widths >= minimum_width_in_pixels
+
+    row_offsets = np.zeros(number_of_cross_sections + 1, dtype=np.intp)
+    np.cumsum(np.bincount(row_of_each_peak[keep_peak], minlength=number_of_cross_sections), out=row_offsets[1:])
+    return row_offsets, xaxis_locations[keep_peak]
+
+# Expected input: 2D array of z-values holding one cross section per row, the comparator and the detection settings passed to the Extract functions.
+# Expected Output: CSR-style (row_offsets, xaxis_locations) from FindRelativeExtremaOfAllCrossSections() when "detection_settings" is None,
+# otherwise from FindProminentExtremaOfAllCrossSections() called with the settings in the dictionary.
+def FindExtremaOfAllCrossSections(data_matrix, comparator=np.less, detection_settings=None):
+    if detection_settings is None:
+        return FindRelativeExtremaOfAllCrossSections(data_matrix, comparator)
+    return FindProminentExtremaOfAllCrossSections(data_matrix, comparator, **detection_settings)
+
+# Expected input: 2D array of z-values holding one cross section per row, the CSR-style (row_offsets, xaxis_locations) of its extrema
+# (from FindRelativeExtremaOfAllCrossSections() or FindProminentExtremaOfAllCrossSections()) and the refinement to use:
+#   "parabola" - the vertex of the parabola through the extremum and its two neighbours.
+#   "centroid" - the centre of mass of the three samples, each weighted by how far it stands out from the lowest (maxima) or highest (minima) of them.
+# Expected Output: Flat float array of the extrema locations in pixels, each moved by at most half a pixel towards where the extremum really lies between the samples.
+# Every extremum of the matrix is refined at once, the three samples around each one are picked out with one fancy index.
+def RefineExtremaLocationsToSubPixel(data_matrix, row_offsets, xaxis_locations, sub_pixel_refinement='parabola'):
+    data_matrix = np.atleast_2d(np.asarray(data_matrix))
+    row_of_each_extremum = np.repeat(np.arange(data_matrix.shape[0]), np.diff(row_offsets))
+    left_z_values = data_matrix[row_of_each_extremum, xaxis_locations - 1].astype(np.float64)
+    centre_z_values = data_matrix[row_of_each_extremum, xaxis_locations].astype(np.float64)
+    right_z_values = data_matrix[row_of_each_extremum, xaxis_locations + 1].astype(np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if sub_pixel_refinement == 'parabola':
+            sub_pixel_offsets = 0.5*(left_z_values - right_z_values)/(left_z_values - 2*centre_z_values + right_z_values)
+        elif sub_pixel_refinement == 'centroid':
+            # Distance from the opposite end of the three samples, which is the same for minima (centre lowest) and maxima (centre highest).
+            is_maximum = centre_z_values > left_z_values
+            reference_z_values = np.where(is_maximum, np.minimum(left_z_values, right_z_values), np.maximum(left_z_values, right_z_values))
+            left_weights = np.abs(left_z_values - reference_z_values)
+            right_weights = np.abs(right_z_values - reference_z_values)
+            sub_pixel_offsets = (right_weights - left_weights)/(left_weights + np.abs(centre_z_values - reference_z_values) + right_weights)
+        else:
+            raise ValueError("Sub-pixel refinement must be \"parabola\" or \"centroid\".")
+    sub_pixel_offsets = np.clip(np.nan_to_num(sub_pixel_offsets), -0.5, 0.5)
+    return xaxis_locations + sub_pixel_offsets
+
+# Expected input: Output from FindRelativeExtremaOfAllCrossSections().
+# Expected Output: Flat array of distances between neighbouring extrema of the same cross section (in pixels), and its own row offsets in the same CSR-style layout.
+# A cross section with n extrema contributes n-1 distances, no distance is ever taken across two different cross sections.
+def CalculateDistancesBetweenNeighbouringExtrema(row_offsets, xaxis_locations):
+    number_of_extrema_in_each_row = np.diff(row_offsets)
+    distances_between_neighbouring_extrema = np.diff(xaxis_locations)
+    distance_stays_within_one_row = np.ones(len(distances_between_neighbouring_extrema), dtype=bool)
+    first_extremum_of_each_row = row_offsets[:-1][number_of_extrema_in_each_row > 0]
+    first_extremum_of_each_row = first_extremum_of_each_row[first_extremum_of_each_row > 0]
+    distance_stays_within_one_row[first_extremum_of_each_row - 1] = False
+    distance_row_offsets = np.zeros(len(row_offsets), dtype=np.intp)
+    np.cumsum(np.maximum(number_of_extrema_in_each_row - 1, 0), out=distance_row_offsets[1:])
+    return distance_row_offsets, distances_between_neighbouring_extrema[distance_stays_within_one_row]
+
+# Expected input: A list with one array of values per cross section, for example the output from ExtractDistancesBetweenRelativeMinima_GrainDiameter().
+# Expected Output: The same values in the CSR-style layout of FindRelativeExtremaOfAllCrossSections(), (row_offsets, values), joined with one np.concatenate().
+def JoinRowsIntoRowOffsets(data):
+    row_offsets = np.zeros(len(data) + 1, dtype=np.intp)
+    if len(data) == 0:
+        return row_offsets, np.empty(0)
+    np.cumsum(np.fromiter(map(len, data), dtype=np.intp, count=len(data)), out=row_offsets[1:])
+    return row_offsets, np.concatenate(data)
+
+# Expected input: A row offsets array and the flat values it belongs to, for example the output from CalculateDistancesBetweenNeighbouringExtrema().
+# Expected Output: Two arrays, the largest and the smallest value of every cross section that has any values, worked out for all rows at once.
+def CalculatePerRowMaximumAndMinimum(row_offsets, values):
+    row_offsets = np.asarray(row_offsets)
+    values = np.asarray(values)
+    first_value_of_each_row = row_offsets[:-1][np.diff(row_offsets) > 0]
+    if len(first_value_of_each_row) == 0:
+        return np.empty(0, dtype=values.dtype), np.empty(0, dtype=values.dtype)
+    return np.maximum.reduceat(values, first_value_of_each_row), np.minimum.reduceat(values, first_value_of_each_row)
+
+# Expected input: Flat array of every value to summarise, for example every grain diameter or height of an image.
+# Expected Output: Two floats: the average and the standard deviation of the values, fed to the accumulator of grain_statistics.py in one call.
+def CalculateAverageAndStandardDeviationOfValues(values):
+    summary = SummarizeStatisticsAccumulator(UpdateStatisticsAccumulator(CreateStatisticsAccumulator(), values))
+    return summary['mean'], summary['standard_deviation']
+
+# Expected input: A row offsets array and the flat values it belongs to.
+# Expected Output: Four floats: the average and standard deviation of the largest value of each cross section, then of the smallest. Rows with no values are skipped.
+def CalculateAverageAndStandardDeviationOfRowMaximaAndMinima(row_offsets, values):
+    maximum_of_each_row, minimum_of_each_row = CalculatePerRowMaximumAndMinimum(row_offsets, values)
+    return CalculateAverageAndStandardDeviationOfValues(maximum_of_each_row) + CalculateAverageAndStandardDeviationOfValues(minimum_of_each_row)
+
+# Expected input: Output from SplitDataMatrixIntoRows(),
+# pass the physical length of your image in micrometers as "length_in_micrometers" and the same pixel dimension as
+# inputted into SplitDataMatrixIntoRows(), defaulted to length_in_micrometers=6 and pixel_dimension_of_image=512.
+# Pass a dictionary of settings for FindProminentExtremaOfAllCrossSections() as "detection_settings" (for example default_noise_robust_detection_settings)
+# to skip the noise wiggles, defaulted to None which counts every relative minimum.
+# Pass "parabola" or "centroid" as "sub_pixel_refinement" to place every minimum between the pixels with RefineExtremaLocationsToSubPixel(), defaulted to None
+# which keeps the whole pixel locations (diameters are then multiples of length_in_micrometers/pixel_dimension_of_image). With smoothing in "detection_settings"
+# the minima are refined on the smoothed cross sections they were found on.
+# Expected Output: CSR-style (row_offsets, xaxis_locations) of the relative minima of every cross section, the locations in micrometers.
+# Pass them to CalculateDistancesBetweenNeighbouringExtrema() for the grain diameters, no step works on one row at a time.
+def ExtractRowOffsetsOfRelativeMinima_GrainDiameter(data, length_in_micrometers=6, pixel_dimension_of_image=512, detection_settings=None, sub_pixel_refinement=None):
+    data_matrix = np.atleast_2d(np.asarray(data))
+    row_offsets, xaxis_locations_of_relative_minima = FindExtremaOfAllCrossSections(data_matrix, np.less, detection_settings)
+    if sub_pixel_refinement is not None:
+        refined_matrix = data_matrix
+        if detection_settings is not None and detection_settings.get('smoothing_width_in_pixels', 0) > 1:
+            refined_matrix = SmoothCrossSections(data_matrix, detection_settings.get('smoothing_kernel', 'gaussian'), detection_settings['smoothing_width_in_pixels'])
+        xaxis_locations_of_relative_minima = RefineExtremaLocationsToSubPixel(refined_matrix, row_offsets, xaxis_locations_of_relative_minima, sub_pixel_refinement)
+    return row_offsets, xaxis_locations_of_relative_minima*(length_in_micrometers/pixel_dimension_of_image)
+
+# Expected input: The same as ExtractRowOffsetsOfRelativeMinima_GrainDiameter().
+# Expected Output: Nested list containing lists of x-axis locations of negative peaks (relative minima), the output of
+# ExtractRowOffsetsOfRelativeMinima_GrainDiameter() split into one array per cross section.
+def ExtractDistancesBetweenRelativeMinima_GrainDiameter(data, length_in_micrometers=6, pixel_dimension_of_image=512, detection_settings=None, sub_pixel_refinement=None):
+    row_offsets, xaxis_locations_of_relative_minima = ExtractRowOffsetsOfRelativeMinima_GrainDiameter(data, length_in_micrometers, pixel_dimension_of_image,
+                                                                                                      detection_settings, sub_pixel_refinement)
+    return np.split(xaxis_locations_of_relative_minima, row_offsets[1:-1]) if len(row_offsets) > 1 else []
+    
+# Expected Input: Output from ExtractDistancesBetweenRelativeMinima_GrainDiameter()
+# Expected Output: Two floats: The average grain diameter for all grains in the image and the standard deviation.
+# This function and the three below join the cross sections into one flat array with JoinRowsIntoRowOffsets() and feed it to the accumulator
+# from grain_statistics.py in one call, the per cross section maxima/minima come from CalculatePerRowMaximumAndMinimum(). There is no Python loop over the rows.
+def CalculateAverageAndStandardDeviation_GrainDiameter(data):
+    minima_row_offsets, minima_locations = JoinRowsIntoRowOffsets(data)
+    return CalculateAverageAndStandardDeviationOfValues(CalculateDistancesBetweenNeighbouringExtrema(minima_row_offsets, minima_locations)[1])
+
+# Expected Input: Output from SplitDataMatrixIntoRows(), pass "detection_settings" the same way as to ExtractDistancesBetweenRelativeMinima_GrainDiameter().
+# Expected Output: CSR-style (row_offsets, xaxis_locations, heights) of the relative maxima of every cross section, the heights are picked out with one fancy index.
+# The heights are always the measured z-values, smoothing only moves which pixels are picked.
+def ExtractRowOffsetsOfRelativeMaxima_GrainHeight(data, detection_settings=None):
+    data_matrix = np.atleast_2d(np.asarray(data))
+    row_offsets, xaxis_locations_of_relative_maxima = FindExtremaOfAllCrossSections(data_matrix, np.greater, detection_settings)
+    row_of_each_relative_maximum = np.repeat(np.arange(data_matrix.shape[0]), np.diff(row_offsets))
+    return row_offsets, xaxis_locations_of_relative_maxima, data_matrix[row_of_each_relative_maximum, xaxis_locations_of_relative_maxima]
+
+# Expected Input: Output from SplitDataMatrixIntoRows(), pass "detection_settings" the same way as to ExtractDistancesBetweenRelativeMinima_GrainDiameter().
+# Expected Output: Nested list containing heights of individual grains, the heights of ExtractRowOffsetsOfRelativeMaxima_GrainHeight() split into one array per cross section.
+def ExtractHeightOfRelativeMaxima_GrainHeight(data, detection_settings=None):
+    row_offsets, xaxis_locations_of_relative_maxima, individual_heights = ExtractRowOffsetsOfRelativeMaxima_GrainHeight(data, detection_settings)
+    return np.split(individual_heights, row_offsets[1:-1]) if len(row_offsets) > 1 else []
+
+# Expected Input: Output from ExtractHeightOfRelativeMaxima_GrainHeight()
+# Expected Output: Two floats: The average grain height for all grains in the image and the standard devaiton.
+def CalculateAverageAndStandardDeviation_GrainHeight(data):
+    return CalculateAverageAndStandardDeviationOfValues(JoinRowsIntoRowOffsets(data)[1])
+
+# Expected Input: Output from ExtractDistancesBetweenRelativeMinima_GrainDiameter()
+# Expected Output: Four floats: The average maximum grain diameter from each cross section and the standard deviation.
+# The average minimum grain diameter from each cross section and the standard deviation.
+# Cross sections with fewer than two minima (no diameter at all, which the noise-robust detection can leave) are skipped.
+def CalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainDiameter(data):
+    minima_row_offsets, minima_locations = JoinRowsIntoRowOffsets(data)
+    return CalculateAverageAndStandardDeviationOfRowMaximaAndMinima(*CalculateDistancesBetweenNeighbouringExtrema(minima_row_offsets, minima_locations))
+
+# Expected Input: Output from ExtractHeightOfRelativeMaxima_GrainHeight()
+# Expected Output: Four floats: The average maximum grain height from each cross section and the standard deviation.
+# The average minimum grain height from each cross section and the standard deviation. Cross sections with no maxima are skipped.
+def CalculateAverageAndStandardDeviationOfMaximumAndMinimumGrainHeight(data):
+    return CalculateAverageAndStandardDeviationOfRowMaximaAndMinima(*JoinRowsIntoRowOffsets(data))
@@ -0,0 +1,266 @@
+# Grain Analysis Batch Driver
+# This is used to run the grain analysis pipeline over every scan listed in a manifest and collect the results into one table.
+#
+# The manifest is a csv file with one line per scan and the columns:
+#   molecule          - name used in the graphs, for example C3 or C11NF
+#   time_in_minutes   - the time the AFM image was taken at
+#   file_path         - raw data csv exported by the Pygwy script, relative to the manifest. Leave empty for the t=0 point (no grains yet),
+#                       its means are set to 0.000001 and its standard deviations to 0 the same way the analysis always has.
+#   pixel_dimension_of_image, length_in_micrometers - optional. Left empty they are read from the header of a binary export,
+#                       or default to 512 and 6 for a csv export.
+#
+# Every scan goes through:
+# LoadGwyddionExport() -> SplitDataMatrixIntoRows() -> ExtractImageIntermediates() (the minima, diameters and heights, see grain_intermediate_store.py)
+#                      -> CalculateGrainStatisticsFromIntermediates() (the Calculate*() statistics, worked out on the flat diameters and heights)
+# and comes out as one row of the results table (a list of dictionaries, one per manifest line, in manifest order).
+# With an "intermediate_folder" the intermediates of every scan are saved there as well, and scans whose intermediates are already saved are not loaded at all.
+#
+# Every scan is independent, so RunGrainAnalysisBatch() can spread them over a pool of worker processes ("number_of_workers").
+# Only the manifest entries (paths and settings) are sent to the workers and only the results rows come back. Each worker reads its
+# own matrix through the memory-mapped .npy cache of LoadGwyddionExport(), so no height data is ever pickled between processes.
+# The results table comes back in manifest order whatever order the workers finish in.
+#
+# Run from the command line with "python grain_batch_driver.py grain_analysis_manifest.csv grain_analysis_results.csv --workers 8".
+# Add --noise-robust (and optionally --smoothing-width, --minimum-prominence, --minimum-width) to leave out the single pixel noise wiggles
+# when finding the extrema, see FindProminentExtremaOfAllCrossSections() in grain_analysis_functions.py,
+# and --sub-pixel parabola to measure the diameters between sub-pixel minima instead of whole pixels.
+# Add --intermediate-folder to keep the intermediates of every scan for later statistics.
+# Add --dtype float32 to load and search the height data in single precision, see processing_dtypes below.
+# Add --profile (or --profile report.json) to time every stage of every scan, see grain_profiling.py.
+#
+
+import argparse
+import concurrent.futures
+import csv
+import functools
+import os
+import numpy as np
+
+from grain_data_loader import LoadGwyddionExport, IsGrainBinaryExport, ReadGrainBinaryExportHeader
+from grain_analysis_functions import default_noise_robust_detection_settings, SplitDataMatrixIntoRows
+from grain_profiling import ProfileStage, RunWithProfilingInWorker, GetProfilingSettings, AddProfilingRecords, AddProfilingArguments, ReadProfilingArguments, FinishProfiling
+from grain_intermediate_store import (ExtractImageIntermediates, CalculateGrainStatisticsFromIntermediates, GetIntermediatePathForManifestEntry,
+                                      SaveImageIntermediates, LoadIntermediatesOfManifestEntry)
+
+
+placeholder_value_for_time_zero = 0.000001
+default_pixel_dimension_of_image = 512
+default_length_in_micrometers = 6
+
+# The dtypes the height data can be loaded, split and searched for extrema in ("processing_dtype"). AFM heights in nm carry far fewer significant
+# digits than float32 holds, and float32 halves the memory and bandwidth of every matrix (a binary float32 export is then used without any copy).
+# The statistics are summed in float64 whatever the processing dtype. float32 can round two neighbouring z-values to the same number, which
+# turns an extremum into a plateau, so a few extrema in a scan can come and go, see BenchmarkProcessingDtypes() in benchmark_grain_analysis.py.
+processing_dtypes = {'float64': np.float64, 'float32': np.float32}
+default_processing_dtype = np.float64
+
+results_table_columns = ['molecule', 'time_in_minutes', 'file_path',
+                         'mean_diameter', 'std_diameter', 'max_average_diameter', 'max_std_diameter', 'min_average_diameter', 'min_std_diameter',
+                         'mean_height', 'std_height', 'max_average_height', 'max_std_height', 'min_average_height', 'min_std_height']
+
+
+# Expected input: Path to a manifest csv (see the top of this file).
+# Expected Output: List of dictionaries, one per manifest line, with 'molecule', 'time_in_minutes' (float), 'file_path' (absolute, or None for t=0),
+# 'pixel_dimension_of_image' (int) and 'length_in_micrometers' (float), both None when the manifest leaves them empty.
+def ReadGrainAnalysisManifest(manifest_path):
+    manifest_folder = os.path.dirname(os.path.abspath(manifest_path))
+    manifest_entries = list()
+    with open(manifest_path, newline='') as manifest_file:
+        manifest_reader = csv.DictReader(manifest_file)
+        missing_columns = {'molecule', 'time_in_minutes', 'file_path'} - set(manifest_reader.fieldnames or [])
+        if missing_columns:
+            raise ValueError("Manifest {} is missing the column(s) {}.".format(manifest_path, ", ".join(sorted(missing_columns))))
+        for line_number, each_line in enumerate(manifest_reader, start=2):
+            file_path = (each_line['file_path'] or '').strip()
+            try:
+                manifest_entries.append({
+                    'molecule': each_line['molecule'].strip(),
+                    'time_in_minutes': float(each_line['time_in_minutes']),
+                    'file_path': os.path.join(manifest_folder, file_path) if file_path else None,
+                    'pixel_dimension_of_image': int(each_line['pixel_dimension_of_image']) if each_line.get('pixel_dimension_of_image') else None,
+                    'length_in_micrometers': float(each_line['length_in_micrometers']) if each_line.get('length_in_micrometers') else None,
+                })
+            except (TypeError, ValueError):
+                raise ValueError("Line {} of manifest {} could not be read.".format(line_number, manifest_path))
+    return manifest_entries
+
+# Expected input: One entry from ReadGrainAnalysisManifest() that has a file.
+# Expected Output: The pixel dimension and length in micrometers to analyse it with: the manifest's own values first, then the header of a binary export,
+# then the defaults of 512 and 6.
+def ResolveImageDimensions(manifest_entry):
+    pixel_dimension_of_image = manifest_entry['pixel_dimension_of_image']
+    length_in_micrometers = manifest_entry['length_in_micrometers']
+    if (pixel_dimension_of_image is None or length_in_micrometers is None) and IsGrainBinaryExport(manifest_entry['file_path']):
+        header = ReadGrainBinaryExportHeader(manifest_entry['file_path'])
+        if pixel_dimension_of_image is None:
+            pixel_dimension_of_image = header['columns']
+        if length_in_micrometers is None:
+            length_in_micrometers = header['length_in_micrometers']
+    if pixel_dimension_of_image is None:
+        pixel_dimension_of_image = default_pixel_dimension_of_image
+    if length_in_micrometers is None:
+        length_in_micrometers = default_length_in_micrometers
+    return pixel_dimension_of_image, length_in_micrometers
+
+# Expected input: One entry from ReadGrainAnalysisManifest(), pass "detection_settings" to use the noise-robust extrema detection
+# (see FindProminentExtremaOfAllCrossSections()), defaulted to None which counts every relative extremum,
+# and "parabola" or "centroid" as "sub_pixel_refinement" to measure the diameters between sub-pixel minima (see RefineExtremaLocationsToSubPixel()).
+# Pass an "intermediate_folder" to save the intermediates of the scan there, or to reuse the ones saved by an earlier run,
+# and np.float32 as "processing_dtype" to load and search the scan in single precision (see processing_dtypes).
+# Expected Output: Dictionary holding one row of the results table (see results_table_columns).
+def RunGrainAnalysisPipelineOnImage(manifest_entry, detection_settings=None, sub_pixel_refinement=None, intermediate_folder=None,
+                                    processing_dtype=default_processing_dtype):
+    results_row = {'molecule': manifest_entry['molecule'], 'time_in_minutes': manifest_entry['time_in_minutes'], 'file_path': manifest_entry['file_path']}
+    if manifest_entry['file_path'] is None:
+        results_row.update({'mean_diameter': placeholder_value_for_time_zero, 'std_diameter': 0,
+                            'max_average_diameter': placeholder_value_for_time_zero, 'max_std_diameter': 0,
+                            'min_average_diameter': placeholder_value_for_time_zero, 'min_std_diameter': 0,
+                            'mean_height': placeholder_value_for_time_zero, 'std_height': 0,
+                            'max_average_height': placeholder_value_for_time_zero, 'max_std_height': 0,
+                            'min_average_height': placeholder_value_for_time_zero, 'min_std_height': 0})
+        return results_row
+
+    with ProfileStage('pipeline', manifest_entry['file_path']):
+        image_intermediates = None
+        if intermediate_folder is not None:
+            with ProfileStage('load_intermediates'):
+                image_intermediates = LoadIntermediatesOfManifestEntry(intermediate_folder, manifest_entry, detection_settings, sub_pixel_refinement,
+                                                                       processing_dtype)
+        if image_intermediates is None:
+            pixel_dimension_of_image, length_in_micrometers = ResolveImageDimensions(manifest_entry)
+            with ProfileStage('load') as stage_record:
+                raw_data = LoadGwyddionExport(manifest_entry['file_path'], processing_dtype)
+                stage_record['items'] = len(raw_data)
+            with ProfileStage('split') as stage_record:
+                data_matrix_divided = SplitDataMatrixIntoRows(raw_data, pixel_dimension_of_image)
+                stage_record['items'] = data_matrix_divided.shape[0]
+            image_intermediates = ExtractImageIntermediates(data_matrix_divided, length_in_micrometers, pixel_dimension_of_image, detection_settings, sub_pixel_refinement)
+            if intermediate_folder is not None:
+                with ProfileStage('save_intermediates'):
+                    SaveImageIntermediates(image_intermediates, GetIntermediatePathForManifestEntry(intermediate_folder, manifest_entry, detection_settings,
+                                                                                                    sub_pixel_refinement, processing_dtype),
+                                           manifest_entry['file_path'])
+        with ProfileStage('statistics') as stage_record:
+            results_row.update(CalculateGrainStatisticsFromIntermediates(image_intermediates))
+            stage_record['items'] = len(image_intermediates['diameters']) + len(image_intermediates['heights'])
+    return results_row
+
+# Expected input: The same as RunGrainAnalysisPipelineOnImage().
+# Expected Output: Its results row, or when the scan cannot be read or split (OSError or ValueError) a row with only 'molecule', 'time_in_minutes',
+# 'file_path' and the 'error' message, so one bad scan does not stop the rest of a batch.
+def RunGrainAnalysisPipelineOnImageOrReportError(manifest_entry, detection_settings=None, sub_pixel_refinement=None, intermediate_folder=None,
+                                                 processing_dtype=default_processing_dtype):
+    try:
+        return RunGrainAnalysisPipelineOnImage(manifest_entry, detection_settings, sub_pixel_refinement, intermediate_folder, processing_dtype)
+    except (OSError, ValueError) as error:
+        return {'molecule': manifest_entry['molecule'], 'time_in_minutes': manifest_entry['time_in_minutes'], 'file_path': manifest_entry['file_path'],
+                'error': str(error)}
+
+# Expected input: Output from ReadGrainAnalysisManifest(), pass the number of worker processes to spread the scans over,
+# defaulted to 1 (every scan is run in this process). None uses one worker per CPU core.
+# "detection_settings", "sub_pixel_refinement", "intermediate_folder" and "processing_dtype" are passed on to RunGrainAnalysisPipelineOnImage() for every scan.
+# Pass "report_errors" as True to get the row of RunGrainAnalysisPipelineOnImageOrReportError() for a scan that fails instead of the whole batch raising.
+# Expected Output: Results table, a list with one dictionary per manifest entry in manifest order.
+def RunGrainAnalysisBatch(manifest_entries, number_of_workers=1, detection_settings=None, sub_pixel_refinement=None, intermediate_folder=None,
+                          processing_dtype=default_processing_dtype, report_errors=False):
+    if number_of_workers is None:
+        number_of_workers = os.cpu_count() or 1
+    if type(number_of_workers) != int or number_of_workers < 1:
+        raise ValueError("Number of workers must be a positive integer.")
+    if np.dtype(processing_dtype).name not in processing_dtypes:
+        raise ValueError("Processing dtype must be one of {}, not {}.".format(", ".join(processing_dtypes), np.dtype(processing_dtype).name))
+
+    run_pipeline_on_image = functools.partial(RunGrainAnalysisPipelineOnImageOrReportError if report_errors else RunGrainAnalysisPipelineOnImage,
+                                              detection_settings=detection_settings, sub_pixel_refinement=sub_pixel_refinement,
+                                              intermediate_folder=intermediate_folder, processing_dtype=processing_dtype)
+    number_of_workers = min(number_of_workers, len(manifest_entries))
+    if number_of_workers <= 1:
+        return [run_pipeline_on_image(each_manifest_entry) for each_manifest_entry in manifest_entries]
+
+    # Hand the entries out a few at a time so short t=0 entries and small scans do not each cost a round trip to a worker.
+    # While profiling, every results row comes back with the profiling records of its scan.
+    entries_per_task = max(1, len(manifest_entries)//(number_of_workers*4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=number_of_workers) as process_pool:
+        results_table = list()
+        for results_row, profiling_records in process_pool.map(functools.partial(RunWithProfilingInWorker, GetProfilingSettings(), run_pipeline_on_image),
+                                                               manifest_entries, chunksize=entries_per_task):
+            AddProfilingRecords(profiling_records)
+            results_table.append(results_row)
+        return results_table
+
+# Expected input: Output from RunGrainAnalysisBatch(), the molecule to pick (for example 'C3') and a column of the results table.
+# Expected Output: Numpy array of that column for every time point of the molecule, sorted by time, ready to be plotted against the 'time_in_minutes' column.
+def SelectResultsSeries(results_table, molecule, column):
+    rows_of_molecule = sorted((each_row for each_row in results_table if each_row['molecule'] == molecule), key=lambda each_row: each_row['time_in_minutes'])
+    if not rows_of_molecule:
+        raise KeyError("No results for molecule {}.".format(molecule))
+    return np.array([each_row[column] for each_row in rows_of_molecule])
+
+# Expected input: Output from RunGrainAnalysisBatch() and the path of the csv file to write.
+# Expected Output: None, writes the results table as a csv with one line per scan.
+def WriteGrainAnalysisResultsTable(results_table, results_path):
+    with open(results_path, 'w', newline='') as results_file:
+        results_writer = csv.DictWriter(results_file, fieldnames=results_table_columns, extrasaction='ignore')
+        results_writer.writeheader()
+        for each_row in results_table:
+            results_writer.writerow({column: ('' if each_row[column] is None else each_row[column]) for column in results_table_columns})
+
+# Expected input: Path of a results csv written by WriteGrainAnalysisResultsTable().
+# Expected Output: The results table it holds, the same list of dictionaries RunGrainAnalysisBatch() gave (file_path None for the t=0 lines).
+def ReadGrainAnalysisResultsTable(results_path):
+    results_table = list()
+    with open(results_path, newline='') as results_file:
+        results_reader = csv.DictReader(results_file)
+        missing_columns = set(results_table_columns) - set(results_reader.fieldnames or [])
+        if missing_columns:
+            raise ValueError("Results table {} is missing the column(s) {}.".format(results_path, ", ".join(sorted(missing_columns))))
+        for line_number, each_line in enumerate(results_reader, start=2):
+            try:
+                results_row = {column: (float(each_line[column]) if each_line[column] != '' else None) for column in results_table_columns[3:]}
+                results_row.update({'molecule': each_line['molecule'], 'time_in_minutes': float(each_line['time_in_minutes']), 'file_path': each_line['file_path'] or None})
+            except ValueError:
+                raise ValueError("Line {} of results table {} could not be read.".format(line_number, results_path))
+            results_table.append(results_row)
+    return results_table
+
+# Expected input: An argparse.ArgumentParser.
+# Expected Output: None, adds the --noise-robust, --smoothing-width, --minimum-prominence, --minimum-width, --sub-pixel and --dtype options to it.
+def AddDetectionArguments(argument_parser):
+    argument_parser.add_argument('--noise-robust', action='store_true', help="skip noise wiggles when finding extrema (default_noise_robust_detection_settings)")
+    argument_parser.add_argument('--smoothing-width', type=int, help="gaussian smoothing width in pixels for --noise-robust")
+    argument_parser.add_argument('--minimum-prominence', type=float, help="minimum prominence in nm for --noise-robust")
+    argument_parser.add_argument('--minimum-width', type=float, help="minimum width in pixels at half prominence for --noise-robust")
+    argument_parser.add_argument('--sub-pixel', choices=['parabola', 'centroid'], help="measure diameters between sub-pixel minima")
+    argument_parser.add_argument('--dtype', choices=list(processing_dtypes), default=np.dtype(default_processing_dtype).name,
+                                 help="dtype the height data is loaded and searched in, statistics are always summed in float64 (default float64)")
+
+# Expected input: Arguments parsed by a parser that went through AddDetectionArguments().
+# Expected Output: The "detection_settings" (None unless a noise-robust option was given), "sub_pixel_refinement" and "processing_dtype" to pass to RunGrainAnalysisBatch().
+def ReadDetectionArguments(arguments):
+    detection_settings = None
+    if arguments.noise_robust or arguments.smoothing_width is not None or arguments.minimum_prominence is not None or arguments.minimum_width is not None:
+        detection_settings = dict(default_noise_robust_detection_settings)
+        for setting, value in (('smoothing_width_in_pixels', arguments.smoothing_width), ('minimum_prominence', arguments.minimum_prominence),
+                               ('minimum_width_in_pixels', arguments.minimum_width)):
+            if value is not None:
+                detection_settings[setting] = value
+    return detection_settings, arguments.sub_pixel, processing_dtypes[arguments.dtype]
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Run the grain analysis pipeline over every scan in a manifest.")
+    argument_parser.add_argument('manifest_path', help="csv with molecule, time_in_minutes and file_path columns")
+    argument_parser.add_argument('results_path', help="csv file the results table is written to")
+    argument_parser.add_argument('--workers', type=int, default=1, help="number of worker processes, 0 for one per CPU core (default 1)")
+    argument_parser.add_argument('--intermediate-folder', help="folder the minima, diameters and heights of every scan are saved in (see grain_intermediate_store.py)")
+    AddDetectionArguments(argument_parser)
+    AddProfilingArguments(argument_parser)
+    arguments = argument_parser.parse_args()
+    detection_settings, sub_pixel_refinement, processing_dtype = ReadDetectionArguments(arguments)
+    ReadProfilingArguments(arguments)
+
+    grain_analysis_results = RunGrainAnalysisBatch(ReadGrainAnalysisManifest(arguments.manifest_path), arguments.workers or None,
+                                                   detection_settings, sub_pixel_refinement, arguments.intermediate_folder, processing_dtype)
+    WriteGrainAnalysisResultsTable(grain_analysis_results, arguments.results_path)
+    print("Success! Results for {} scans written to {}.".format(len(grain_analysis_results), arguments.results_path))
+    FinishProfiling()
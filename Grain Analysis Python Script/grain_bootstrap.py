@@ -0,0 +1,162 @@
+# Block Bootstrap Confidence Intervals
+# This is used to put a confidence interval on the average grain diameter and height of an image, in place of the standard deviation error bars.
+#
+# Neighbouring cross sections run through the same grains, so the diameters and heights of nearby rows are strongly correlated and the rows are not
+# independent samples. Resampling single rows (or single grains) would make the interval far too narrow. The moving block bootstrap resamples runs of
+# "block_length_in_rows" neighbouring rows instead, which keeps the correlation inside each block. By default the blocks are as long as the average
+# grain diameter in pixels, the distance over which neighbouring rows still cross the same grains.
+#
+# Every row is first reduced to the sum and the number of its values (the row sums and counts). The mean of a resample is then the sum of its
+# blocks' sums over the sum of their counts, the same pooled mean CalculateAverageAndStandardDeviation_GrainDiameter() takes. With running totals of the
+# row sums every block costs two lookups, so thousands of replicates are drawn and summed as one array of block start rows, a batch at a time.
+# BootstrapConfidenceIntervalsOfImages() spreads the images over a pool of worker processes, each image gets its own random stream so the
+# intervals are the same whatever the number of workers.
+#
+# The intervals are worked out from the intermediates of grain_intermediate_store.py, the raw height matrices are not needed.
+# Run from the command line with "python grain_bootstrap.py grain_analysis_manifest.csv intermediates grain_analysis_intervals.csv --workers 8",
+# the intermediates of any scan not in the folder yet are worked out first.
+#
+# Pipeline:
+# ExtractImageIntermediates() / LoadIntermediatesOfManifestEntry() -> CalculateRowSumsAndCounts() -> BlockBootstrapMeans() -> CalculatePercentileConfidenceInterval()
+#
+
+import argparse
+import concurrent.futures
+import csv
+import os
+import numpy as np
+
+from grain_batch_driver import ReadGrainAnalysisManifest, RunGrainAnalysisBatch, AddDetectionArguments, ReadDetectionArguments
+from grain_intermediate_store import LoadIntermediatesOfManifestEntry
+
+
+default_number_of_replicates = 10000
+default_confidence_level = 0.95
+default_number_of_block_starts_per_batch = 4*1024*1024
+
+interval_table_columns = ['molecule', 'time_in_minutes', 'file_path', 'block_length_in_rows',
+                          'mean_diameter', 'diameter_lower_bound', 'diameter_upper_bound', 'mean_height', 'height_lower_bound', 'height_upper_bound']
+
+
+# Expected input: A row offsets array and the flat values it belongs to, for example image_intermediates['diameter_row_offsets'] and image_intermediates['diameters'].
+# Expected Output: Two float64 arrays with one entry per cross section, the sum of its values and the number of them.
+def CalculateRowSumsAndCounts(row_offsets, values):
+    row_offsets = np.asarray(row_offsets)
+    number_of_values_in_each_row = np.diff(row_offsets)
+    row_of_each_value = np.repeat(np.arange(len(number_of_values_in_each_row)), number_of_values_in_each_row)
+    row_sums = np.bincount(row_of_each_value, weights=np.asarray(values, dtype=np.float64), minlength=len(number_of_values_in_each_row))
+    return row_sums, number_of_values_in_each_row.astype(np.float64)
+
+# Expected input: Output from CalculateRowSumsAndCounts(), the number of neighbouring rows in each block, the number of bootstrap replicates
+# and a numpy random generator (np.random.default_rng(), defaulted to a new unseeded one).
+# Expected Output: Float64 array with the pooled mean of every replicate. Each replicate is made of enough blocks, starting at random rows, to cover as many rows as the image has.
+# A replicate whose blocks hold no values at all is nan.
+def BlockBootstrapMeans(row_sums, row_counts, block_length_in_rows, number_of_replicates=default_number_of_replicates, random_generator=None,
+                        number_of_block_starts_per_batch=default_number_of_block_starts_per_batch):
+    number_of_rows = len(row_sums)
+    block_length_in_rows = int(min(max(block_length_in_rows, 1), number_of_rows))
+    if number_of_rows == 0:
+        raise ValueError("There are no cross sections to resample.")
+    if random_generator is None:
+        random_generator = np.random.default_rng()
+
+    # Running totals with a leading 0, the sum of rows [i, i+L) is running_sums[i+L] - running_sums[i].
+    running_sums = np.concatenate(([0.0], np.cumsum(row_sums)))
+    running_counts = np.concatenate(([0.0], np.cumsum(row_counts)))
+    block_sums = running_sums[block_length_in_rows:] - running_sums[:-block_length_in_rows]
+    block_counts = running_counts[block_length_in_rows:] - running_counts[:-block_length_in_rows]
+
+    number_of_blocks_per_replicate = -(-number_of_rows//block_length_in_rows)
+    replicates_per_batch = max(1, number_of_block_starts_per_batch//number_of_blocks_per_replicate)
+    replicate_means = np.empty(number_of_replicates, dtype=np.float64)
+    for first_replicate in range(0, number_of_replicates, replicates_per_batch):
+        number_of_replicates_in_batch = min(replicates_per_batch, number_of_replicates - first_replicate)
+        block_starts = random_generator.integers(0, len(block_sums), size=(number_of_replicates_in_batch, number_of_blocks_per_replicate))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            replicate_means[first_replicate:first_replicate + number_of_replicates_in_batch] = block_sums[block_starts].sum(axis=1)/block_counts[block_starts].sum(axis=1)
+    return replicate_means
+
+# Expected input: Output from BlockBootstrapMeans() and the confidence level, defaulted to 0.95.
+# Expected Output: Two floats, the lower and upper bound of the percentile confidence interval. nan replicates are left out.
+def CalculatePercentileConfidenceInterval(replicate_means, confidence_level=default_confidence_level):
+    if not 0 < confidence_level < 1:
+        raise ValueError("Confidence level must be between 0 and 1, for example 0.95.")
+    lower_bound, upper_bound = np.nanpercentile(replicate_means, [50*(1 - confidence_level), 50*(1 + confidence_level)])
+    return lower_bound, upper_bound
+
+# Expected input: Output from ExtractImageIntermediates() or LoadImageIntermediates().
+# Expected Output: The default block length, the average grain diameter in whole pixels (rounded up, at least 1 row).
+def CalculateDefaultBlockLengthInRows(image_intermediates):
+    if len(image_intermediates['diameters']) == 0:
+        return 1
+    scaling_factor = image_intermediates['length_in_micrometers']/image_intermediates['pixel_dimension_of_image']
+    return max(1, int(np.ceil(np.mean(image_intermediates['diameters'])/scaling_factor)))
+
+# Expected input: Output from ExtractImageIntermediates() or LoadImageIntermediates(). Optionally the number of replicates, the confidence level,
+# the block length (None for CalculateDefaultBlockLengthInRows()) and a seed or numpy random generator.
+# Expected Output: Dictionary with the 'block_length_in_rows' used and, for the average grain diameter and height, the 'mean_diameter'/'mean_height' of the image and the
+# lower and upper bound of its confidence interval ('diameter_lower_bound', 'diameter_upper_bound', 'height_lower_bound', 'height_upper_bound').
+def BlockBootstrapConfidenceIntervalsOfImage(image_intermediates, number_of_replicates=default_number_of_replicates, confidence_level=default_confidence_level,
+                                             block_length_in_rows=None, seed=None):
+    random_generator = np.random.default_rng(seed)
+    if block_length_in_rows is None:
+        block_length_in_rows = CalculateDefaultBlockLengthInRows(image_intermediates)
+    confidence_intervals = {'block_length_in_rows': block_length_in_rows}
+    for name, row_offsets, values in (('diameter', image_intermediates['diameter_row_offsets'], image_intermediates['diameters']),
+                                      ('height', image_intermediates['maxima_row_offsets'], image_intermediates['heights'])):
+        row_sums, row_counts = CalculateRowSumsAndCounts(row_offsets, values)
+        replicate_means = BlockBootstrapMeans(row_sums, row_counts, block_length_in_rows, number_of_replicates, random_generator)
+        confidence_intervals['mean_' + name] = row_sums.sum()/row_counts.sum() if row_counts.sum() > 0 else np.nan
+        confidence_intervals[name + '_lower_bound'], confidence_intervals[name + '_upper_bound'] = CalculatePercentileConfidenceInterval(replicate_means, confidence_level)
+    return confidence_intervals
+
+# Expected input: List of outputs from ExtractImageIntermediates() or LoadImageIntermediates(), the options of BlockBootstrapConfidenceIntervalsOfImage(),
+# a seed for the whole list and the number of worker processes (None for one per CPU core), defaulted to 1.
+# Expected Output: List with the output of BlockBootstrapConfidenceIntervalsOfImage() for every image, in the same order.
+# Every image gets its own random stream spawned from "seed", so the intervals do not depend on the number of workers.
+def BootstrapConfidenceIntervalsOfImages(list_of_image_intermediates, number_of_replicates=default_number_of_replicates, confidence_level=default_confidence_level,
+                                         block_length_in_rows=None, seed=0, number_of_workers=1):
+    seeds_of_each_image = np.random.SeedSequence(seed).spawn(len(list_of_image_intermediates))
+    arguments_of_each_image = [(each_image_intermediates, number_of_replicates, confidence_level, block_length_in_rows, each_seed)
+                               for each_image_intermediates, each_seed in zip(list_of_image_intermediates, seeds_of_each_image)]
+    if number_of_workers is None:
+        number_of_workers = os.cpu_count() or 1
+    number_of_workers = min(number_of_workers, len(arguments_of_each_image))
+    if number_of_workers <= 1:
+        return [BlockBootstrapConfidenceIntervalsOfImage(*each_arguments) for each_arguments in arguments_of_each_image]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=number_of_workers) as process_pool:
+        return list(process_pool.map(BlockBootstrapConfidenceIntervalsOfImage, *zip(*arguments_of_each_image)))
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Block bootstrap confidence intervals of the average grain diameter and height of every scan in a manifest.")
+    argument_parser.add_argument('manifest_path', help="csv with molecule, time_in_minutes and file_path columns")
+    argument_parser.add_argument('intermediate_folder', help="folder of intermediates from grain_batch_driver.py --intermediate-folder, missing ones are worked out")
+    argument_parser.add_argument('intervals_path', help="csv file the confidence intervals are written to")
+    argument_parser.add_argument('--replicates', type=int, default=default_number_of_replicates, help="number of bootstrap replicates (default 10000)")
+    argument_parser.add_argument('--confidence-level', type=float, default=default_confidence_level, help="confidence level of the intervals (default 0.95)")
+    argument_parser.add_argument('--block-length', type=int, help="rows in each block (default the average grain diameter in pixels)")
+    argument_parser.add_argument('--seed', type=int, default=0, help="seed of the random resampling (default 0)")
+    argument_parser.add_argument('--workers', type=int, default=1, help="number of worker processes, 0 for one per CPU core (default 1)")
+    AddDetectionArguments(argument_parser)
+    arguments = argument_parser.parse_args()
+    detection_settings, sub_pixel_refinement, processing_dtype = ReadDetectionArguments(arguments)
+
+    manifest_entries = [each_manifest_entry for each_manifest_entry in ReadGrainAnalysisManifest(arguments.manifest_path) if each_manifest_entry['file_path'] is not None]
+    RunGrainAnalysisBatch([each_manifest_entry for each_manifest_entry in manifest_entries
+                           if LoadIntermediatesOfManifestEntry(arguments.intermediate_folder, each_manifest_entry, detection_settings, sub_pixel_refinement,
+                                                               processing_dtype) is None],
+                          arguments.workers or None, detection_settings, sub_pixel_refinement, arguments.intermediate_folder, processing_dtype)
+    list_of_image_intermediates = [LoadIntermediatesOfManifestEntry(arguments.intermediate_folder, each_manifest_entry, detection_settings, sub_pixel_refinement,
+                                                                    processing_dtype)
+                                   for each_manifest_entry in manifest_entries]
+    confidence_intervals = BootstrapConfidenceIntervalsOfImages(list_of_image_intermediates, arguments.replicates, arguments.confidence_level,
+                                                                arguments.block_length, arguments.seed, arguments.workers or None)
+
+    with open(arguments.intervals_path, 'w', newline='') as intervals_file:
+        intervals_writer = csv.DictWriter(intervals_file, fieldnames=interval_table_columns)
+        intervals_writer.writeheader()
+        for each_manifest_entry, each_confidence_interval in zip(manifest_entries, confidence_intervals):
+            intervals_writer.writerow(dict(each_confidence_interval, molecule=each_manifest_entry['molecule'], time_in_minutes=each_manifest_entry['time_in_minutes'],
+                                           file_path=each_manifest_entry['file_path']))
+    print("Success! Confidence intervals for {} scans written to {}.".format(len(manifest_entries), arguments.intervals_path))
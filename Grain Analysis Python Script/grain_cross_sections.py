@@ -0,0 +1,120 @@
+# Grain Cross Sections At Any Angle
+# This is used to take cross sections of an exported height matrix in any direction, not only along the rows the Pygwy script exports,
+# so grain diameters can be measured column-wise or at any angle (and the isotropy of the grains checked) without going back to Gwyddion.
+#
+# Cross sections at an angle are sampled along many parallel lines at once with bilinear interpolation: every sample position of a block
+# of lines is worked out as one array and looked up in the matrix with fancy indexing, there is no Python loop over lines or pixels.
+# Samples are taken one pixel apart along each line, so the output can go straight into the functions of grain_analysis_functions.py
+# with the same length_in_micrometers and pixel_dimension_of_image as the rows of the same image.
+# Lines at an angle do not all have the same length inside the image, the samples of a line that fall outside the image are nan. A comparison
+# with nan is always False, so no relative extremum is ever found next to the edge of the image, the same way the first and last pixel of a row are skipped.
+#
+# Angles are in degrees, measured from the rows towards increasing row number: 0 gives the rows, 90 the columns. Multiples of 90 are taken straight
+# from the matrix without interpolation.
+#
+# Pipeline:
+# SplitDataMatrixIntoRows() -> ExtractCrossSectionsAtAngle() -> ExtractDistancesBetweenRelativeMinima_GrainDiameter() / ExtractHeightOfRelativeMaxima_GrainHeight() -> Calculate*()
+#                           -> CalculateGrainDiameterAtAngles() for the isotropy of one image
+#
+
+import numpy as np
+from grain_analysis_functions import ExtractDistancesBetweenRelativeMinima_GrainDiameter, CalculateAverageAndStandardDeviation_GrainDiameter
+
+
+default_number_of_samples_per_block = 4*1024*1024
+
+
+# Expected input: Output from SplitDataMatrixIntoRows().
+# Expected Output: 2D array with one column-wise cross section per row. It is a transposed view of "data_matrix", nothing is copied.
+def SplitDataMatrixIntoColumns(data_matrix):
+    data_matrix = np.asarray(data_matrix)
+    if data_matrix.ndim != 2:
+        raise ValueError("Data matrix must be 2D, the output from SplitDataMatrixIntoRows().")
+    return data_matrix.T
+
+# Expected input: Output from SplitDataMatrixIntoRows() and the angle of the cross sections in degrees.
+# Pass "line_spacing_in_pixels" to space the parallel lines further apart, defaulted to 1 (one line per pixel, like the rows).
+# Lines shorter than "minimum_length_in_pixels" inside the image (the ones that only clip a corner) are left out, defaulted to half the shorter side of the image.
+# Expected Output: 2D array with one cross section per row, samples one pixel apart and nan outside the image, in the floating point dtype of "data_matrix".
+def ExtractCrossSectionsAtAngle(data_matrix, angle_in_degrees, line_spacing_in_pixels=1, minimum_length_in_pixels=None,
+                                number_of_samples_per_block=default_number_of_samples_per_block):
+    data_matrix = np.asarray(data_matrix)
+    if data_matrix.ndim != 2 or min(data_matrix.shape) < 2:
+        raise ValueError("Data matrix must be 2D with at least two rows and two columns.")
+    if line_spacing_in_pixels <= 0:
+        raise ValueError("Line spacing must be a positive number of pixels.")
+    if angle_in_degrees % 180 == 0:
+        return data_matrix[::max(1, int(round(line_spacing_in_pixels)))]
+    if angle_in_degrees % 180 == 90:
+        return SplitDataMatrixIntoColumns(data_matrix)[::max(1, int(round(line_spacing_in_pixels)))]
+
+    number_of_rows, number_of_columns = data_matrix.shape
+    if minimum_length_in_pixels is None:
+        minimum_length_in_pixels = min(number_of_rows, number_of_columns)/2
+    output_dtype = data_matrix.dtype if np.issubdtype(data_matrix.dtype, np.floating) else np.float64
+
+    # Every line runs through the image along "direction", the lines are stacked along "normal". Positions are (column, row).
+    angle_in_radians = np.deg2rad(angle_in_degrees)
+    direction = np.array([np.cos(angle_in_radians), np.sin(angle_in_radians)])
+    normal = np.array([-np.sin(angle_in_radians), np.cos(angle_in_radians)])
+    centre = np.array([(number_of_columns - 1)/2, (number_of_rows - 1)/2])
+    half_diagonal = np.hypot(number_of_columns - 1, number_of_rows - 1)/2
+    line_offsets = np.arange(-half_diagonal, half_diagonal + line_spacing_in_pixels/2, line_spacing_in_pixels)
+    sample_offsets = np.arange(-np.floor(half_diagonal), np.floor(half_diagonal) + 1)
+
+    # Work out where each line enters and leaves the image first, so only the lines long enough to keep are sampled
+    # and the samples that are outside every line are cut off the ends.
+    starts_and_ends = []
+    for axis, size_along_axis in ((0, number_of_columns), (1, number_of_rows)):
+        line_starts = centre[axis] + line_offsets*normal[axis]
+        if abs(direction[axis]) < 1e-12:
+            inside = (line_starts >= 0) & (line_starts <= size_along_axis - 1)
+            starts_and_ends.append((np.where(inside, -np.inf, np.inf), np.where(inside, np.inf, -np.inf)))
+        else:
+            first_crossing = (0 - line_starts)/direction[axis]
+            second_crossing = (size_along_axis - 1 - line_starts)/direction[axis]
+            starts_and_ends.append((np.minimum(first_crossing, second_crossing), np.maximum(first_crossing, second_crossing)))
+    line_start = np.maximum(starts_and_ends[0][0], starts_and_ends[1][0])
+    line_end = np.minimum(starts_and_ends[0][1], starts_and_ends[1][1])
+    long_enough = line_end - line_start >= minimum_length_in_pixels
+    line_offsets = line_offsets[long_enough]
+    if len(line_offsets) == 0:
+        return np.empty((0, len(sample_offsets)), dtype=output_dtype)
+    used_samples = (sample_offsets >= np.floor(line_start[long_enough].min()) - 1) & (sample_offsets <= np.ceil(line_end[long_enough].max()) + 1)
+    sample_offsets = sample_offsets[used_samples]
+
+    cross_sections = np.empty((len(line_offsets), len(sample_offsets)), dtype=output_dtype)
+    lines_per_block = max(1, number_of_samples_per_block//len(sample_offsets))
+    for first_line in range(0, len(line_offsets), lines_per_block):
+        block_offsets = line_offsets[first_line:first_line + lines_per_block, np.newaxis]
+        column_positions = centre[0] + block_offsets*normal[0] + sample_offsets*direction[0]
+        row_positions = centre[1] + block_offsets*normal[1] + sample_offsets*direction[1]
+        # Positions within a rounding error of the edge count as on it.
+        inside_image = ((column_positions > -1e-9) & (column_positions < number_of_columns - 1 + 1e-9)
+                        & (row_positions > -1e-9) & (row_positions < number_of_rows - 1 + 1e-9))
+        column_positions = np.clip(column_positions, 0, number_of_columns - 1)
+        row_positions = np.clip(row_positions, 0, number_of_rows - 1)
+
+        # The pixel to the upper left of every sample, kept one short of the last row/column so its neighbours are always inside the matrix.
+        left_columns = np.clip(np.floor(column_positions).astype(np.intp), 0, number_of_columns - 2)
+        upper_rows = np.clip(np.floor(row_positions).astype(np.intp), 0, number_of_rows - 2)
+        column_fractions = column_positions - left_columns
+        row_fractions = row_positions - upper_rows
+        upper_z_values = data_matrix[upper_rows, left_columns]*(1 - column_fractions) + data_matrix[upper_rows, left_columns + 1]*column_fractions
+        lower_z_values = data_matrix[upper_rows + 1, left_columns]*(1 - column_fractions) + data_matrix[upper_rows + 1, left_columns + 1]*column_fractions
+        block_z_values = upper_z_values*(1 - row_fractions) + lower_z_values*row_fractions
+        block_z_values[~inside_image] = np.nan
+        cross_sections[first_line:first_line + len(block_offsets)] = block_z_values
+    return cross_sections
+
+# Expected input: Output from SplitDataMatrixIntoRows(), the angles to measure at in degrees,
+# and the same length_in_micrometers and pixel_dimension_of_image as passed to ExtractDistancesBetweenRelativeMinima_GrainDiameter().
+# Expected Output: Dictionary of angle -> (average grain diameter, standard deviation) measured along cross sections at that angle.
+# An isotropic surface gives about the same diameter at every angle.
+def CalculateGrainDiameterAtAngles(data_matrix, list_of_angles_in_degrees=(0, 45, 90, 135), length_in_micrometers=6, pixel_dimension_of_image=512):
+    grain_diameter_at_each_angle = dict()
+    for each_angle_in_degrees in list_of_angles_in_degrees:
+        cross_sections = ExtractCrossSectionsAtAngle(data_matrix, each_angle_in_degrees)
+        diams = ExtractDistancesBetweenRelativeMinima_GrainDiameter(cross_sections, length_in_micrometers, pixel_dimension_of_image)
+        grain_diameter_at_each_angle[each_angle_in_degrees] = CalculateAverageAndStandardDeviation_GrainDiameter(diams)
+    return grain_diameter_at_each_angle
@@ -0,0 +1,229 @@
+# Gwyddion Export Loader
+# This is used to read the raw data csv written by the Pygwy script (peaks.py) into a flat numpy array of z-values.
+#
+# The Pygwy script writes every z-value of the scan on one single comma separated line. Reading that line with csv.reader,
+# list() and np.array(...).astype(float) holds the whole row as Python strings, as a numpy string array and as floats at the same time.
+# The functions below parse the text straight into a float buffer, no string copies of the data are ever made.
+#
+# LoadGwyddionExport() is the drop in replacement for the csv.reader blocks in grain_analysis_documented.py.
+# Files are parsed a block of "chunk_size_in_bytes" at a time by IterateGwyddionExportInChunks(), so only one block of text is ever in memory.
+# A normal 512x512 export fits in a single block, lower the chunk size for very large scans.
+#
+# Every parsed export is also written once to a .npy file in a cache folder next to it (gwy_data/.grain_analysis_cache by default).
+# The cache file name holds a hash of the export's path and dtype and a hash of its modification time and size, so editing or re-exporting a scan
+# makes a new cache file and replaces only the cache files of that same export. Later loads open the .npy file memory-mapped instead of parsing
+# the text again, only the pages that are actually used get read from disk. Pass use_cache=False to always parse the text.
+#
+# The Pygwy script can also write a binary export (export_format = "binary" in peaks.py), laid out as:
+#   8 bytes   - the text GWYGRAIN
+#   4 bytes   - little-endian unsigned integer, the length of the header that follows
+#   header    - JSON text padded with spaces to a multiple of 16 bytes (counting the 12 bytes before it), holding "rows", "columns",
+#               "dtype" ("<f4" or "<f8"), "physical_width"/"physical_height" of the exported area in "xy_unit", the "z_unit" of the scan
+#               and the "z_scaling_exponent" every z-value was multiplied by (10^x)
+#   z-values  - rows x columns little-endian floats, row after row, the same order as the csv export
+# LoadGwyddionExport() recognises these files by their first 8 bytes and memory-maps the z-values in place, there is nothing to parse or cache.
+#
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import numpy as np
+
+
+default_chunk_size_in_bytes = 16*1024*1024
+default_cache_folder_name = ".grain_analysis_cache"
+binary_export_magic = b"GWYGRAIN"
+
+
+# Expected input: Path to a raw data csv exported by the Pygwy script, pass the dtype the z-values should be stored in (np.float64 or np.float32).
+# Expected Output: Generator of flat numpy arrays, each one holding the z-values of about "chunk_size_in_bytes" of text, in file order.
+# Only one block of text is held in memory at a time, a value cut in half by the end of a block is carried over to the next one.
+def IterateGwyddionExportInChunks(file_path, dtype=np.float64, chunk_size_in_bytes=default_chunk_size_in_bytes):
+    if type(chunk_size_in_bytes) != int or chunk_size_in_bytes <= 0:
+        raise ValueError("Chunk size must be a positive integer number of bytes.")
+
+    unparsed_text = b""
+    with open(file_path, 'rb') as data_file:
+        while True:
+            block_of_text = data_file.read(chunk_size_in_bytes)
+            if not block_of_text:
+                break
+            unparsed_text = unparsed_text + block_of_text
+            location_of_last_separator = unparsed_text.rfind(b",")
+            if location_of_last_separator == -1:
+                continue
+            yield np.fromstring(unparsed_text[:location_of_last_separator], dtype=dtype, sep=',')
+            unparsed_text = unparsed_text[location_of_last_separator + 1:]
+
+    if unparsed_text.strip():
+        yield np.fromstring(unparsed_text, dtype=dtype, sep=',')
+
+# Expected input: Path to a raw data csv exported by the Pygwy script, pass the dtype the z-values should be stored in (np.float64 or np.float32)
+# and the block size the file is parsed in. "expected_number_of_values" (rows x columns of the scan) can be passed so every block is copied
+# straight into one preallocated buffer, and the file is checked to hold exactly that many values.
+# Expected Output: Flat numpy array of every z-value in the file, parsed from the text with no cache involved.
+def ParseGwyddionExport(file_path, dtype=np.float64, chunk_size_in_bytes=default_chunk_size_in_bytes, expected_number_of_values=None):
+    chunks_of_z_values = IterateGwyddionExportInChunks(file_path, dtype=dtype, chunk_size_in_bytes=chunk_size_in_bytes)
+    if expected_number_of_values is None:
+        chunks_of_z_values = list(chunks_of_z_values)
+        if len(chunks_of_z_values) == 1:
+            return chunks_of_z_values[0]
+        return np.concatenate(chunks_of_z_values or [np.empty(0, dtype=dtype)])
+
+    z_values = np.empty(expected_number_of_values, dtype=dtype)
+    number_of_values_read = 0
+    for each_chunk in chunks_of_z_values:
+        if number_of_values_read + len(each_chunk) > expected_number_of_values:
+            raise ValueError("{} holds more than the expected {} values.".format(file_path, expected_number_of_values))
+        z_values[number_of_values_read:number_of_values_read + len(each_chunk)] = each_chunk
+        number_of_values_read = number_of_values_read + len(each_chunk)
+    if number_of_values_read != expected_number_of_values:
+        raise ValueError("{} holds {} values, expected {}.".format(file_path, number_of_values_read, expected_number_of_values))
+    return z_values
+
+# Expected input: Path to a raw data csv exported by the Pygwy script, the dtype it is loaded as and the folder cache files are kept in
+# (None puts them in a ".grain_analysis_cache" folder beside the export).
+# Expected Output: Path of the .npy cache file for the export as it is on disk right now, "<export name>_<dtype>_<path hash>_<version hash>.npy".
+# The path hash only depends on the export's path and dtype, the version hash changes whenever its modification time or size changes,
+# so a stale cache file is never picked up and the earlier versions of the same export are the only other files sharing everything before the version hash.
+def GetCachePathForGwyddionExport(file_path, dtype=np.float64, cache_folder=None):
+    absolute_file_path = os.path.abspath(file_path)
+    file_status = os.stat(absolute_file_path)
+    path_key = "{}|{}".format(absolute_file_path, np.dtype(dtype).str)
+    path_key_hash = hashlib.sha1(path_key.encode('utf-8')).hexdigest()[:8]
+    cache_key = "{}|{}|{}".format(path_key, file_status.st_mtime_ns, file_status.st_size)
+    cache_key_hash = hashlib.sha1(cache_key.encode('utf-8')).hexdigest()[:16]
+
+    if cache_folder is None:
+        cache_folder = os.path.join(os.path.dirname(absolute_file_path), default_cache_folder_name)
+    file_name_without_extension = os.path.splitext(os.path.basename(absolute_file_path))[0]
+    return os.path.join(cache_folder, "{}_{}_{}_{}.npy".format(file_name_without_extension, np.dtype(dtype).name, path_key_hash, cache_key_hash))
+
+# Expected input: Flat numpy array of z-values and the cache path from GetCachePathForGwyddionExport().
+# Expected Output: The same z-values, memory-mapped read only from the written cache file. Older cache files of the same export (same path and dtype,
+# matched by everything before the version hash) are removed, a same-named export in another folder sharing the cache folder is left alone.
+# If the cache folder cannot be written to, the z-values are handed back unchanged, nothing is cached and no temporary file is left behind.
+def SaveGwyddionExportToCache(z_values, cache_path):
+    cache_folder = os.path.dirname(cache_path)
+    file_name_without_hash = os.path.basename(cache_path).rsplit('_', 1)[0]
+    temporary_cache_path = None
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_folder, suffix='.npy', delete=False) as temporary_cache_file:
+            temporary_cache_path = temporary_cache_file.name
+            np.save(temporary_cache_file, z_values)
+        os.replace(temporary_cache_path, cache_path)
+    except OSError:
+        if temporary_cache_path is not None:
+            try:
+                os.remove(temporary_cache_path)
+            except OSError:
+                pass
+        return z_values
+
+    for each_file_name in os.listdir(cache_folder):
+        stale_cache_path = os.path.join(cache_folder, each_file_name)
+        if each_file_name.rsplit('_', 1)[0] == file_name_without_hash and each_file_name.endswith('.npy') and stale_cache_path != cache_path:
+            try:
+                os.remove(stale_cache_path)
+            except OSError:
+                pass
+    return np.load(cache_path, mmap_mode='r')
+
+# Expected input: Path to any file exported by the Pygwy script.
+# Expected Output: True when it is a binary export (starts with GWYGRAIN), False for the csv export.
+def IsGrainBinaryExport(file_path):
+    with open(file_path, 'rb') as data_file:
+        return data_file.read(len(binary_export_magic)) == binary_export_magic
+
+# Expected input: Path to a binary export written by the Pygwy script.
+# Expected Output: Dictionary of the header (see the top of this file) plus 'data_offset', the byte the z-values start at, and
+# 'length_in_micrometers', the physical width of one cross section ready to pass to ExtractDistancesBetweenRelativeMinima_GrainDiameter().
+def ReadGrainBinaryExportHeader(file_path):
+    with open(file_path, 'rb') as data_file:
+        if data_file.read(len(binary_export_magic)) != binary_export_magic:
+            raise ValueError("{} is not a binary export from the Pygwy script.".format(file_path))
+        header_length = struct.unpack('<I', data_file.read(4))[0]
+        header = json.loads(data_file.read(header_length).decode('utf-8'))
+    header['data_offset'] = len(binary_export_magic) + 4 + header_length
+
+    expected_file_size = header['data_offset'] + header['rows']*header['columns']*np.dtype(header['dtype']).itemsize
+    if os.path.getsize(file_path) != expected_file_size:
+        raise ValueError("{} is {} bytes, its header describes {} bytes.".format(file_path, os.path.getsize(file_path), expected_file_size))
+    if header.get('xy_unit') == 'm':
+        header['length_in_micrometers'] = header['physical_width']*10**6
+    else:
+        header['length_in_micrometers'] = None
+    return header
+
+# Expected input: Path to a binary export written by the Pygwy script.
+# Expected Output: Flat numpy array of every z-value, memory-mapped read only straight from the file, and the header from ReadGrainBinaryExportHeader().
+def LoadGrainBinaryExport(file_path):
+    header = ReadGrainBinaryExportHeader(file_path)
+    z_values = np.memmap(file_path, dtype=np.dtype(header['dtype']), mode='r', offset=header['data_offset'], shape=(header['rows']*header['columns'],))
+    return z_values, header
+
+# Expected input: Path to write to and a 2D array of z-values with one cross section per row (for example converted from an old csv export),
+# the physical width of one cross section in micrometers, the dtype to store (np.float32 or np.float64) and the scaling exponent the z-values carry.
+# Expected Output: None, writes a binary export laid out exactly the way peaks.py writes one (square pixels are assumed for the physical height).
+def WriteGrainBinaryExport(file_path, data_matrix, length_in_micrometers=6, dtype=np.float32, z_scaling_exponent=9):
+    data_matrix = np.atleast_2d(np.asarray(data_matrix))
+    number_of_rows, number_of_columns = data_matrix.shape
+    header = {
+        "format_version": 1,
+        "rows": number_of_rows,
+        "columns": number_of_columns,
+        "dtype": np.dtype(dtype).newbyteorder('<').str,
+        "physical_width": length_in_micrometers*10**-6,
+        "physical_height": length_in_micrometers*10**-6*number_of_rows/number_of_columns,
+        "xy_unit": "m",
+        "z_unit": "m",
+        "z_scaling_exponent": z_scaling_exponent,
+    }
+    header_text = json.dumps(header, sort_keys=True)
+    header_text = header_text + " "*(-(len(binary_export_magic) + 4 + len(header_text)) % 16)
+    with open(file_path, 'wb') as data_file:
+        data_file.write(binary_export_magic)
+        data_file.write(struct.pack('<I', len(header_text)))
+        data_file.write(header_text.encode('ascii'))
+        data_file.write(np.ascontiguousarray(data_matrix, dtype=header['dtype']).tobytes())
+
+# Expected input: Path to write to and a 2D array of z-values with one cross section per row.
+# Expected Output: None, writes the single comma separated line csv.writer writes in peaks.py (every value as repr() of its float, ended by \r\n),
+# one cross section at a time so no text copy of the whole scan is ever held in memory.
+def WriteGwyddionExport(file_path, data_matrix):
+    data_matrix = np.atleast_2d(np.asarray(data_matrix))
+    with open(file_path, 'w', newline='') as data_file:
+        for row_index, each_individual_cross_section in enumerate(data_matrix):
+            if row_index > 0:
+                data_file.write(',')
+            data_file.write(','.join(map(repr, each_individual_cross_section.tolist())))
+        data_file.write('\r\n')
+
+# Expected input: Path to a raw data csv (or binary export) written by the Pygwy script and the same options as ParseGwyddionExport().
+# Leave "use_cache" as True to reuse a memory-mapped .npy copy of the export from earlier runs, "cache_folder" as for GetCachePathForGwyddionExport().
+# Expected Output: Flat numpy array of every z-value in the file (read only and memory-mapped when it comes from the cache), ready for SplitDataMatrixIntoRows().
+def LoadGwyddionExport(file_path, dtype=np.float64, chunk_size_in_bytes=default_chunk_size_in_bytes, expected_number_of_values=None, use_cache=True, cache_folder=None):
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError("No raw data csv found at {}.".format(file_path))
+
+    if IsGrainBinaryExport(file_path):
+        z_values = LoadGrainBinaryExport(file_path)[0]
+        if expected_number_of_values is not None and len(z_values) != expected_number_of_values:
+            raise ValueError("{} holds {} values, expected {}.".format(file_path, len(z_values), expected_number_of_values))
+        if z_values.dtype != np.dtype(dtype):
+            return z_values.astype(dtype)
+        return z_values
+
+    if not use_cache:
+        return ParseGwyddionExport(file_path, dtype, chunk_size_in_bytes, expected_number_of_values)
+
+    cache_path = GetCachePathForGwyddionExport(file_path, dtype, cache_folder)
+    if os.path.isfile(cache_path):
+        z_values = np.load(cache_path, mmap_mode='r')
+        if expected_number_of_values is None or len(z_values) == expected_number_of_values:
+            return z_values
+    z_values = ParseGwyddionExport(file_path, dtype, chunk_size_in_bytes, expected_number_of_values)
+    return SaveGwyddionExportToCache(z_values, cache_path)
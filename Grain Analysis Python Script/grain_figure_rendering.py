@@ -0,0 +1,258 @@
+# Grain Analysis Figure Rendering
+# This is used to write the graphs of the analysis straight to image files, with no display and without blocking on plt.show().
+#
+# A figure is described by a figure specification, a plain dictionary that can be sent to another process:
+#   file_name             - name of the files to write, without an extension
+#   title, x_label, y_label
+#   series                - list of dictionaries with 'times', 'values', 'errors' (standard deviations, drawn as error bars, None for a series with none
+#                           such as a fitted curve), 'label', 'color' and 'line_style'
+#   legend_location       - passed to legend(), defaulted to 'best'
+# BuildFigureSpecification() is the plot builder: it picks any molecules and any metrics (columns of the results table) out of the results table and makes
+# one series of each, styled from plot_style_registry. The color belongs to the molecule and the line style and label to the metric, so the same series
+# always looks the same in every graph. BuildMoleculeFigureSpecification() and BuildComparisonFigureSpecification() use it for the graphs grain_analysis_documented.py
+# draws: the minimum, average and maximum diameter (or height) of one molecule over time, and the same for several molecules in one graph.
+# BuildGrowthModelFigureSpecification() draws one fit of grain_growth_models.py as a curve over the series it was fitted to.
+#
+# Figures are drawn with matplotlib's Agg canvas directly (matplotlib.figure.Figure, never pyplot), so no display or GUI backend is ever needed.
+# Every worker process makes one figure and one set of axes and clears and redraws them for each figure specification it is given, creating a figure
+# is the slow part of a small plot. All lines of a figure are drawn as one LineCollection and all error bars as another, so adding series adds
+# segments to two artists instead of a Line2D and an errorbar container per series.
+# RenderFigureSpecifications() splits the specifications over "number_of_workers" processes, each writes its own files.
+# Figure size, DPI, file formats (png, svg, pdf), line width and fonts come from default_rendering_settings or any dictionary with the same keys.
+# matplotlib is only imported by CreateFigureRenderer() and RenderFigureSpecification(), building figure specifications does not need it.
+#
+# Run from the command line with "python grain_figure_rendering.py grain_analysis_results.csv grain_analysis_report --formats png pdf --dpi 200 --workers 4"
+# to render every graph of the results table.
+#
+# Pipeline:
+# RunGrainAnalysisBatch() / ReadGrainAnalysisResultsTable() -> BuildFigureSpecification() -> RenderFigureSpecifications() -> CreateFigureRenderer() per worker
+#                                                                                                                          -> RenderFigureSpecification() per figure
+#
+
+import argparse
+import concurrent.futures
+import functools
+import os
+import numpy as np
+
+from grain_batch_driver import ReadGrainAnalysisResultsTable, SelectResultsSeries
+from grain_growth_models import EvaluateGrowthModel
+from grain_profiling import ProfileStage, RunWithProfilingInWorker, GetProfilingSettings, AddProfilingRecords, AddProfilingArguments, ReadProfilingArguments, FinishProfiling
+
+
+default_rendering_settings = {'figure_size_in_inches': [10, 7], 'dpi': 100, 'file_formats': ['png'], 'line_width': 3,
+                              'title_font': {'family': 'serif', 'color': 'black', 'size': 20},
+                              'label_font': {'family': 'serif', 'color': 'darkred', 'size': 15}}
+
+# The groups of molecules drawn on one comparison graph, the two groups grain_analysis_documented.py compares.
+default_comparison_groups = (('C11', 'C11OH', 'C11NF'), ('C3', 'C7', 'C7OH'))
+
+# Styles of every series the plot builder draws:
+#   molecule_colors  - the color of each molecule, the ones grain_analysis_documented.py has always used. A molecule not listed gets the next of the
+#                      fallback_colors the first time it is drawn and keeps it from then on.
+#   metrics          - for each column of the results table that can be drawn: the column of its standard deviations, its line style, the label after
+#                      the molecule name in the legend and the quantity it measures.
+#   quantities       - the y axis label and title word of each quantity, and its metrics in the order they are drawn.
+# Add or change entries here to draw a new molecule or metric, nothing else needs to change.
+plot_style_registry = {
+    'molecule_colors': {'C3': (0.555, 0.222, 0.111), 'C7': (0.75, 0.0, 0.75), 'C7OH': (1.0, 0.5, 0.0),
+                        'C11': (0.0, 0.5, 1.0), 'C11OH': (1.0, 0.0, 0.0), 'C11NF': (0.2, 0.6, 0.2)},
+    'fallback_colors': [(0.0, 0.0, 0.0), (0.5, 0.5, 0.5), (0.0, 0.0, 0.55), (0.55, 0.0, 0.0), (0.0, 0.55, 0.55), (0.55, 0.55, 0.0)],
+    'metrics': {
+        'max_average_diameter': {'error_column': 'max_std_diameter', 'line_style': 'dashed', 'label': 'Average Maximum Diameter', 'quantity': 'diameter'},
+        'mean_diameter': {'error_column': 'std_diameter', 'line_style': 'solid', 'label': 'Average Diameter', 'quantity': 'diameter'},
+        'min_average_diameter': {'error_column': 'min_std_diameter', 'line_style': 'dotted', 'label': 'Average Minimum Diameter', 'quantity': 'diameter'},
+        'max_average_height': {'error_column': 'max_std_height', 'line_style': 'dashed', 'label': 'Average Maximum Height', 'quantity': 'height'},
+        'mean_height': {'error_column': 'std_height', 'line_style': 'solid', 'label': 'Average Height', 'quantity': 'height'},
+        'min_average_height': {'error_column': 'min_std_height', 'line_style': 'dotted', 'label': 'Average Minimum Height', 'quantity': 'height'},
+    },
+    'quantities': {
+        'diameter': {'y_label': 'Average Grain Diameter (μm)', 'title_word': 'Diameter', 'metrics': ['max_average_diameter', 'mean_diameter', 'min_average_diameter']},
+        'height': {'y_label': 'Average Grain Height (nm)', 'title_word': 'Height', 'metrics': ['max_average_height', 'mean_height', 'min_average_height']},
+    },
+}
+
+
+# Expected input: Name of a molecule.
+# Expected Output: Its color from plot_style_registry, a molecule that is not registered yet is given the next fallback color.
+def GetMoleculeColor(molecule):
+    molecule_colors = plot_style_registry['molecule_colors']
+    if molecule not in molecule_colors:
+        fallback_colors = plot_style_registry['fallback_colors']
+        number_of_fallbacks_used = sum(1 for each_color in molecule_colors.values() if each_color in fallback_colors)
+        molecule_colors[molecule] = fallback_colors[number_of_fallbacks_used % len(fallback_colors)]
+    return molecule_colors[molecule]
+
+# Expected input: Results table (RunGrainAnalysisBatch() or ReadGrainAnalysisResultsTable()), the molecules and the metrics to draw (keys of plot_style_registry['metrics']).
+# Optionally the file name, title and y axis label, defaulted to ones made from the molecules and metrics, and the legend location.
+# Expected Output: Figure specification with one series per molecule and metric, molecule by molecule, every series in time order.
+def BuildFigureSpecification(results_table, molecules, metrics, file_name=None, title=None, y_label=None, legend_location='best'):
+    for metric in metrics:
+        if metric not in plot_style_registry['metrics']:
+            raise ValueError("Unknown metric {}, pick one of {}.".format(metric, ", ".join(plot_style_registry['metrics'])))
+    quantities = list(dict.fromkeys(plot_style_registry['metrics'][metric]['quantity'] for metric in metrics))
+
+    list_of_series = list()
+    for molecule in molecules:
+        times = SelectResultsSeries(results_table, molecule, 'time_in_minutes')
+        for metric in metrics:
+            metric_style = plot_style_registry['metrics'][metric]
+            list_of_series.append({'times': times, 'values': SelectResultsSeries(results_table, molecule, metric),
+                                   'errors': SelectResultsSeries(results_table, molecule, metric_style['error_column']),
+                                   'label': "{} {}".format(molecule, metric_style['label']), 'color': GetMoleculeColor(molecule), 'line_style': metric_style['line_style']})
+
+    if file_name is None:
+        file_name = "{}_{}".format("_".join(molecule.lower() for molecule in molecules), "_".join(metrics))
+    if title is None:
+        title = "Average Grain {} of {}".format("/".join(plot_style_registry['quantities'][quantity]['title_word'] for quantity in quantities), "/".join(molecules))
+    if y_label is None:
+        y_label = ", ".join(plot_style_registry['quantities'][quantity]['y_label'] for quantity in quantities)
+    return {'file_name': file_name, 'title': title, 'x_label': 'Time (Minutes)', 'y_label': y_label, 'series': list_of_series, 'legend_location': legend_location}
+
+# Expected input: Results table, one molecule and 'diameter' or 'height'.
+# Expected Output: Figure specification of the "Average Diameter of C3 Sample" graph of grain_analysis_documented.py, written to "<molecule>_average_<quantity>".
+def BuildMoleculeFigureSpecification(results_table, molecule, quantity='diameter'):
+    if quantity not in plot_style_registry['quantities']:
+        raise ValueError("Quantity must be one of {}.".format(", ".join(plot_style_registry['quantities'])))
+    return BuildFigureSpecification(results_table, [molecule], plot_style_registry['quantities'][quantity]['metrics'],
+                                    file_name="{}_average_{}".format(molecule.lower(), quantity),
+                                    title="Average {} of {} Sample".format(plot_style_registry['quantities'][quantity]['title_word'], molecule))
+
+# Expected input: Results table, the molecules to compare and 'diameter' or 'height'.
+# Expected Output: Figure specification of the "Average Grain Diameter of C11/C11OH/C11NF Molecules" graph, written to "<molecule>_<molecule>_..._average_<quantity>".
+def BuildComparisonFigureSpecification(results_table, molecules, quantity='diameter'):
+    if quantity not in plot_style_registry['quantities']:
+        raise ValueError("Quantity must be one of {}.".format(", ".join(plot_style_registry['quantities'])))
+    return BuildFigureSpecification(results_table, molecules, plot_style_registry['quantities'][quantity]['metrics'],
+                                    file_name="{}_average_{}".format("_".join(molecule.lower() for molecule in molecules), quantity),
+                                    title="Average Grain {} of {} Molecules".format(plot_style_registry['quantities'][quantity]['title_word'], "/".join(molecules)),
+                                    legend_location='upper right')
+
+# Expected input: Results table, one fit from FitGrowthModelsToResultsTable() in grain_growth_models.py and the number of points to draw its curve with.
+# Expected Output: Figure specification of the measured series of the fit's molecule and metric with the fitted model drawn over it from t=0 to the last
+# time point, written to "<molecule>_<metric>_<model>_fit".
+def BuildGrowthModelFigureSpecification(results_table, growth_model_fit, number_of_curve_points=200):
+    molecule, metric, model = growth_model_fit['molecule'], growth_model_fit['metric'], growth_model_fit['model']
+    figure_specification = BuildFigureSpecification(results_table, [molecule], [metric], file_name="{}_{}_{}_fit".format(molecule.lower(), metric, model),
+                                                    title="{} {} Fit of {}".format(plot_style_registry['metrics'][metric]['label'], model, molecule))
+    curve_times = np.linspace(0, np.max(SelectResultsSeries(results_table, molecule, 'time_in_minutes')), number_of_curve_points)
+    figure_specification['series'].append({'times': curve_times, 'values': EvaluateGrowthModel(model, curve_times, list(growth_model_fit['parameters'].values())),
+                                           'errors': None, 'label': "{} {} fit".format(molecule, model), 'color': GetMoleculeColor(molecule), 'line_style': 'dashdot'})
+    return figure_specification
+
+# Expected input: Results table, the groups of molecules to draw comparison graphs of (see default_comparison_groups) and optionally the molecules whose
+# graphs need drawing ("changed_molecules", None draws everything).
+# Expected Output: List of figure specifications, the diameter and height graph of every molecule followed by the comparison graphs of every group.
+# With changed_molecules only the graphs of those molecules and the comparison graphs of the groups holding one of them are given.
+def BuildGrainAnalysisReportSpecifications(results_table, comparison_groups=default_comparison_groups, changed_molecules=None):
+    molecules = list(dict.fromkeys(each_row['molecule'] for each_row in results_table))
+    molecules_to_draw = molecules if changed_molecules is None else [molecule for molecule in molecules if molecule in changed_molecules]
+    figure_specifications = [BuildMoleculeFigureSpecification(results_table, molecule, quantity) for molecule in molecules_to_draw for quantity in ('diameter', 'height')]
+    for quantity in ('diameter', 'height'):
+        for each_group in comparison_groups:
+            molecules_in_table = [molecule for molecule in each_group if molecule in molecules]
+            if molecules_in_table and (changed_molecules is None or any(molecule in changed_molecules for molecule in each_group)):
+                figure_specifications.append(BuildComparisonFigureSpecification(results_table, molecules_in_table, quantity))
+    return figure_specifications
+
+# Expected input: Rendering settings (see default_rendering_settings), missing keys are taken from the defaults.
+# Expected Output: Dictionary holding the 'figure', its 'axes' and the 'rendering_settings', to pass to RenderFigureSpecification() again and again.
+def CreateFigureRenderer(rendering_settings=None):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    rendering_settings = dict(default_rendering_settings, **(rendering_settings or {}))
+    figure = Figure(figsize=tuple(rendering_settings['figure_size_in_inches']), dpi=rendering_settings['dpi'])
+    FigureCanvasAgg(figure)
+    return {'figure': figure, 'axes': figure.add_subplot(), 'rendering_settings': rendering_settings}
+
+# Expected input: Output from CreateFigureRenderer(), one figure specification and the folder to write it to.
+# Expected Output: List of the files written, one per file format in the rendering settings. The axes are cleared first, nothing is left over from the last figure.
+def RenderFigureSpecification(figure_renderer, figure_specification, output_folder):
+    from matplotlib.collections import LineCollection
+    from matplotlib.lines import Line2D
+    axes = figure_renderer['axes']
+    rendering_settings = figure_renderer['rendering_settings']
+    with ProfileStage('plot', figure_specification['file_name']) as stage_record:
+        axes.clear()
+        list_of_series = figure_specification['series']
+        line_width = rendering_settings['line_width']
+        if list_of_series:
+            # One segment per series for the lines, one (time, value - error) -> (time, value + error) segment per point for the error bars.
+            line_segments = [np.column_stack([each_series['times'], each_series['values']]) for each_series in list_of_series]
+            axes.add_collection(LineCollection(line_segments, colors=[each_series['color'] for each_series in list_of_series],
+                                               linestyles=[each_series['line_style'] for each_series in list_of_series], linewidths=line_width))
+            series_with_errors = [each_series for each_series in list_of_series if each_series['errors'] is not None]
+            if series_with_errors:
+                error_segments = np.concatenate([np.stack([np.column_stack([each_series['times'], each_series['values'] - each_series['errors']]),
+                                                           np.column_stack([each_series['times'], each_series['values'] + each_series['errors']])], axis=1)
+                                                 for each_series in series_with_errors])
+                error_colors = [each_series['color'] for each_series in series_with_errors for each_time in each_series['times']]
+                axes.add_collection(LineCollection(error_segments, colors=error_colors, linewidths=line_width))
+            axes.autoscale_view()
+            axes.legend(handles=[Line2D([], [], color=each_series['color'], linestyle=each_series['line_style'], linewidth=line_width, label=each_series['label'])
+                                 for each_series in list_of_series], loc=figure_specification.get('legend_location', 'best'))
+        axes.set_title(figure_specification['title'], fontdict=rendering_settings['title_font'])
+        axes.set_xlabel(figure_specification['x_label'], fontdict=rendering_settings['label_font'])
+        axes.set_ylabel(figure_specification['y_label'], fontdict=rendering_settings['label_font'])
+        stage_record['items'] = sum(len(each_series['times']) for each_series in list_of_series)
+
+    with ProfileStage('save_figure', figure_specification['file_name']) as stage_record:
+        written_paths = list()
+        for file_format in rendering_settings['file_formats']:
+            output_path = os.path.join(output_folder, "{}.{}".format(figure_specification['file_name'], file_format))
+            figure_renderer['figure'].savefig(output_path, format=file_format, dpi=rendering_settings['dpi'])
+            written_paths.append(output_path)
+        stage_record['items'] = len(written_paths)
+    return written_paths
+
+# Expected input: List of figure specifications, the output folder and the rendering settings.
+# Expected Output: List of the files written. Every specification is drawn on the one figure made for this call.
+def _RenderListOfFigureSpecifications(figure_specifications, output_folder, rendering_settings):
+    figure_renderer = CreateFigureRenderer(rendering_settings)
+    return [output_path for each_figure_specification in figure_specifications
+            for output_path in RenderFigureSpecification(figure_renderer, each_figure_specification, output_folder)]
+
+# Expected input: List of figure specifications, the folder to write them to (made if needed), the rendering settings (defaulted to default_rendering_settings)
+# and the number of worker processes, defaulted to 1 (None for one per CPU core).
+# Expected Output: List of every file written, in the order of the specifications.
+def RenderFigureSpecifications(figure_specifications, output_folder, rendering_settings=None, number_of_workers=1):
+    os.makedirs(output_folder, exist_ok=True)
+    if number_of_workers is None:
+        number_of_workers = os.cpu_count() or 1
+    if type(number_of_workers) != int or number_of_workers < 1:
+        raise ValueError("Number of workers must be a positive integer.")
+    number_of_workers = min(number_of_workers, len(figure_specifications))
+    if number_of_workers <= 1:
+        return _RenderListOfFigureSpecifications(figure_specifications, output_folder, rendering_settings)
+
+    # One contiguous share of the figures per worker, so each worker only ever makes one figure.
+    shares_of_figure_specifications = np.array_split(np.arange(len(figure_specifications)), number_of_workers)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=number_of_workers) as process_pool:
+        rendered_shares = process_pool.map(functools.partial(RunWithProfilingInWorker, GetProfilingSettings(), _RenderListOfFigureSpecifications),
+                                           [[figure_specifications[index] for index in each_share] for each_share in shares_of_figure_specifications],
+                                           [output_folder]*number_of_workers, [rendering_settings]*number_of_workers)
+        written_paths = list()
+        for each_rendered_share, profiling_records in rendered_shares:
+            AddProfilingRecords(profiling_records)
+            written_paths.extend(each_rendered_share)
+        return written_paths
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Render every graph of a results table to image files, no display needed.")
+    argument_parser.add_argument('results_path', help="results csv written by grain_batch_driver.py")
+    argument_parser.add_argument('output_folder', help="folder the figures are written to")
+    argument_parser.add_argument('--formats', nargs='+', default=default_rendering_settings['file_formats'], choices=['png', 'svg', 'pdf'], help="file formats (default png)")
+    argument_parser.add_argument('--dpi', type=float, default=default_rendering_settings['dpi'], help="resolution of png files (default 100)")
+    argument_parser.add_argument('--figure-size', type=float, nargs=2, default=default_rendering_settings['figure_size_in_inches'], metavar=('WIDTH', 'HEIGHT'),
+                                 help="figure size in inches (default 10 7)")
+    argument_parser.add_argument('--workers', type=int, default=1, help="number of worker processes, 0 for one per CPU core (default 1)")
+    AddProfilingArguments(argument_parser)
+    arguments = argument_parser.parse_args()
+    ReadProfilingArguments(arguments)
+
+    rendering_settings = dict(default_rendering_settings, file_formats=arguments.formats, dpi=arguments.dpi, figure_size_in_inches=arguments.figure_size)
+    figure_specifications = BuildGrainAnalysisReportSpecifications(ReadGrainAnalysisResultsTable(arguments.results_path))
+    written_paths = RenderFigureSpecifications(figure_specifications, arguments.output_folder, rendering_settings, arguments.workers or None)
+    print("Success! {} files written to {}.".format(len(written_paths), arguments.output_folder))
+    FinishProfiling()
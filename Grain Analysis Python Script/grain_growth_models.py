@@ -0,0 +1,327 @@
+# Grain Growth Models
+# This is used to fit a physical growth model to the grain diameter and height of every molecule over time, the model curve asked for in the README's Future Work.
+#
+# The models are kept in the growth_models dictionary, each one is a dictionary of:
+#   parameter_names      - names of its parameters, in order
+#   positive_parameters  - True for every parameter that must stay above 0 (it is fitted as its logarithm)
+#   function             - function(times, parameters) -> model values, for times of shape (series, time points) and parameters of shape (series, parameters)
+#   jacobian             - function(times, parameters) -> derivative of the model values by every parameter, shape (series, time points, parameters)
+#   initial_guess        - function(times, values, weights) -> starting parameters for every series, weights are 0 for padding
+# Add an entry of the same form to fit another model, FitGrowthModel() only ever goes through these functions.
+# The models that come with it, with t the time in minutes:
+#   linear    - intercept + rate*t
+#   power_law - prefactor*t^exponent
+#   jmak      - final_size*(1 - exp(-(rate*t)^avrami_exponent)), the Johnson-Mehl-Avrami-Kolmogorov form
+#   logistic  - final_size/(1 + exp(-rate*(t - half_time)))
+#
+# The t=0 line of a manifest (no file, the placeholder values of RunGrainAnalysisPipelineOnImage()) is not a measurement and is left out of the fits,
+# pass include_origin=True to FitGrowthModelsToResultsTable() (--include-origin) to keep it as an anchor at the origin.
+# Every series (one molecule and one metric, for example C3 and mean_diameter) is weighted by its standard deviations: the residual of each
+# time point is divided by the standard deviation of that point. A point with a standard deviation of 0 (the t=0 anchor) gets the smallest standard deviation
+# of the rest of the series instead of an infinite weight. The standard deviations are the spread of the grains rather than measurement errors of the
+# means, so the parameter uncertainties are scaled by the reduced chi-square of the fit (like scipy.optimize.curve_fit() with absolute_sigma=False).
+#
+# All series of a model are fitted together by a Levenberg-Marquardt solver written for stacks of series: series with fewer time points are padded with
+# zero-weight points, and every iteration builds and solves the small normal equations of all series at once with np.linalg.solve(). Each series has its own
+# damping and stops improving on its own, so one hard series does not hold the rest back.
+#
+# Pipeline:
+# RunGrainAnalysisBatch() / ReadGrainAnalysisResultsTable() -> FitGrowthModelsToResultsTable() (-> FitGrowthModel() per model)
+#                                                           -> BuildGrowthModelFigureSpecification() in grain_figure_rendering.py (-> EvaluateGrowthModel() for the curve)
+#
+
+import argparse
+import csv
+import numpy as np
+
+from grain_batch_driver import ReadGrainAnalysisResultsTable
+
+
+# Every metric of the results table that can be fitted, with the column holding its standard deviation.
+growth_metrics = {'mean_diameter': 'std_diameter', 'max_average_diameter': 'max_std_diameter', 'min_average_diameter': 'min_std_diameter',
+                  'mean_height': 'std_height', 'max_average_height': 'max_std_height', 'min_average_height': 'min_std_height'}
+
+default_maximum_number_of_iterations = 200
+default_relative_tolerance = 1e-10
+
+fit_table_columns = ['molecule', 'metric', 'model', 'parameter', 'value', 'uncertainty', 'reduced_chi_square', 'converged']
+
+
+# Expected input: x and y of shape (series, points) and the weight of every point (0 leaves it out).
+# Expected Output: Intercept and slope of the weighted least squares line of every series, nan where a series has fewer than two distinct x.
+def _WeightedLinearRegression(x_values, y_values, weights):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sum_of_weights = weights.sum(axis=1)
+        mean_x = (weights*x_values).sum(axis=1)/sum_of_weights
+        mean_y = (weights*y_values).sum(axis=1)/sum_of_weights
+        centred_x = np.where(weights > 0, x_values - mean_x[:, np.newaxis], 0)
+        centred_y = np.where(weights > 0, y_values - mean_y[:, np.newaxis], 0)
+        slope = (weights*centred_x*centred_y).sum(axis=1)/(weights*centred_x**2).sum(axis=1)
+    return mean_y - slope*mean_x, slope
+
+def _Linear(times, parameters):
+    return parameters[:, 0:1] + parameters[:, 1:2]*times
+
+def _LinearJacobian(times, parameters):
+    return np.stack([np.ones_like(times), times], axis=-1)
+
+def _LinearInitialGuess(times, values, weights):
+    intercept, slope = _WeightedLinearRegression(times, values, weights)
+    return np.stack([np.nan_to_num(intercept), np.nan_to_num(slope)], axis=-1)
+
+def _PowerLaw(times, parameters):
+    return parameters[:, 0:1]*times**parameters[:, 1:2]
+
+def _PowerLawJacobian(times, parameters):
+    time_to_the_exponent = times**parameters[:, 1:2]
+    log_times = np.log(np.where(times > 0, times, 1))
+    return np.stack([time_to_the_exponent, parameters[:, 0:1]*time_to_the_exponent*log_times], axis=-1)
+
+def _PowerLawInitialGuess(times, values, weights):
+    # A straight line on a log-log scale, through the points above 0.
+    usable = (times > 0) & (values > 0) & (weights > 0)
+    log_prefactor, exponent = _WeightedLinearRegression(np.log(np.where(usable, times, 1)), np.log(np.where(usable, values, 1)), np.where(usable, weights, 0))
+    exponent = np.clip(np.nan_to_num(exponent, nan=1), 0.05, 5)
+    prefactor = np.where(np.isfinite(log_prefactor), np.exp(log_prefactor), np.maximum(np.max(np.where(weights > 0, values, 0), axis=1), 1e-12))
+    return np.stack([prefactor, exponent], axis=-1)
+
+def _Jmak(times, parameters):
+    return parameters[:, 0:1]*(1 - np.exp(-(parameters[:, 1:2]*times)**parameters[:, 2:3]))
+
+def _JmakJacobian(times, parameters):
+    final_size, rate, avrami_exponent = parameters[:, 0:1], parameters[:, 1:2], parameters[:, 2:3]
+    transformed_fraction = (rate*times)**avrami_exponent
+    untransformed = np.exp(-transformed_fraction)
+    log_rate_times = np.log(np.where(times > 0, rate*times, 1))
+    return np.stack([1 - untransformed, final_size*untransformed*transformed_fraction*avrami_exponent/rate,
+                     final_size*untransformed*transformed_fraction*log_rate_times], axis=-1)
+
+def _JmakInitialGuess(times, values, weights):
+    # With the final size a little above the largest value, ln(-ln(1 - y/final_size)) = n*ln(k) + n*ln(t) is a straight line in ln(t).
+    final_size = 1.1*np.max(np.where(weights > 0, values, -np.inf), axis=1)
+    final_size = np.where(final_size > 0, final_size, 1)
+    fraction = values/final_size[:, np.newaxis]
+    usable = (times > 0) & (fraction > 0) & (fraction < 1) & (weights > 0)
+    intercept, avrami_exponent = _WeightedLinearRegression(np.log(np.where(usable, times, 1)), np.log(-np.log(1 - np.where(usable, fraction, 0.5))),
+                                                           np.where(usable, weights, 0))
+    avrami_exponent = np.clip(np.nan_to_num(avrami_exponent, nan=1), 0.1, 10)
+    mean_time = np.sum(np.where(weights > 0, times, 0), axis=1)/np.maximum(np.sum(weights > 0, axis=1), 1)
+    rate = np.where(np.isfinite(intercept), np.exp(intercept/avrami_exponent), 1/np.maximum(mean_time, 1e-12))
+    return np.stack([final_size, rate, avrami_exponent], axis=-1)
+
+def _Logistic(times, parameters):
+    return parameters[:, 0:1]/(1 + np.exp(-parameters[:, 1:2]*(times - parameters[:, 2:3])))
+
+def _LogisticJacobian(times, parameters):
+    final_size, rate, half_time = parameters[:, 0:1], parameters[:, 1:2], parameters[:, 2:3]
+    sigmoid = 1/(1 + np.exp(-rate*(times - half_time)))
+    slope_of_sigmoid = final_size*sigmoid*(1 - sigmoid)
+    return np.stack([sigmoid, slope_of_sigmoid*(times - half_time), -slope_of_sigmoid*rate], axis=-1)
+
+def _LogisticInitialGuess(times, values, weights):
+    # With the final size a little above the largest value, ln(y/(final_size - y)) = rate*t - rate*half_time is a straight line in t.
+    final_size = 1.1*np.max(np.where(weights > 0, values, -np.inf), axis=1)
+    final_size = np.where(final_size > 0, final_size, 1)
+    fraction = values/final_size[:, np.newaxis]
+    usable = (fraction > 0) & (fraction < 1) & (weights > 0)
+    safe_fraction = np.where(usable, fraction, 0.5)
+    intercept, rate = _WeightedLinearRegression(times, np.log(safe_fraction/(1 - safe_fraction)), np.where(usable, weights, 0))
+    time_span = np.ptp(np.where(weights > 0, times, times[:, :1]), axis=1)
+    rate = np.where(np.isfinite(rate) & (rate > 0), rate, 4/np.maximum(time_span, 1e-12))
+    half_time = np.where(np.isfinite(intercept), -intercept/rate, np.max(times, axis=1)/2)
+    return np.stack([final_size, rate, half_time], axis=-1)
+
+growth_models = {
+    'linear': {'parameter_names': ['intercept', 'rate'], 'positive_parameters': [False, False],
+               'function': _Linear, 'jacobian': _LinearJacobian, 'initial_guess': _LinearInitialGuess},
+    'power_law': {'parameter_names': ['prefactor', 'exponent'], 'positive_parameters': [True, True],
+                  'function': _PowerLaw, 'jacobian': _PowerLawJacobian, 'initial_guess': _PowerLawInitialGuess},
+    'jmak': {'parameter_names': ['final_size', 'rate', 'avrami_exponent'], 'positive_parameters': [True, True, True],
+             'function': _Jmak, 'jacobian': _JmakJacobian, 'initial_guess': _JmakInitialGuess},
+    'logistic': {'parameter_names': ['final_size', 'rate', 'half_time'], 'positive_parameters': [True, True, False],
+                 'function': _Logistic, 'jacobian': _LogisticJacobian, 'initial_guess': _LogisticInitialGuess},
+}
+
+
+# Expected input: Name of a model in growth_models (or a model dictionary), times and the fitted parameters of one series (1D) or of many (2D, one row per series).
+# Expected Output: The model values at the times, for drawing the fitted curve.
+def EvaluateGrowthModel(model, times, parameters):
+    if type(model) == str:
+        model = growth_models[model]
+    parameters = np.asarray(parameters, dtype=np.float64)
+    times = np.asarray(times, dtype=np.float64)
+    with np.errstate(all='ignore'):
+        if parameters.ndim == 1:
+            return model['function'](times[np.newaxis, :], parameters[np.newaxis, :])[0]
+        return model['function'](np.broadcast_to(times, (len(parameters),) + times.shape[-1:]), parameters)
+
+# Expected input: Name of a model in growth_models (or a model dictionary) and a list of series, each a (times, values, standard deviations) tuple of equally long arrays.
+# The series can have different numbers of time points. Optionally the maximum number of iterations and the relative tolerance the fit stops at.
+# Expected Output: Dictionary of arrays with one row per series: 'parameters' and 'parameter_uncertainties' (series, parameters), 'reduced_chi_square' and 'converged'.
+# The uncertainties are nan for a series with no more time points than parameters. 'converged' is False for a series that ran out of iterations, stalled
+# (no step improved it even at the largest damping) or is degenerate (a parameter ran off to infinity, or the uncertainties are not finite although there
+# are more time points than parameters), its parameters are the best ones found.
+def FitGrowthModel(model, list_of_series, maximum_number_of_iterations=default_maximum_number_of_iterations, relative_tolerance=default_relative_tolerance):
+    if type(model) == str:
+        if model not in growth_models:
+            raise ValueError("Unknown growth model {}, pick one of {}.".format(model, ", ".join(growth_models)))
+        model = growth_models[model]
+    number_of_series = len(list_of_series)
+    number_of_parameters = len(model['parameter_names'])
+    if number_of_series == 0:
+        return {'parameters': np.empty((0, number_of_parameters)), 'parameter_uncertainties': np.empty((0, number_of_parameters)),
+                'reduced_chi_square': np.empty(0), 'converged': np.empty(0, dtype=bool)}
+
+    # Pad every series to the longest one, the padding has weight 0 and a time of 1 so every model stays finite on it.
+    number_of_time_points = max(len(each_series[0]) for each_series in list_of_series)
+    times = np.ones((number_of_series, number_of_time_points))
+    values = np.zeros((number_of_series, number_of_time_points))
+    weights = np.zeros((number_of_series, number_of_time_points))
+    for series_number, (each_times, each_values, each_standard_deviations) in enumerate(list_of_series):
+        each_standard_deviations = np.abs(np.asarray(each_standard_deviations, dtype=np.float64))
+        usable = np.isfinite(each_times) & np.isfinite(each_values) & np.isfinite(each_standard_deviations)
+        positive_standard_deviations = each_standard_deviations[usable & (each_standard_deviations > 0)]
+        smallest_standard_deviation = positive_standard_deviations.min() if len(positive_standard_deviations) else 1.0
+        times[series_number, :len(each_times)] = np.where(usable, each_times, 1)
+        values[series_number, :len(each_values)] = np.where(usable, each_values, 0)
+        weights[series_number, :len(each_times)] = np.where(usable, 1/np.where(each_standard_deviations > 0, each_standard_deviations, smallest_standard_deviation), 0)
+    degrees_of_freedom = np.sum(weights > 0, axis=1) - number_of_parameters
+
+    # Parameters that must stay positive are fitted as their logarithm, the jacobian is scaled by the chain rule.
+    is_positive = np.array(model['positive_parameters'], dtype=bool)
+    def ToParameters(fitted_variables):
+        with np.errstate(over='ignore'):
+            return np.where(is_positive, np.exp(np.where(is_positive, fitted_variables, 0)), fitted_variables)
+    def CalculateWeightedResidualsAndJacobian(fitted_variables):
+        parameters = ToParameters(fitted_variables)
+        with np.errstate(all='ignore'):
+            weighted_residuals = np.where(weights > 0, (values - model['function'](times, parameters))*weights, 0)
+            weighted_jacobian = model['jacobian'](times, parameters)*np.where(is_positive, parameters, 1)[:, np.newaxis, :]*weights[:, :, np.newaxis]
+        return weighted_residuals, np.where(weights[:, :, np.newaxis] > 0, weighted_jacobian, 0)
+
+    initial_parameters = np.asarray(model['initial_guess'](times, values, weights), dtype=np.float64)
+    fitted_variables = np.where(is_positive, np.log(np.where(is_positive, np.maximum(initial_parameters, 1e-300), 1)), initial_parameters)
+    weighted_residuals, weighted_jacobian = CalculateWeightedResidualsAndJacobian(fitted_variables)
+    chi_square = np.sum(weighted_residuals**2, axis=1)
+    damping = np.full(number_of_series, 1e-3)
+    converged = np.zeros(number_of_series, dtype=bool)
+    # A series stops once it converged or stalled: no step improves it even at the largest damping. A stalled series is not converged.
+    stalled = np.zeros(number_of_series, dtype=bool)
+    stopped = degrees_of_freedom < 0
+    identity = np.eye(number_of_parameters)
+
+    for iteration in range(maximum_number_of_iterations):
+        if np.all(stopped):
+            break
+        normal_matrix = np.einsum('stp,stq->spq', weighted_jacobian, weighted_jacobian)
+        gradient = np.einsum('stp,st->sp', weighted_jacobian, weighted_residuals)
+        # A series whose normal matrix is not finite takes a plain gradient step, its inf/nan never reach the damping.
+        normal_matrix = np.where(np.all(np.isfinite(normal_matrix), axis=(1, 2))[:, np.newaxis, np.newaxis], normal_matrix, identity)
+        diagonal = np.maximum(np.einsum('spp->sp', normal_matrix), 1e-12)
+        with np.errstate(over='ignore'):
+            damped_matrix = normal_matrix + damping[:, np.newaxis, np.newaxis]*diagonal[:, :, np.newaxis]*identity
+        damped_matrix = np.where(np.all(np.isfinite(damped_matrix), axis=(1, 2))[:, np.newaxis, np.newaxis], damped_matrix, identity)
+        step = np.linalg.solve(damped_matrix, np.nan_to_num(gradient)[:, :, np.newaxis])[:, :, 0]
+        step[stopped] = 0
+
+        new_fitted_variables = fitted_variables + step
+        new_weighted_residuals, new_weighted_jacobian = CalculateWeightedResidualsAndJacobian(new_fitted_variables)
+        with np.errstate(over='ignore'):
+            new_chi_square = np.sum(new_weighted_residuals**2, axis=1)
+        improved = np.isfinite(new_chi_square) & (new_chi_square <= chi_square) & ~stopped
+        # Only a step that was taken counts, a rejected step shrinks with every rise of the damping and says nothing about convergence.
+        small_change = improved & (chi_square - new_chi_square <= relative_tolerance*chi_square)
+        small_change |= improved & np.all(np.abs(step) <= relative_tolerance*(np.abs(fitted_variables) + relative_tolerance), axis=1)
+
+        fitted_variables = np.where(improved[:, np.newaxis], new_fitted_variables, fitted_variables)
+        weighted_residuals = np.where(improved[:, np.newaxis], new_weighted_residuals, weighted_residuals)
+        weighted_jacobian = np.where(improved[:, np.newaxis, np.newaxis], new_weighted_jacobian, weighted_jacobian)
+        chi_square = np.where(improved, new_chi_square, chi_square)
+        damping = np.clip(np.where(improved, damping/10, damping*10), 1e-12, 1e12)
+        converged |= small_change
+        stalled |= ~converged & ~stopped & (damping >= 1e12)
+        stopped |= converged | stalled
+
+    parameters = ToParameters(fitted_variables)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        reduced_chi_square = np.where(degrees_of_freedom > 0, chi_square/np.maximum(degrees_of_freedom, 1), np.nan)
+        normal_matrix = np.einsum('stp,stq->spq', weighted_jacobian, weighted_jacobian)
+        has_finite_jacobian = np.all(np.isfinite(normal_matrix), axis=(1, 2))
+        covariance_of_variables = np.linalg.pinv(np.where(has_finite_jacobian[:, np.newaxis, np.newaxis], normal_matrix, identity))
+        variable_uncertainties = np.sqrt(np.maximum(np.einsum('spp->sp', covariance_of_variables), 0)*reduced_chi_square[:, np.newaxis])
+        variable_uncertainties[~has_finite_jacobian] = np.nan
+    parameter_uncertainties = np.where(is_positive, parameters*variable_uncertainties, variable_uncertainties)
+    # A fit that ran a parameter off along a flat direction of the chi-square has no finite uncertainties even with time points to spare,
+    # it is degenerate rather than converged.
+    is_degenerate = ~np.all(np.isfinite(parameters), axis=1)
+    is_degenerate |= (degrees_of_freedom > 0) & ~np.all(np.isfinite(parameter_uncertainties), axis=1)
+    return {'parameters': parameters, 'parameter_uncertainties': parameter_uncertainties, 'reduced_chi_square': reduced_chi_square,
+            'converged': converged & (degrees_of_freedom >= 0) & ~is_degenerate}
+
+# Expected input: Results table from RunGrainAnalysisBatch() or ReadGrainAnalysisResultsTable(). Optionally the models, the metrics (keys of growth_metrics)
+# and the molecules to fit, defaulted to every one of them, and "include_origin" to keep the rows with no file (the t=0 line) in the fits, defaulted to False.
+# Expected Output: List with one dictionary per molecule, metric and model holding 'molecule', 'metric', 'model', 'parameters' and 'parameter_uncertainties'
+# (dictionaries of parameter name -> value), 'reduced_chi_square' and 'converged'. Each model is fitted to every series in one FitGrowthModel() call.
+def FitGrowthModelsToResultsTable(results_table, models=tuple(growth_models), metrics=tuple(growth_metrics), molecules=None, include_origin=False):
+    if molecules is None:
+        molecules = list(dict.fromkeys(each_row['molecule'] for each_row in results_table))
+    series_keys = list()
+    list_of_series = list()
+    for molecule in molecules:
+        rows_of_molecule = sorted((each_row for each_row in results_table if each_row['molecule'] == molecule and (include_origin or each_row['file_path'] is not None)),
+                                  key=lambda each_row: each_row['time_in_minutes'])
+        if not rows_of_molecule:
+            raise ValueError("No scanned results for molecule {}.".format(molecule))
+        times = np.array([each_row['time_in_minutes'] for each_row in rows_of_molecule], dtype=np.float64)
+        for metric in metrics:
+            if metric not in growth_metrics:
+                raise ValueError("Unknown metric {}, pick one of {}.".format(metric, ", ".join(growth_metrics)))
+            values = np.array([np.nan if each_row[metric] is None else each_row[metric] for each_row in rows_of_molecule], dtype=np.float64)
+            standard_deviations = np.array([np.nan if each_row[growth_metrics[metric]] is None else each_row[growth_metrics[metric]] for each_row in rows_of_molecule],
+                                           dtype=np.float64)
+            series_keys.append((molecule, metric))
+            list_of_series.append((times, values, standard_deviations))
+
+    growth_model_fits = list()
+    for model_name in models:
+        model_fit = FitGrowthModel(model_name, list_of_series)
+        parameter_names = growth_models[model_name]['parameter_names']
+        for series_number, (molecule, metric) in enumerate(series_keys):
+            growth_model_fits.append({'molecule': molecule, 'metric': metric, 'model': model_name,
+                                      'parameters': dict(zip(parameter_names, model_fit['parameters'][series_number].tolist())),
+                                      'parameter_uncertainties': dict(zip(parameter_names, model_fit['parameter_uncertainties'][series_number].tolist())),
+                                      'reduced_chi_square': float(model_fit['reduced_chi_square'][series_number]),
+                                      'converged': bool(model_fit['converged'][series_number])})
+    return growth_model_fits
+
+# Expected input: Output from FitGrowthModelsToResultsTable() and the path of the csv file to write.
+# Expected Output: None, writes one line per fitted parameter (see fit_table_columns).
+def WriteGrowthModelFitTable(growth_model_fits, fit_table_path):
+    with open(fit_table_path, 'w', newline='') as fit_table_file:
+        fit_table_writer = csv.DictWriter(fit_table_file, fieldnames=fit_table_columns)
+        fit_table_writer.writeheader()
+        for each_fit in growth_model_fits:
+            for parameter_name, value in each_fit['parameters'].items():
+                fit_table_writer.writerow({'molecule': each_fit['molecule'], 'metric': each_fit['metric'], 'model': each_fit['model'], 'parameter': parameter_name,
+                                           'value': value, 'uncertainty': each_fit['parameter_uncertainties'][parameter_name],
+                                           'reduced_chi_square': each_fit['reduced_chi_square'], 'converged': each_fit['converged']})
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Fit growth models to every molecule and metric of a results table.")
+    argument_parser.add_argument('results_path', help="results csv written by grain_batch_driver.py")
+    argument_parser.add_argument('fit_table_path', help="csv file the fitted parameters are written to")
+    argument_parser.add_argument('--models', nargs='+', default=list(growth_models), choices=list(growth_models), help="models to fit (default all)")
+    argument_parser.add_argument('--metrics', nargs='+', default=list(growth_metrics), choices=list(growth_metrics), help="metrics to fit (default all)")
+    argument_parser.add_argument('--include-origin', action='store_true', help="keep the t=0 line with no file in the fits as an anchor at the origin")
+    argument_parser.add_argument('--plot-folder', help="folder to draw every fitted curve over its measured series in (see grain_figure_rendering.py)")
+    arguments = argument_parser.parse_args()
+
+    results_table = ReadGrainAnalysisResultsTable(arguments.results_path)
+    growth_model_fits = FitGrowthModelsToResultsTable(results_table, arguments.models, arguments.metrics, include_origin=arguments.include_origin)
+    WriteGrowthModelFitTable(growth_model_fits, arguments.fit_table_path)
+    print("Success! {} fits written to {}.".format(len(growth_model_fits), arguments.fit_table_path))
+    if arguments.plot_folder is not None:
+        from grain_figure_rendering import BuildGrowthModelFigureSpecification, RenderFigureSpecifications
+        written_paths = RenderFigureSpecifications([BuildGrowthModelFigureSpecification(results_table, each_fit) for each_fit in growth_model_fits], arguments.plot_folder)
+        print("Success! {} fitted curves drawn in {}.".format(len(written_paths), arguments.plot_folder))
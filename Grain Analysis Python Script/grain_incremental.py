@@ -0,0 +1,324 @@
+# Incremental Grain Analysis
+# This is used to keep the results table of a manifest up to date while new scans come off the AFM, recomputing only the scans that are new or changed.
+#
+# Every result is kept in a results store (a JSON file, .grain_analysis_cache/grain_analysis_results_store.json beside the manifest by default)
+# under a key made of two hashes:
+#   content hash   - sha1 of the bytes of the exported scan, so renaming or touching a file does not recompute it but re-exporting it does.
+#                    The hash of every file is stored with its modification time and size, a file whose stat has not changed is not read again.
+#   settings hash  - sha1 of everything else the result depends on: the pixel dimension and length from the manifest, the detection settings,
+#                    the sub-pixel refinement, the processing dtype and pipeline_version (see HashPipelineSettings() in grain_intermediate_store.py).
+# RunGrainAnalysisBatchIncrementally() looks every manifest entry up in the store and only sends the missing ones through RunGrainAnalysisBatch(),
+# a rerun with nothing changed reads no height data at all. Results no longer in the manifest are dropped from the store.
+#
+# The store also keeps a hash of every molecule's series (its rows, sorted by time), so FindChangedMolecules() can tell which graphs need redrawing.
+#
+# WatchGrainAnalysisManifest() polls the manifest (and optionally a folder the Pygwy script exports into) and, whenever something changed,
+# rewrites the results csv and redraws the figures of the molecules whose series changed. A scan exported into the watched folder that is not in
+# the manifest yet is picked up in one of two ways:
+# - a single scan exported by peaks.py with its "destination" named "<molecule>_<time in minutes>_full.txt" (or .gwyg), e.g. C11OH_30_full.txt,
+#   is read from its file name. The molecule cannot contain an underscore.
+# - the batch mode of peaks.py names its exports "<file>_<channel id>_<channel title>_full.txt", which hold no molecule or time, so they are never read
+#   from their names. They are picked up from the batch_index_manifest.csv peaks.py writes beside them, once its molecule and time_in_minutes are filled in.
+#
+# Run from the command line with
+# "python grain_incremental.py grain_analysis_manifest.csv grain_analysis_results.csv --watch-folder gwy_data --plot-folder graphs"
+# and the same --workers, --noise-robust, --sub-pixel, --dtype and --intermediate-folder options as grain_batch_driver.py. Add --once to update everything a single time and exit.
+#
+# Pipeline:
+# ReadGrainAnalysisManifest() -> DiscoverNewScans() -> RunGrainAnalysisBatchIncrementally() -> WriteGrainAnalysisResultsTable()
+#                                                                                            -> FindChangedMolecules() -> SaveMoleculeSeriesFigures()
+#
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+
+from grain_batch_driver import (results_table_columns, default_processing_dtype, ReadGrainAnalysisManifest, RunGrainAnalysisPipelineOnImage, RunGrainAnalysisBatch,
+                                WriteGrainAnalysisResultsTable, AddDetectionArguments, ReadDetectionArguments)
+from grain_data_loader import default_cache_folder_name
+from grain_figure_rendering import default_comparison_groups, BuildGrainAnalysisReportSpecifications, RenderFigureSpecifications
+from grain_intermediate_store import pipeline_version, HashPipelineSettings
+from grain_profiling import AddProfilingArguments, ReadProfilingArguments, FinishProfiling
+
+
+default_store_file_name = "grain_analysis_results_store.json"
+default_poll_interval_in_seconds = 1
+batch_index_manifest_file_name = "batch_index_manifest.csv"
+scan_file_name_pattern = re.compile(r'^(?P<molecule>[^_]+)_(?P<time_in_minutes>\d+(?:\.\d+)?)_full\.(?:txt|gwyg)$')
+result_columns = [column for column in results_table_columns if column not in ('molecule', 'time_in_minutes', 'file_path')]
+
+
+# Expected input: Path to a manifest csv.
+# Expected Output: Path of the results store kept for it, inside the .grain_analysis_cache folder beside the manifest.
+def GetResultsStorePathForManifest(manifest_path):
+    return os.path.join(os.path.dirname(os.path.abspath(manifest_path)), default_cache_folder_name, default_store_file_name)
+
+# Expected input: Path of a results store, the file does not have to exist yet.
+# Expected Output: Dictionary with 'file_hashes' (absolute path -> [modification time in ns, size, content hash]), 'results' (key -> results of one scan)
+# and 'series_hashes' (molecule -> hash of its series). A missing, unreadable or outdated store gives an empty one, everything is recomputed.
+def LoadResultsStore(store_path):
+    empty_store = {'pipeline_version': pipeline_version, 'file_hashes': dict(), 'results': dict(), 'series_hashes': dict()}
+    try:
+        with open(store_path) as store_file:
+            results_store = json.load(store_file)
+    except (OSError, ValueError):
+        return empty_store
+    if type(results_store) != dict or results_store.get('pipeline_version') != pipeline_version:
+        return empty_store
+    for each_part in ('file_hashes', 'results', 'series_hashes'):
+        if type(results_store.get(each_part)) != dict:
+            return empty_store
+    return results_store
+
+# Expected input: Output from LoadResultsStore() and the path to write it to.
+# Expected Output: None, the store is written to a temporary file first and moved into place, an interrupted write never leaves half a store.
+def SaveResultsStore(results_store, store_path):
+    store_folder = os.path.dirname(os.path.abspath(store_path))
+    os.makedirs(store_folder, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=store_folder, suffix='.json', delete=False) as temporary_store_file:
+        json.dump(results_store, temporary_store_file)
+    os.replace(temporary_store_file.name, store_path)
+
+# Expected input: Path to any file.
+# Expected Output: Hex sha1 of its bytes.
+def HashFileContents(file_path, chunk_size_in_bytes=4*1024*1024):
+    content_hash = hashlib.sha1()
+    with open(file_path, 'rb') as data_file:
+        for each_chunk in iter(lambda: data_file.read(chunk_size_in_bytes), b''):
+            content_hash.update(each_chunk)
+    return content_hash.hexdigest()
+
+# Expected input: Output from LoadResultsStore() and the path of a scan.
+# Expected Output: Content hash of the scan. It is only read when its modification time or size differs from the one stored with its last hash.
+def GetContentHashOfScan(results_store, file_path):
+    file_status = os.stat(file_path)
+    stored_file_hash = results_store['file_hashes'].get(file_path)
+    if stored_file_hash is not None and stored_file_hash[0] == file_status.st_mtime_ns and stored_file_hash[1] == file_status.st_size:
+        return stored_file_hash[2]
+    content_hash = HashFileContents(file_path)
+    results_store['file_hashes'][file_path] = [file_status.st_mtime_ns, file_status.st_size, content_hash]
+    return content_hash
+
+# Expected input: Output from ReadGrainAnalysisManifest(), the store from LoadResultsStore() (updated in place, save it afterwards with SaveResultsStore()),
+# and the "number_of_workers", "detection_settings", "sub_pixel_refinement", "intermediate_folder" and "processing_dtype" passed to RunGrainAnalysisBatch()
+# for the scans that need computing.
+# Expected Output: The results table, the same as RunGrainAnalysisBatch() gives, the list of manifest entries that were recomputed and a list of
+# (manifest entry, error message) for every scan that could not be read or analysed. Those scans are left out of the results table and nothing is stored
+# for them, so they are tried again on the next call while every other scan is still updated.
+def RunGrainAnalysisBatchIncrementally(manifest_entries, results_store, number_of_workers=1, detection_settings=None, sub_pixel_refinement=None,
+                                       intermediate_folder=None, processing_dtype=default_processing_dtype):
+    failed_scans = list()
+    keyed_manifest_entries = list()
+    for each_manifest_entry in manifest_entries:
+        if each_manifest_entry['file_path'] is None:
+            keyed_manifest_entries.append((None, each_manifest_entry))
+            continue
+        try:
+            content_hash = GetContentHashOfScan(results_store, each_manifest_entry['file_path'])
+        except OSError as error:
+            failed_scans.append((each_manifest_entry, str(error)))
+            continue
+        keyed_manifest_entries.append((content_hash + ':' + HashPipelineSettings(each_manifest_entry, detection_settings, sub_pixel_refinement, processing_dtype),
+                                       each_manifest_entry))
+
+    # The same scan can be listed more than once, it is only computed once.
+    entries_to_compute = dict()
+    for each_key, each_manifest_entry in keyed_manifest_entries:
+        if each_key is not None and each_key not in results_store['results'] and each_key not in entries_to_compute:
+            entries_to_compute[each_key] = each_manifest_entry
+    if entries_to_compute:
+        computed_results = RunGrainAnalysisBatch(list(entries_to_compute.values()), number_of_workers, detection_settings, sub_pixel_refinement,
+                                                 intermediate_folder, processing_dtype, report_errors=True)
+        for each_key, each_results_row in zip(entries_to_compute, computed_results):
+            if 'error' in each_results_row:
+                failed_scans.append((entries_to_compute[each_key], each_results_row['error']))
+                continue
+            results_store['results'][each_key] = {column: each_results_row[column] for column in result_columns}
+
+    results_table = list()
+    for each_key, each_manifest_entry in keyed_manifest_entries:
+        if each_key is None:
+            results_table.append(RunGrainAnalysisPipelineOnImage(each_manifest_entry))
+            continue
+        if each_key not in results_store['results']:
+            continue
+        results_row = {'molecule': each_manifest_entry['molecule'], 'time_in_minutes': each_manifest_entry['time_in_minutes'],
+                       'file_path': each_manifest_entry['file_path']}
+        results_row.update(results_store['results'][each_key])
+        results_table.append(results_row)
+
+    used_keys = {each_key for each_key, each_manifest_entry in keyed_manifest_entries}
+    used_file_paths = {each_manifest_entry['file_path'] for each_manifest_entry in manifest_entries}
+    results_store['results'] = {key: value for key, value in results_store['results'].items() if key in used_keys}
+    results_store['file_hashes'] = {key: value for key, value in results_store['file_hashes'].items() if key in used_file_paths}
+    recomputed_entries = [each_manifest_entry for each_key, each_manifest_entry in entries_to_compute.items() if each_key in results_store['results']]
+    return results_table, recomputed_entries, failed_scans
+
+# Expected input: Results table from RunGrainAnalysisBatchIncrementally() and the store it was made with.
+# Expected Output: Sorted list of the molecules whose series (every row of the molecule, by time) is new or differs from the last call,
+# molecules that are gone from the table are listed too (their comparison graphs change) and dropped from the store.
+def FindChangedMolecules(results_table, results_store):
+    rows_of_each_molecule = dict()
+    for each_row in results_table:
+        rows_of_each_molecule.setdefault(each_row['molecule'], []).append([each_row['time_in_minutes']] + [each_row[column] for column in result_columns])
+
+    changed_molecules = list()
+    series_hashes = dict()
+    for molecule, rows_of_molecule in rows_of_each_molecule.items():
+        series_hashes[molecule] = hashlib.sha1(json.dumps(sorted(rows_of_molecule, key=lambda each_row: each_row[0])).encode('utf-8')).hexdigest()
+        if results_store['series_hashes'].get(molecule) != series_hashes[molecule]:
+            changed_molecules.append(molecule)
+    changed_molecules.extend(molecule for molecule in results_store['series_hashes'] if molecule not in series_hashes)
+    results_store['series_hashes'] = series_hashes
+    return sorted(changed_molecules)
+
+# Expected input: Folder the Pygwy script exports into.
+# Expected Output: List of manifest entries for every line of the folder's batch_index_manifest.csv (written by the batch mode of peaks.py) whose molecule
+# and time_in_minutes are filled in, and the set of absolute paths of every export the index lists, filled in or not. No index gives an empty list and set.
+def ReadBatchIndexManifest(scan_folder):
+    index_path = os.path.join(scan_folder, batch_index_manifest_file_name)
+    if not os.path.isfile(index_path):
+        return list(), set()
+    index_entries = list()
+    indexed_file_paths = set()
+    with open(index_path, newline='') as index_file:
+        for line_number, each_line in enumerate(csv.DictReader(index_file), start=2):
+            if not (each_line.get('file_path') or '').strip():
+                continue
+            file_path = os.path.abspath(os.path.join(scan_folder, each_line['file_path'].strip()))
+            indexed_file_paths.add(file_path)
+            if not (each_line.get('molecule') or '').strip() or not (each_line.get('time_in_minutes') or '').strip():
+                continue
+            try:
+                index_entries.append({
+                    'molecule': each_line['molecule'].strip(),
+                    'time_in_minutes': float(each_line['time_in_minutes']),
+                    'file_path': file_path,
+                    'pixel_dimension_of_image': int(each_line['pixel_dimension_of_image']) if each_line.get('pixel_dimension_of_image') else None,
+                    'length_in_micrometers': float(each_line['length_in_micrometers']) if each_line.get('length_in_micrometers') else None,
+                })
+            except (TypeError, ValueError):
+                raise ValueError("Line {} of batch index {} could not be read.".format(line_number, index_path))
+    return index_entries, indexed_file_paths
+
+# Expected input: Folder the Pygwy script exports into and the current output from ReadGrainAnalysisManifest().
+# Expected Output: List of manifest entries, sorted by path, for every scan in the folder that the manifest does not list: the filled in lines of its
+# batch index (see ReadBatchIndexManifest()), then every "<molecule>_<time>_full.txt/.gwyg" file the index does not list.
+# The molecule is matched to the manifest's molecules ignoring case (c7OH is C7OH), a molecule the manifest does not have yet is upper-cased.
+# A new csv export takes the pixel dimension and length of the last scan of its molecule in the manifest (the defaults of ResolveImageDimensions() for a new
+# molecule), a new .gwyg export leaves them empty so they are read from its own header. A batch index line keeps the pixel dimension and length peaks.py gave it.
+def DiscoverNewScans(scan_folder, manifest_entries):
+    known_file_paths = {os.path.abspath(each_manifest_entry['file_path']) for each_manifest_entry in manifest_entries if each_manifest_entry['file_path'] is not None}
+    known_molecules = {each_manifest_entry['molecule'].lower(): each_manifest_entry['molecule'] for each_manifest_entry in manifest_entries}
+    image_dimensions_of_molecules = {each_manifest_entry['molecule'].lower(): (each_manifest_entry['pixel_dimension_of_image'], each_manifest_entry['length_in_micrometers'])
+                                     for each_manifest_entry in manifest_entries if each_manifest_entry['file_path'] is not None}
+    index_entries, indexed_file_paths = ReadBatchIndexManifest(scan_folder)
+    new_manifest_entries = list()
+    for each_index_entry in index_entries:
+        if each_index_entry['file_path'] not in known_file_paths and os.path.isfile(each_index_entry['file_path']):
+            each_index_entry['molecule'] = known_molecules.get(each_index_entry['molecule'].lower(), each_index_entry['molecule'].upper())
+            new_manifest_entries.append(each_index_entry)
+    for each_file_name in sorted(os.listdir(scan_folder)):
+        file_name_match = scan_file_name_pattern.match(each_file_name)
+        file_path = os.path.abspath(os.path.join(scan_folder, each_file_name))
+        if file_name_match is None or file_path in known_file_paths or file_path in indexed_file_paths or not os.path.isfile(file_path):
+            continue
+        molecule = known_molecules.get(file_name_match.group('molecule').lower(), file_name_match.group('molecule').upper())
+        pixel_dimension_of_image, length_in_micrometers = None, None
+        if not each_file_name.endswith('.gwyg'):
+            pixel_dimension_of_image, length_in_micrometers = image_dimensions_of_molecules.get(molecule.lower(), (None, None))
+        new_manifest_entries.append({'molecule': molecule, 'time_in_minutes': float(file_name_match.group('time_in_minutes')), 'file_path': file_path,
+                                     'pixel_dimension_of_image': pixel_dimension_of_image, 'length_in_micrometers': length_in_micrometers})
+    return sorted(new_manifest_entries, key=lambda each_manifest_entry: each_manifest_entry['file_path'])
+
+# Expected input: Results table, the molecules whose series changed, the folder to write the figures to and the groups of molecules drawn on one
+# comparison graph (see default_comparison_groups in grain_figure_rendering.py).
+# Expected Output: None, writes the diameter and height graph of every changed molecule ("<molecule>_average_diameter.png" and "<molecule>_average_height.png")
+# and every comparison graph of a group holding a changed molecule, a removed molecule included, with grain_figure_rendering.py.
+# matplotlib is only imported the first time any figure is drawn.
+def SaveMoleculeSeriesFigures(results_table, molecules, plot_folder, comparison_groups=default_comparison_groups):
+    RenderFigureSpecifications(BuildGrainAnalysisReportSpecifications(results_table, comparison_groups, changed_molecules=molecules), plot_folder)
+
+# Expected input: Paths of the manifest and of the results csv to keep up to date. Optionally the folder the Pygwy script exports into ("scan_folder", see DiscoverNewScans()),
+# the folder to redraw the figures in ("plot_folder", None draws nothing), the results store path (defaulted to GetResultsStorePathForManifest()),
+# the seconds between polls, the options of RunGrainAnalysisBatch(), a function called as on_results_changed(results_table, changed_molecules) after every update,
+# and "number_of_polls" to stop after that many polls (None keeps watching until interrupted).
+# Expected Output: The last results table. A scan that cannot be read or analysed (it is still being written, or it does not split into the pixel dimension
+# it was given) is left out and tried again on the next poll, the other scans are updated as usual. Only an unreadable manifest skips a whole poll.
+def WatchGrainAnalysisManifest(manifest_path, results_path, scan_folder=None, plot_folder=None, store_path=None,
+                               poll_interval_in_seconds=default_poll_interval_in_seconds, number_of_workers=1, detection_settings=None,
+                               sub_pixel_refinement=None, intermediate_folder=None, on_results_changed=None, number_of_polls=None,
+                               processing_dtype=default_processing_dtype):
+    if store_path is None:
+        store_path = GetResultsStorePathForManifest(manifest_path)
+    results_store = LoadResultsStore(store_path)
+    results_table = None
+    last_failed_scans = list()
+    poll_number = 0
+    while number_of_polls is None or poll_number < number_of_polls:
+        if poll_number > 0:
+            time.sleep(poll_interval_in_seconds)
+        poll_number += 1
+
+        start_time = time.perf_counter()
+        try:
+            manifest_entries = ReadGrainAnalysisManifest(manifest_path)
+            if scan_folder is not None:
+                manifest_entries = manifest_entries + DiscoverNewScans(scan_folder, manifest_entries)
+            new_results_table, recomputed_entries, failed_scans = RunGrainAnalysisBatchIncrementally(manifest_entries, results_store, number_of_workers,
+                                                                                                    detection_settings, sub_pixel_refinement,
+                                                                                                    intermediate_folder, processing_dtype)
+        except (OSError, ValueError) as error:
+            print("Could not update the results, trying again on the next poll: {}".format(error))
+            continue
+        # A scan that keeps failing is only reported again once the list of failing scans changes.
+        if failed_scans != last_failed_scans:
+            for each_manifest_entry, error_message in failed_scans:
+                print("Could not analyse {}, trying again on the next poll: {}".format(each_manifest_entry['file_path'], error_message))
+            last_failed_scans = failed_scans
+
+        changed_molecules = FindChangedMolecules(new_results_table, results_store)
+        if new_results_table == results_table and not changed_molecules and os.path.exists(results_path):
+            continue
+        results_table = new_results_table
+        WriteGrainAnalysisResultsTable(results_table, results_path)
+        if plot_folder is not None and changed_molecules:
+            SaveMoleculeSeriesFigures(results_table, changed_molecules, plot_folder)
+        SaveResultsStore(results_store, store_path)
+        if on_results_changed is not None:
+            on_results_changed(results_table, changed_molecules)
+        print("Updated {} ({} of {} scans recomputed, redrawn: {}) in {:.0f} ms.".format(results_path, len(recomputed_entries), len(manifest_entries),
+                                                                                         ", ".join(changed_molecules) or "nothing", (time.perf_counter() - start_time)*1000))
+    return results_table
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Keep the results table of a manifest up to date, recomputing only new or changed scans.")
+    argument_parser.add_argument('manifest_path', help="csv with molecule, time_in_minutes and file_path columns")
+    argument_parser.add_argument('results_path', help="csv file the results table is written to")
+    argument_parser.add_argument('--watch-folder', help="folder the Pygwy script exports into, new <molecule>_<time>_full.txt files and filled in lines of its "
+                                                        "batch_index_manifest.csv are added automatically")
+    argument_parser.add_argument('--plot-folder', help="folder the figure of every changed molecule is redrawn in")
+    argument_parser.add_argument('--store', help="results store file (default .grain_analysis_cache/{} beside the manifest)".format(default_store_file_name))
+    argument_parser.add_argument('--interval', type=float, default=default_poll_interval_in_seconds, help="seconds between polls (default 1)")
+    argument_parser.add_argument('--once', action='store_true', help="update once and exit instead of watching")
+    argument_parser.add_argument('--workers', type=int, default=1, help="number of worker processes, 0 for one per CPU core (default 1)")
+    argument_parser.add_argument('--intermediate-folder', help="folder the minima, diameters and heights of every scan are saved in (see grain_intermediate_store.py)")
+    AddDetectionArguments(argument_parser)
+    AddProfilingArguments(argument_parser)
+    arguments = argument_parser.parse_args()
+    detection_settings, sub_pixel_refinement, processing_dtype = ReadDetectionArguments(arguments)
+    ReadProfilingArguments(arguments)
+
+    try:
+        WatchGrainAnalysisManifest(arguments.manifest_path, arguments.results_path, arguments.watch_folder, arguments.plot_folder, arguments.store,
+                                   arguments.interval, arguments.workers or None, detection_settings, sub_pixel_refinement, arguments.intermediate_folder,
+                                   number_of_polls=1 if arguments.once else None, processing_dtype=processing_dtype)
+    except KeyboardInterrupt:
+        pass
+    FinishProfiling()
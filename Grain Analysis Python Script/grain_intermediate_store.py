@@ -0,0 +1,144 @@
+# Grain Analysis Intermediate Store
+# This is used to keep what the pipeline finds in every scan (the extrema, the diameter of every grain and the height of every peak) on disk,
+# so a new statistic or graph can be worked out from them in milliseconds instead of going back to the raw height matrices.
+#
+# The intermediates of one image are a dictionary of flat numpy arrays in the same CSR-style (compressed row) layout as FindRelativeExtremaOfAllCrossSections():
+#   minima_row_offsets, minima_locations     - locations of the relative minima in micrometers (sub-pixel when refined), row after row
+#   diameter_row_offsets, diameters          - distances between neighbouring minima of the same cross section in micrometers, the grain diameters
+#   maxima_row_offsets, maxima_locations     - pixel locations of the relative maxima
+#   heights                                  - z-value of every relative maximum, the grain heights (shares maxima_row_offsets), in the dtype the scan was processed in
+#   number_of_rows, pixel_dimension_of_image, length_in_micrometers
+# The values of cross section i are values[row_offsets[i]:row_offsets[i+1]]. CalculateGrainStatisticsFromIntermediates() and any other statistic work on the
+# flat arrays straight away, for example np.median(image_intermediates['diameters']). SplitIntermediatesIntoRows() turns them back into the nested lists the
+# Extract*() functions of grain_analysis_functions.py give, for code that still wants one array per cross section.
+#
+# Each image is saved as one uncompressed .npz file in an intermediate folder, named after the scan and a hash of the settings it was analysed with,
+# and holding the modification time and size of the scan so a re-exported scan is never matched with old intermediates.
+# Pass "intermediate_folder" to RunGrainAnalysisBatch() (or --intermediate-folder on the command line) to fill the folder while the batch runs.
+#
+# Pipeline:
+# SplitDataMatrixIntoRows() -> ExtractImageIntermediates() -> SaveImageIntermediates()
+# LoadIntermediatesOfManifestEntry() -> CalculateGrainStatisticsFromIntermediates()
+#
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+from grain_analysis_functions import (ExtractRowOffsetsOfRelativeMinima_GrainDiameter, ExtractRowOffsetsOfRelativeMaxima_GrainHeight, CalculateDistancesBetweenNeighbouringExtrema,
+                                      CalculateAverageAndStandardDeviationOfValues, CalculateAverageAndStandardDeviationOfRowMaximaAndMinima)
+from grain_profiling import ProfileStage
+
+
+# Raise whenever a change to the pipeline changes the numbers it gives, every stored intermediate and result is then worked out again.
+pipeline_version = 1
+
+
+# Expected input: Output from SplitDataMatrixIntoRows() and the same length_in_micrometers, pixel_dimension_of_image, detection_settings and
+# sub_pixel_refinement as passed to ExtractDistancesBetweenRelativeMinima_GrainDiameter().
+# Expected Output: Dictionary of the intermediates of the image (see the top of this file). The minima and heights are the flat arrays of
+# ExtractRowOffsetsOfRelativeMinima_GrainDiameter() and ExtractRowOffsetsOfRelativeMaxima_GrainHeight(), kept in their CSR-style layout.
+def ExtractImageIntermediates(data_matrix, length_in_micrometers=6, pixel_dimension_of_image=512, detection_settings=None, sub_pixel_refinement=None):
+    data_matrix = np.atleast_2d(np.asarray(data_matrix))
+    with ProfileStage('find_minima') as stage_record:
+        minima_row_offsets, minima_locations = ExtractRowOffsetsOfRelativeMinima_GrainDiameter(data_matrix, length_in_micrometers, pixel_dimension_of_image,
+                                                                                              detection_settings, sub_pixel_refinement)
+        stage_record['items'] = len(minima_locations)
+    diameter_row_offsets, diameters = CalculateDistancesBetweenNeighbouringExtrema(minima_row_offsets, minima_locations)
+
+    with ProfileStage('find_maxima') as stage_record:
+        maxima_row_offsets, maxima_locations, heights = ExtractRowOffsetsOfRelativeMaxima_GrainHeight(data_matrix, detection_settings)
+        stage_record['items'] = len(maxima_locations)
+    return {'minima_row_offsets': minima_row_offsets, 'minima_locations': minima_locations,
+            'diameter_row_offsets': diameter_row_offsets, 'diameters': diameters,
+            'maxima_row_offsets': maxima_row_offsets, 'maxima_locations': maxima_locations, 'heights': heights,
+            'number_of_rows': data_matrix.shape[0], 'pixel_dimension_of_image': pixel_dimension_of_image, 'length_in_micrometers': length_in_micrometers}
+
+# Expected input: A row offsets array and the flat values it belongs to, for example image_intermediates['minima_row_offsets'] and image_intermediates['minima_locations'].
+# Expected Output: List with one array of values per cross section, views into the flat array. The same nested list the Extract*() functions give.
+def SplitIntermediatesIntoRows(row_offsets, values):
+    return np.split(values, row_offsets[1:-1]) if len(row_offsets) > 1 else []
+
+# Expected input: Output from ExtractImageIntermediates() or LoadImageIntermediates().
+# Expected Output: Dictionary with the twelve statistics columns of the results table (mean_diameter, std_diameter, ... min_std_height),
+# the same numbers the Calculate*() functions give on the output of the Extract*() functions. They are worked out straight from the stored flat
+# diameters and heights and their row offsets, nothing is split into rows or worked out again.
+def CalculateGrainStatisticsFromIntermediates(image_intermediates):
+    grain_statistics = dict()
+    grain_statistics['mean_diameter'], grain_statistics['std_diameter'] = CalculateAverageAndStandardDeviationOfValues(image_intermediates['diameters'])
+    (grain_statistics['max_average_diameter'], grain_statistics['max_std_diameter'],
+     grain_statistics['min_average_diameter'], grain_statistics['min_std_diameter']) = CalculateAverageAndStandardDeviationOfRowMaximaAndMinima(
+        image_intermediates['diameter_row_offsets'], image_intermediates['diameters'])
+    grain_statistics['mean_height'], grain_statistics['std_height'] = CalculateAverageAndStandardDeviationOfValues(image_intermediates['heights'])
+    (grain_statistics['max_average_height'], grain_statistics['max_std_height'],
+     grain_statistics['min_average_height'], grain_statistics['min_std_height']) = CalculateAverageAndStandardDeviationOfRowMaximaAndMinima(
+        image_intermediates['maxima_row_offsets'], image_intermediates['heights'])
+    return grain_statistics
+
+# Expected input: One entry from ReadGrainAnalysisManifest() and the "detection_settings", "sub_pixel_refinement" and "processing_dtype" passed to RunGrainAnalysisBatch().
+# Expected Output: Hex sha1 of every setting the results of the entry depend on apart from the scan itself.
+def HashPipelineSettings(manifest_entry, detection_settings=None, sub_pixel_refinement=None, processing_dtype=np.float64):
+    pipeline_settings = {'pipeline_version': pipeline_version,
+                         'pixel_dimension_of_image': manifest_entry['pixel_dimension_of_image'],
+                         'length_in_micrometers': manifest_entry['length_in_micrometers'],
+                         'detection_settings': detection_settings, 'sub_pixel_refinement': sub_pixel_refinement,
+                         'processing_dtype': np.dtype(processing_dtype).name}
+    return hashlib.sha1(json.dumps(pipeline_settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+# Expected input: The intermediate folder, one entry from ReadGrainAnalysisManifest() that has a file and the settings it is analysed with.
+# Expected Output: Path of the .npz file its intermediates are kept in, "<scan name>_<hash of the scan path and settings>.npz".
+def GetIntermediatePathForManifestEntry(intermediate_folder, manifest_entry, detection_settings=None, sub_pixel_refinement=None, processing_dtype=np.float64):
+    absolute_file_path = os.path.abspath(manifest_entry['file_path'])
+    intermediate_key = "{}|{}".format(absolute_file_path, HashPipelineSettings(manifest_entry, detection_settings, sub_pixel_refinement, processing_dtype))
+    intermediate_key_hash = hashlib.sha1(intermediate_key.encode('utf-8')).hexdigest()[:16]
+    file_name_without_extension = os.path.splitext(os.path.basename(absolute_file_path))[0]
+    return os.path.join(intermediate_folder, "{}_{}.npz".format(file_name_without_extension, intermediate_key_hash))
+
+# Expected input: Output from ExtractImageIntermediates(), the path to write it to and optionally the path of the scan it was worked out from.
+# Expected Output: None, writes the .npz file through a temporary file so an interrupted write never leaves half a file.
+# A failed write removes the temporary file again before the error is raised.
+# The modification time and size of "source_file_path" are stored with it for LoadIntermediatesOfManifestEntry() to check.
+def SaveImageIntermediates(image_intermediates, intermediate_path, source_file_path=None):
+    stored_arrays = dict(image_intermediates)
+    if source_file_path is not None:
+        source_file_status = os.stat(source_file_path)
+        stored_arrays['source_modification_time_ns'] = source_file_status.st_mtime_ns
+        stored_arrays['source_size'] = source_file_status.st_size
+    intermediate_folder = os.path.dirname(os.path.abspath(intermediate_path))
+    os.makedirs(intermediate_folder, exist_ok=True)
+    temporary_intermediate_path = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=intermediate_folder, suffix='.npz', delete=False) as temporary_intermediate_file:
+            temporary_intermediate_path = temporary_intermediate_file.name
+            np.savez(temporary_intermediate_file, **stored_arrays)
+        os.replace(temporary_intermediate_path, intermediate_path)
+    except BaseException:
+        if temporary_intermediate_path is not None:
+            try:
+                os.remove(temporary_intermediate_path)
+            except OSError:
+                pass
+        raise
+
+# Expected input: Path of a .npz file written by SaveImageIntermediates().
+# Expected Output: Dictionary of the intermediates, the same keys ExtractImageIntermediates() gives (plus the source file stat when it was saved).
+# Scalars come back as Python numbers, everything is read into memory at once.
+def LoadImageIntermediates(intermediate_path):
+    with np.load(intermediate_path) as intermediate_file:
+        return {key: (intermediate_file[key].item() if intermediate_file[key].ndim == 0 else intermediate_file[key]) for key in intermediate_file.files}
+
+# Expected input: The intermediate folder, one entry from ReadGrainAnalysisManifest() that has a file and the settings it was analysed with.
+# Expected Output: Its intermediates from LoadImageIntermediates(), or None when they have not been saved yet or the scan changed after they were saved.
+def LoadIntermediatesOfManifestEntry(intermediate_folder, manifest_entry, detection_settings=None, sub_pixel_refinement=None, processing_dtype=np.float64):
+    intermediate_path = GetIntermediatePathForManifestEntry(intermediate_folder, manifest_entry, detection_settings, sub_pixel_refinement, processing_dtype)
+    try:
+        image_intermediates = LoadImageIntermediates(intermediate_path)
+        source_file_status = os.stat(manifest_entry['file_path'])
+    except (OSError, ValueError):
+        return None
+    if (image_intermediates.get('source_modification_time_ns') != source_file_status.st_mtime_ns
+            or image_intermediates.get('source_size') != source_file_status.st_size):
+        return None
+    return image_intermediates
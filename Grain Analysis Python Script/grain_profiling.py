@@ -0,0 +1,217 @@
+# Grain Analysis Profiling
+# This is used to find out where the time of a slow batch goes (loading the csv, finding the extrema, the statistics or the plotting)
+# from a normal production run, without attaching a profiler.
+#
+# Every stage of the pipeline is wrapped in "with ProfileStage('load', image) as stage_record:". While profiling is on, each stage leaves one record:
+#   image           - the scan (or figure) the stage worked on. A stage inside another stage takes the image of the outer one when it is not given its own.
+#   stage           - name of the stage (see the list below)
+#   wall_seconds, cpu_seconds - time.perf_counter() and time.process_time() taken by the stage
+#   peak_megabytes  - the most memory (tracemalloc) the stage had allocated at once above what was allocated when it started, None without memory tracing
+#   items           - how much the stage worked through, set by the stage itself as stage_record['items'] (z-values loaded, extrema found, ...)
+# While profiling is off ProfileStage() only checks one flag, the pipeline runs as fast as it always has.
+#
+# The stages of grain_batch_driver.py are: pipeline (one per scan, holding all the others), load, split, find_minima (with any sub-pixel refinement), find_maxima,
+# statistics, and load_intermediates/save_intermediates when an intermediate folder is used. grain_figure_rendering.py adds plot and save_figure.
+#
+# Turn profiling on with the environment variable GRAIN_ANALYSIS_PROFILE, set to the path of the report to write (.json or .csv) or to 1 for
+# only the summary table, or with --profile [REPORT] on the command line of grain_batch_driver.py, grain_incremental.py and grain_figure_rendering.py.
+# Add --profile-no-memory (or set GRAIN_ANALYSIS_PROFILE_MEMORY=0) to leave out tracemalloc, which slows every allocation down.
+# Worker processes send their records back with their results (RunWithProfilingInWorker()), so a run with --workers 8 gives the same report.
+# The report is written and the summary table (totals per stage) printed by FinishProfiling() at the end of a run, or when Python exits.
+#
+# Pipeline:
+# EnableProfiling() -> ProfileStage() per stage -> FinishProfiling() -> SummarizeProfilingRecords() -> PrintProfilingSummary() / WriteProfilingReport()
+#
+
+import atexit
+import contextlib
+import csv
+import json
+import multiprocessing
+import os
+import time
+import tracemalloc
+
+
+profiling_environment_variable = 'GRAIN_ANALYSIS_PROFILE'
+profiling_memory_environment_variable = 'GRAIN_ANALYSIS_PROFILE_MEMORY'
+profiling_record_columns = ['image', 'stage', 'wall_seconds', 'cpu_seconds', 'peak_megabytes', 'items']
+profiling_summary_columns = ['stage', 'calls', 'wall_seconds', 'cpu_seconds', 'mean_wall_seconds', 'peak_megabytes', 'items', 'items_per_second']
+
+# Everything profiling keeps for this process: whether it is on, whether memory is traced (and whether this module started tracemalloc),
+# where the report goes, the finished records and the stages open right now, innermost last.
+profiling_state = {'enabled': False, 'trace_memory': False, 'started_tracemalloc': False, 'report_path': None, 'records': [], 'open_stages': []}
+
+
+# Expected input: Path of the report to write at the end of the run (.json or .csv, None for only the summary table) and whether to trace memory.
+# Expected Output: None, every ProfileStage() from now on leaves a record.
+def EnableProfiling(report_path=None, trace_memory=True):
+    profiling_state['enabled'] = True
+    profiling_state['report_path'] = report_path
+    profiling_state['trace_memory'] = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        profiling_state['started_tracemalloc'] = True
+
+# Expected input: None.
+# Expected Output: None, stops recording (and stops tracemalloc if EnableProfiling() started it). The records made so far are kept.
+def DisableProfiling():
+    profiling_state['enabled'] = False
+    if profiling_state['started_tracemalloc']:
+        tracemalloc.stop()
+        profiling_state['started_tracemalloc'] = False
+
+# Expected input: None.
+# Expected Output: True while profiling is on.
+def IsProfilingEnabled():
+    return profiling_state['enabled']
+
+# Expected input: None.
+# Expected Output: The settings a worker process needs to profile the same way (see RunWithProfilingInWorker()), None while profiling is off.
+def GetProfilingSettings():
+    if not profiling_state['enabled']:
+        return None
+    return {'trace_memory': profiling_state['trace_memory']}
+
+# Expected input: None.
+# Expected Output: List of every record made so far, which are then cleared.
+def TakeProfilingRecords():
+    profiling_records = profiling_state['records']
+    profiling_state['records'] = []
+    return profiling_records
+
+# Expected input: List of records made somewhere else, for example by a worker process.
+# Expected Output: None, the records are added to the ones of this process.
+def AddProfilingRecords(profiling_records):
+    profiling_state['records'].extend(profiling_records)
+
+# Expected input: Current peak of tracemalloc in bytes.
+# Expected Output: None, every open stage remembers the peak if it is the highest it has seen.
+def _FoldPeakIntoOpenStages(peak_in_bytes):
+    for each_open_stage in profiling_state['open_stages']:
+        each_open_stage['highest_traced_bytes'] = max(each_open_stage['highest_traced_bytes'], peak_in_bytes)
+
+# Expected input: Name of the stage and the image it works on (defaulted to the image of the stage it runs inside).
+# Expected Output: Context manager giving the stage record, set stage_record['items'] inside the with block. The record is kept when the block ends,
+# even when it ends with an exception. While profiling is off it gives a throwaway dictionary and records nothing.
+# tracemalloc only has one peak, so it is reset at the start of every stage after the open stages have taken the peak so far.
+@contextlib.contextmanager
+def ProfileStage(stage, image=None):
+    if not profiling_state['enabled']:
+        yield {}
+        return
+
+    open_stages = profiling_state['open_stages']
+    if image is None and open_stages:
+        image = open_stages[-1]['record']['image']
+    stage_record = {'image': image, 'stage': stage, 'wall_seconds': None, 'cpu_seconds': None, 'peak_megabytes': None, 'items': None}
+    open_stage = {'record': stage_record, 'traced_bytes_at_start': 0, 'highest_traced_bytes': 0}
+    memory_is_traced = profiling_state['trace_memory'] and tracemalloc.is_tracing()
+    if memory_is_traced:
+        traced_bytes, peak_traced_bytes = tracemalloc.get_traced_memory()
+        _FoldPeakIntoOpenStages(peak_traced_bytes)
+        tracemalloc.reset_peak()
+        open_stage['traced_bytes_at_start'] = open_stage['highest_traced_bytes'] = traced_bytes
+    open_stages.append(open_stage)
+    start_wall_time, start_cpu_time = time.perf_counter(), time.process_time()
+    try:
+        yield stage_record
+    finally:
+        stage_record['wall_seconds'] = time.perf_counter() - start_wall_time
+        stage_record['cpu_seconds'] = time.process_time() - start_cpu_time
+        if memory_is_traced and tracemalloc.is_tracing():
+            _FoldPeakIntoOpenStages(tracemalloc.get_traced_memory()[1])
+            stage_record['peak_megabytes'] = (open_stage['highest_traced_bytes'] - open_stage['traced_bytes_at_start'])/1024/1024
+        open_stages.remove(open_stage)
+        profiling_state['records'].append(stage_record)
+
+# Expected input: Output from GetProfilingSettings() in the parent process, a function to run in a worker process and its arguments.
+# Expected Output: (return value of the function, list of the records it made). Profiling is turned on in the worker for the call when the settings
+# are not None, records inherited from the parent by a forked worker are dropped first.
+def RunWithProfilingInWorker(profiling_settings, function, *arguments):
+    if profiling_settings is None:
+        return function(*arguments), []
+    if not profiling_state['enabled']:
+        EnableProfiling(trace_memory=profiling_settings['trace_memory'])
+    TakeProfilingRecords()
+    return_value = function(*arguments)
+    return return_value, TakeProfilingRecords()
+
+# Expected input: List of records.
+# Expected Output: List with one dictionary per stage, in the order the stages first ran (see profiling_summary_columns): the number of calls,
+# the total wall and CPU seconds, the mean wall seconds per call, the highest peak memory, the total items and the items per wall second.
+def SummarizeProfilingRecords(profiling_records):
+    summary_of_each_stage = dict()
+    for each_record in profiling_records:
+        stage_summary = summary_of_each_stage.setdefault(each_record['stage'], {'stage': each_record['stage'], 'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                                                                                'peak_megabytes': None, 'items': None})
+        stage_summary['calls'] += 1
+        stage_summary['wall_seconds'] += each_record['wall_seconds']
+        stage_summary['cpu_seconds'] += each_record['cpu_seconds']
+        if each_record['peak_megabytes'] is not None:
+            stage_summary['peak_megabytes'] = max(stage_summary['peak_megabytes'] or 0.0, each_record['peak_megabytes'])
+        if each_record['items'] is not None:
+            stage_summary['items'] = (stage_summary['items'] or 0) + each_record['items']
+    for stage_summary in summary_of_each_stage.values():
+        stage_summary['mean_wall_seconds'] = stage_summary['wall_seconds']/stage_summary['calls']
+        stage_summary['items_per_second'] = stage_summary['items']/stage_summary['wall_seconds'] if stage_summary['items'] is not None and stage_summary['wall_seconds'] > 0 else None
+    return list(summary_of_each_stage.values())
+
+# Expected input: List of records.
+# Expected Output: None, prints the totals of every stage as a table.
+def PrintProfilingSummary(profiling_records):
+    print("{:<20}{:>8}{:>14}{:>14}{:>14}{:>12}{:>14}{:>16}".format("Stage", "Calls", "Wall s", "CPU s", "Mean wall s", "Peak MB", "Items", "Items/s"))
+    for stage_summary in SummarizeProfilingRecords(profiling_records):
+        print("{:<20}{:>8}{:>14.4f}{:>14.4f}{:>14.4f}{:>12}{:>14}{:>16}".format(
+            stage_summary['stage'], stage_summary['calls'], stage_summary['wall_seconds'], stage_summary['cpu_seconds'], stage_summary['mean_wall_seconds'],
+            "-" if stage_summary['peak_megabytes'] is None else "{:.1f}".format(stage_summary['peak_megabytes']),
+            "-" if stage_summary['items'] is None else stage_summary['items'],
+            "-" if stage_summary['items_per_second'] is None else "{:.0f}".format(stage_summary['items_per_second'])))
+
+# Expected input: Path of the report, ending in .json (records and summary) or .csv (one line per record), and the records.
+# Expected Output: None, writes the report.
+def WriteProfilingReport(report_path, profiling_records):
+    if report_path.lower().endswith('.json'):
+        with open(report_path, 'w') as report_file:
+            json.dump({'records': profiling_records, 'summary': SummarizeProfilingRecords(profiling_records)}, report_file, indent=1)
+    elif report_path.lower().endswith('.csv'):
+        with open(report_path, 'w', newline='') as report_file:
+            report_writer = csv.DictWriter(report_file, fieldnames=profiling_record_columns)
+            report_writer.writeheader()
+            report_writer.writerows(profiling_records)
+    else:
+        raise ValueError("Profiling report {} must be a .json or .csv file.".format(report_path))
+
+# Expected input: None.
+# Expected Output: None, while profiling is on prints the summary table of every record so far, writes the report if a report path was given,
+# and clears the records so they are not reported twice.
+def FinishProfiling():
+    if not profiling_state['enabled'] or not profiling_state['records']:
+        return
+    profiling_records = TakeProfilingRecords()
+    PrintProfilingSummary(profiling_records)
+    if profiling_state['report_path']:
+        WriteProfilingReport(profiling_state['report_path'], profiling_records)
+        print("Profiling report written to {}.".format(profiling_state['report_path']))
+
+# Expected input: An argparse.ArgumentParser.
+# Expected Output: None, adds the --profile and --profile-no-memory options to it.
+def AddProfilingArguments(argument_parser):
+    argument_parser.add_argument('--profile', nargs='?', const='', metavar='REPORT',
+                                 help="time every pipeline stage and print a summary, write every record to REPORT (.json or .csv) if given")
+    argument_parser.add_argument('--profile-no-memory', action='store_true', help="leave out the tracemalloc peak memory when profiling")
+
+# Expected input: Arguments parsed by a parser that went through AddProfilingArguments().
+# Expected Output: None, turns profiling on when --profile was given.
+def ReadProfilingArguments(arguments):
+    if arguments.profile is not None:
+        EnableProfiling(arguments.profile or None, not arguments.profile_no_memory)
+
+
+# The environment variable turns profiling on in every process that imports this file. Only the main process reports when it exits,
+# worker processes hand their records back instead.
+if os.environ.get(profiling_environment_variable):
+    EnableProfiling(None if os.environ[profiling_environment_variable] == '1' else os.environ[profiling_environment_variable],
+                    os.environ.get(profiling_memory_environment_variable, '1') != '0')
+    if multiprocessing.parent_process() is None:
+        atexit.register(FinishProfiling)
@@ -0,0 +1,191 @@
+# Grain Segmentation In 2D
+# This is used to find every grain of an image as a whole 2D region, instead of inferring grains from the relative minima of each cross section,
+# so each physical grain is counted once and its area can be measured.
+#
+# The height matrix is cut into grains by a watershed on the (optionally smoothed) surface, done by steepest ascent:
+# every pixel points at its highest neighbour (of the 8 around it) if that neighbour is higher than itself, so following the pointers climbs to a local maximum.
+# Every local maximum is the marker of one grain and every pixel belongs to the grain of the maximum it climbs to. The pointers are resolved for the whole
+# image at once by pointer jumping (each pixel's pointer is replaced by its pointer's pointer until nothing changes), which takes about log2 of the longest
+# climb in whole-array steps instead of one flood fill per grain.
+# Grains that are only a noise bump on the side of a bigger grain can then be merged into it with a union-find over the saddles between neighbouring grains:
+# a grain whose top is less than "minimum_prominence" above the highest saddle to a higher grain joins that grain, the same idea as the prominence filter
+# of FindProminentExtremaOfAllCrossSections().
+#
+# Pipeline:
+# SplitDataMatrixIntoRows() -> SegmentGrainsByWatershed() -> MeasureSegmentedGrains() -> CalculateAverageAndStandardDeviation_GrainArea()
+#                                                                                      -> CalculateAverageAndStandardDeviation_EquivalentGrainDiameter()
+#                                                                                      -> CalculateAverageAndStandardDeviation_MaximumGrainHeight()
+# ExtractGrainPropertiesBySegmentation() runs the first three in one call.
+#
+
+import numpy as np
+from scipy.ndimage import gaussian_filter
+from grain_statistics import CreateStatisticsAccumulator, UpdateStatisticsAccumulator, SummarizeStatisticsAccumulator
+
+
+# A starting point for SegmentGrainsByWatershed(), z-values in nm: a 1 pixel gaussian smoothing and bumps that stand less than 0.5 nm above their saddle merged away.
+default_segmentation_settings = {'smoothing_sigma_in_pixels': 1, 'minimum_prominence': 0.5}
+
+
+# Expected input: Output from SplitDataMatrixIntoRows(), all z-values finite, pass the gaussian smoothing in pixels applied before segmenting (0 for none)
+# and the minimum prominence a grain needs to stay separate from its higher neighbour (0 keeps every local maximum as a grain).
+# Expected Output: Integer matrix of the same shape labelling the grain of every pixel from 0 to number of grains - 1, and the flat index of the top of each grain.
+def SegmentGrainsByWatershed(data_matrix, smoothing_sigma_in_pixels=1, minimum_prominence=0):
+    data_matrix = np.asarray(data_matrix)
+    if data_matrix.ndim != 2:
+        raise ValueError("Data matrix must be 2D, the output from SplitDataMatrixIntoRows().")
+    if not np.all(np.isfinite(data_matrix)):
+        raise ValueError("Data matrix must not contain nan or infinite z-values.")
+    if not np.issubdtype(data_matrix.dtype, np.floating):
+        data_matrix = data_matrix.astype(np.float64)
+    if smoothing_sigma_in_pixels > 0:
+        data_matrix = gaussian_filter(data_matrix, smoothing_sigma_in_pixels, mode='nearest')
+
+    number_of_rows, number_of_columns = data_matrix.shape
+    index_dtype = np.int32 if data_matrix.size < 2**31 else np.int64
+    flat_indices = np.arange(data_matrix.size, dtype=index_dtype).reshape(data_matrix.shape)
+
+    # Steepest ascent, the highest of the 3x3 pixels around every pixel (itself included) found in two passes: the highest of each row of three first,
+    # then the highest of those three rows. Equal heights are split by flat index (the later pixel counts as higher) so a flat top still climbs to a single pixel
+    # instead of every pixel of it being its own maximum: a pixel before the highest so far has to be strictly higher to replace it, a pixel after it only as high.
+    padded_matrix = np.pad(data_matrix, 1, mode='constant', constant_values=-np.inf)
+    highest_of_three_columns = padded_matrix[:, 1:-1].copy()
+    column_step = np.zeros(highest_of_three_columns.shape, dtype=np.int8)
+    for step, neighbour_z_values, replaces_if in ((-1, padded_matrix[:, :-2], np.greater), (1, padded_matrix[:, 2:], np.greater_equal)):
+        neighbour_is_higher = replaces_if(neighbour_z_values, highest_of_three_columns)
+        np.copyto(highest_of_three_columns, neighbour_z_values, where=neighbour_is_higher)
+        np.copyto(column_step, step, where=neighbour_is_higher)
+    del padded_matrix
+
+    highest_z_values = highest_of_three_columns[1:-1].copy()
+    highest_column_step = column_step[1:-1].copy()
+    offset_to_highest = np.zeros(data_matrix.shape, dtype=index_dtype)
+    for step, rows, replaces_if in ((-1, slice(None, -2), np.greater), (1, slice(2, None), np.greater_equal)):
+        neighbour_is_higher = replaces_if(highest_of_three_columns[rows], highest_z_values)
+        np.copyto(highest_z_values, highest_of_three_columns[rows], where=neighbour_is_higher)
+        np.copyto(highest_column_step, column_step[rows], where=neighbour_is_higher)
+        np.copyto(offset_to_highest, step*number_of_columns, where=neighbour_is_higher)
+    offset_to_highest += highest_column_step
+    del highest_of_three_columns, column_step, highest_z_values, highest_column_step, neighbour_is_higher
+
+    top_of_each_pixel = (flat_indices + offset_to_highest).ravel()
+    del offset_to_highest
+    while True:
+        top_of_next_pixel = top_of_each_pixel[top_of_each_pixel]
+        if np.array_equal(top_of_next_pixel, top_of_each_pixel):
+            break
+        top_of_each_pixel = top_of_next_pixel
+    grain_tops = np.flatnonzero(top_of_each_pixel == flat_indices.ravel())
+    grain_of_each_top = np.zeros(data_matrix.size, dtype=index_dtype)
+    grain_of_each_top[grain_tops] = np.arange(len(grain_tops), dtype=index_dtype)
+    grain_labels = grain_of_each_top[top_of_each_pixel].reshape(data_matrix.shape)
+    del top_of_each_pixel, top_of_next_pixel, grain_of_each_top
+
+    if minimum_prominence > 0 and len(grain_tops) > 1:
+        grain_labels, grain_tops = _MergeGrainsBelowProminence(data_matrix, grain_labels, grain_tops, minimum_prominence)
+    return grain_labels, grain_tops
+
+# Merges every grain whose top is less than minimum_prominence above the highest saddle to a higher neighbouring grain into that grain, with a union-find
+# over the saddles from highest to lowest. The saddle between two grains is the highest of the lower pixels of every pair of touching pixels across their border.
+# Returns the relabelled grain matrix and the flat index of the top of each remaining grain.
+def _MergeGrainsBelowProminence(data_matrix, grain_labels, grain_tops, minimum_prominence):
+    number_of_columns = grain_labels.shape[1]
+    flat_grain_labels = grain_labels.ravel()
+    flat_z_values = data_matrix.ravel()
+    grain_pairs = []
+    saddle_heights = []
+    for neighbour_offset in (1, number_of_columns):
+        crosses_border = flat_grain_labels[:-neighbour_offset] != flat_grain_labels[neighbour_offset:]
+        if neighbour_offset == 1:
+            crosses_border[number_of_columns - 1::number_of_columns] = False
+        first_pixels = np.flatnonzero(crosses_border)
+        second_pixels = first_pixels + neighbour_offset
+        first_grains = flat_grain_labels[first_pixels].astype(np.int64)
+        second_grains = flat_grain_labels[second_pixels].astype(np.int64)
+        grain_pairs.append(np.minimum(first_grains, second_grains)*len(grain_tops) + np.maximum(first_grains, second_grains))
+        saddle_heights.append(np.minimum(flat_z_values[first_pixels], flat_z_values[second_pixels]))
+    grain_pairs = np.concatenate(grain_pairs)
+    saddle_heights = np.concatenate(saddle_heights)
+
+    # Keep only the highest saddle of every pair of grains, and of those only the ones that can merge anything: when both grains stand at least
+    # minimum_prominence above the saddle, so does whatever they have been merged into by then.
+    pair_order = np.argsort(grain_pairs)
+    grain_pairs = grain_pairs[pair_order]
+    first_of_each_pair = np.flatnonzero(np.concatenate(([True], grain_pairs[1:] != grain_pairs[:-1])))
+    unique_pairs = grain_pairs[first_of_each_pair]
+    pair_saddle_heights = np.maximum.reduceat(saddle_heights[pair_order], first_of_each_pair)
+    top_heights = flat_z_values[grain_tops]
+    lower_grains = unique_pairs//len(grain_tops)
+    higher_grains = unique_pairs % len(grain_tops)
+    can_merge = np.minimum(top_heights[lower_grains], top_heights[higher_grains]) - pair_saddle_heights < minimum_prominence
+    highest_saddle_first = np.argsort(-pair_saddle_heights[can_merge], kind='stable')
+    lower_grains = lower_grains[can_merge][highest_saddle_first].tolist()
+    higher_grains = higher_grains[can_merge][highest_saddle_first].tolist()
+    pair_saddle_heights = pair_saddle_heights[can_merge][highest_saddle_first].tolist()
+
+    top_heights = top_heights.tolist()
+    merged_into = list(range(len(grain_tops)))
+    def FindMergedGrain(grain):
+        while merged_into[grain] != grain:
+            merged_into[grain] = merged_into[merged_into[grain]]
+            grain = merged_into[grain]
+        return grain
+    for first_grain, second_grain, saddle_height in zip(lower_grains, higher_grains, pair_saddle_heights):
+        first_grain = FindMergedGrain(first_grain)
+        second_grain = FindMergedGrain(second_grain)
+        if first_grain == second_grain:
+            continue
+        if top_heights[first_grain] > top_heights[second_grain]:
+            first_grain, second_grain = second_grain, first_grain
+        if top_heights[first_grain] - saddle_height < minimum_prominence:
+            merged_into[first_grain] = second_grain
+
+    merged_grain_of_each_grain = np.array([FindMergedGrain(each_grain) for each_grain in range(len(grain_tops))])
+    remaining_grains, new_label_of_each_grain = np.unique(merged_grain_of_each_grain, return_inverse=True)
+    return new_label_of_each_grain.astype(grain_labels.dtype)[grain_labels], grain_tops[remaining_grains]
+
+# Expected input: The unsmoothed matrix passed to SegmentGrainsByWatershed() and its output, the physical length of the image in micrometers and its pixel dimension
+# (the same as passed to ExtractDistancesBetweenRelativeMinima_GrainDiameter()), and whether to leave out grains cut off by the edge of the image, defaulted to True
+# because their area is only the part of them that was scanned.
+# Expected Output: Dictionary of arrays with one value per grain: 'area' (μm²), 'equivalent_diameter' (μm, the diameter of a circle of the same area),
+# 'maximum_height' (the measured z-value at the top of the grain) and 'area_in_pixels'.
+def MeasureSegmentedGrains(data_matrix, grain_labels, grain_tops, length_in_micrometers=6, pixel_dimension_of_image=512, exclude_edge_grains=True):
+    data_matrix = np.asarray(data_matrix)
+    area_in_pixels = np.bincount(grain_labels.ravel(), minlength=len(grain_tops))
+    maximum_height = data_matrix.ravel()[grain_tops]
+    if exclude_edge_grains:
+        edge_grains = np.unique(np.concatenate((grain_labels[0], grain_labels[-1], grain_labels[:, 0], grain_labels[:, -1])))
+        keep_grain = np.ones(len(grain_tops), dtype=bool)
+        keep_grain[edge_grains] = False
+        area_in_pixels = area_in_pixels[keep_grain]
+        maximum_height = maximum_height[keep_grain]
+    area = area_in_pixels*(length_in_micrometers/pixel_dimension_of_image)**2
+    return {'area': area, 'equivalent_diameter': 2*np.sqrt(area/np.pi), 'maximum_height': maximum_height, 'area_in_pixels': area_in_pixels}
+
+# Expected input: Output from SplitDataMatrixIntoRows(), the same length_in_micrometers and pixel_dimension_of_image as passed to
+# ExtractDistancesBetweenRelativeMinima_GrainDiameter(), and a dictionary of settings for SegmentGrainsByWatershed(), defaulted to default_segmentation_settings.
+# Expected Output: Output from MeasureSegmentedGrains(), edge grains left out.
+def ExtractGrainPropertiesBySegmentation(data, length_in_micrometers=6, pixel_dimension_of_image=512, segmentation_settings=None):
+    if segmentation_settings is None:
+        segmentation_settings = default_segmentation_settings
+    grain_labels, grain_tops = SegmentGrainsByWatershed(data, **segmentation_settings)
+    return MeasureSegmentedGrains(data, grain_labels, grain_tops, length_in_micrometers, pixel_dimension_of_image)
+
+# Expected Input: Output from ExtractGrainPropertiesBySegmentation() or MeasureSegmentedGrains()
+# Expected Output: Two floats: The average grain area for all grains in the image (μm²) and the standard deviation.
+def CalculateAverageAndStandardDeviation_GrainArea(data):
+    grain_area_summary = SummarizeStatisticsAccumulator(UpdateStatisticsAccumulator(CreateStatisticsAccumulator(), data['area']))
+    return grain_area_summary['mean'], grain_area_summary['standard_deviation']
+
+# Expected Input: Output from ExtractGrainPropertiesBySegmentation() or MeasureSegmentedGrains()
+# Expected Output: Two floats: The average equivalent diameter for all grains in the image (μm) and the standard deviation,
+# comparable with CalculateAverageAndStandardDeviation_GrainDiameter() but counting every grain once.
+def CalculateAverageAndStandardDeviation_EquivalentGrainDiameter(data):
+    grain_diameter_summary = SummarizeStatisticsAccumulator(UpdateStatisticsAccumulator(CreateStatisticsAccumulator(), data['equivalent_diameter']))
+    return grain_diameter_summary['mean'], grain_diameter_summary['standard_deviation']
+
+# Expected Input: Output from ExtractGrainPropertiesBySegmentation() or MeasureSegmentedGrains()
+# Expected Output: Two floats: The average height of the top of every grain in the image and the standard deviation.
+def CalculateAverageAndStandardDeviation_MaximumGrainHeight(data):
+    grain_height_summary = SummarizeStatisticsAccumulator(UpdateStatisticsAccumulator(CreateStatisticsAccumulator(), data['maximum_height']))
+    return grain_height_summary['mean'], grain_height_summary['standard_deviation']
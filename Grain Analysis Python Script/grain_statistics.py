@@ -0,0 +1,108 @@
+# Streaming Grain Statistics
+# This is used to calculate the mean, standard deviation, minimum, maximum, count and (optionally) quantiles of grain diameters or heights
+# one cross section (or one chunk, or one image) at a time, without ever concatenating all the values into one array.
+#
+# An accumulator is a plain dictionary, so it can be pickled, sent back from another process and merged with MergeStatisticsAccumulators().
+# Means and variances are combined with Chan et al.'s parallel form of Welford's algorithm, so merging two accumulators gives the same
+# result as feeding every value into one. All sums are kept in float64 whatever the dtype of the values fed in.
+# Quantiles come from a fixed set of histogram bins chosen up front, which keeps the memory used the same however many values go in.
+#
+# Pipeline:
+# CreateStatisticsAccumulator() -> UpdateStatisticsAccumulator() for every row/chunk/image -> MergeStatisticsAccumulators() across processes
+#                                                                                           -> SummarizeStatisticsAccumulator()
+#
+
+import numpy as np
+
+
+# Expected input: Optional bin edges for quantile estimates, for example np.linspace(0, 6, 6001) to bin grain diameters of up to 6 μm in 1 nm steps.
+# Leave as None when no quantiles are needed.
+# Expected Output: Empty accumulator dictionary for UpdateStatisticsAccumulator().
+def CreateStatisticsAccumulator(quantile_bin_edges=None):
+    accumulator = {'count': 0, 'mean': 0.0, 'sum_of_squared_differences': 0.0, 'minimum': np.inf, 'maximum': -np.inf,
+                   'quantile_bin_edges': None, 'quantile_bin_counts': None}
+    if quantile_bin_edges is not None:
+        quantile_bin_edges = np.asarray(quantile_bin_edges, dtype=np.float64)
+        if quantile_bin_edges.ndim != 1 or len(quantile_bin_edges) < 2 or np.any(np.diff(quantile_bin_edges) <= 0):
+            raise ValueError("Quantile bin edges must be a strictly increasing list of at least two values.")
+        accumulator['quantile_bin_edges'] = quantile_bin_edges
+        # One extra bin on each side counts values that fall below the first edge or above the last one.
+        accumulator['quantile_bin_counts'] = np.zeros(len(quantile_bin_edges) + 1, dtype=np.int64)
+    return accumulator
+
+# Expected input: Accumulator from CreateStatisticsAccumulator() and any array of values (one cross section, a chunk or a whole image).
+# Expected Output: The same accumulator, updated in place to include the new values. Empty arrays leave it unchanged.
+def UpdateStatisticsAccumulator(accumulator, values):
+    values = np.asarray(values).ravel()
+    number_of_new_values = len(values)
+    if number_of_new_values == 0:
+        return accumulator
+
+    mean_of_new_values = np.mean(values, dtype=np.float64)
+    sum_of_squared_differences_of_new_values = np.sum(np.square(np.subtract(values, mean_of_new_values, dtype=np.float64)))
+    combined_count = accumulator['count'] + number_of_new_values
+    difference_of_means = mean_of_new_values - accumulator['mean']
+    accumulator['mean'] = accumulator['mean'] + difference_of_means*number_of_new_values/combined_count
+    accumulator['sum_of_squared_differences'] = (accumulator['sum_of_squared_differences'] + sum_of_squared_differences_of_new_values
+                                                 + difference_of_means**2*accumulator['count']*number_of_new_values/combined_count)
+    accumulator['count'] = combined_count
+    accumulator['minimum'] = min(accumulator['minimum'], float(np.min(values)))
+    accumulator['maximum'] = max(accumulator['maximum'], float(np.max(values)))
+
+    if accumulator['quantile_bin_edges'] is not None:
+        bin_of_each_value = np.searchsorted(accumulator['quantile_bin_edges'], values, side='right')
+        accumulator['quantile_bin_counts'] += np.bincount(bin_of_each_value, minlength=len(accumulator['quantile_bin_counts']))
+    return accumulator
+
+# Expected input: Two accumulators, for example one per image or one sent back from each worker process. Quantile bins must match if used.
+# Expected Output: New accumulator holding the statistics of every value fed into either of them, neither input is changed.
+def MergeStatisticsAccumulators(first_accumulator, second_accumulator):
+    first_has_quantiles = first_accumulator['quantile_bin_edges'] is not None
+    second_has_quantiles = second_accumulator['quantile_bin_edges'] is not None
+    if first_has_quantiles != second_has_quantiles or (first_has_quantiles and not np.array_equal(first_accumulator['quantile_bin_edges'], second_accumulator['quantile_bin_edges'])):
+        raise ValueError("Only accumulators created with the same quantile bin edges can be merged.")
+
+    merged_accumulator = CreateStatisticsAccumulator(first_accumulator['quantile_bin_edges'])
+    combined_count = first_accumulator['count'] + second_accumulator['count']
+    if combined_count == 0:
+        return merged_accumulator
+    difference_of_means = second_accumulator['mean'] - first_accumulator['mean']
+    merged_accumulator['count'] = combined_count
+    merged_accumulator['mean'] = first_accumulator['mean'] + difference_of_means*second_accumulator['count']/combined_count
+    merged_accumulator['sum_of_squared_differences'] = (first_accumulator['sum_of_squared_differences'] + second_accumulator['sum_of_squared_differences']
+                                                        + difference_of_means**2*first_accumulator['count']*second_accumulator['count']/combined_count)
+    merged_accumulator['minimum'] = min(first_accumulator['minimum'], second_accumulator['minimum'])
+    merged_accumulator['maximum'] = max(first_accumulator['maximum'], second_accumulator['maximum'])
+    if first_has_quantiles:
+        merged_accumulator['quantile_bin_counts'] = first_accumulator['quantile_bin_counts'] + second_accumulator['quantile_bin_counts']
+    return merged_accumulator
+
+# Expected input: Accumulator filled by UpdateStatisticsAccumulator() and/or MergeStatisticsAccumulators(),
+# pass the quantiles wanted (between 0 and 1) if the accumulator was created with quantile bin edges.
+# Expected Output: Dictionary with 'count', 'mean', 'standard_deviation' (population, the same as np.std), 'minimum', 'maximum'
+# and 'quantiles' (a dictionary of quantile -> estimate, linearly interpolated inside the histogram bin, empty when none were asked for).
+# Every value is nan when the accumulator is still empty.
+def SummarizeStatisticsAccumulator(accumulator, quantiles=()):
+    summary = {'count': accumulator['count'], 'mean': np.nan, 'standard_deviation': np.nan, 'minimum': np.nan, 'maximum': np.nan,
+               'quantiles': {each_quantile: np.nan for each_quantile in quantiles}}
+    if accumulator['count'] == 0:
+        return summary
+    summary['mean'] = accumulator['mean']
+    summary['standard_deviation'] = np.sqrt(accumulator['sum_of_squared_differences']/accumulator['count'])
+    summary['minimum'] = accumulator['minimum']
+    summary['maximum'] = accumulator['maximum']
+
+    if len(quantiles) == 0:
+        return summary
+    if accumulator['quantile_bin_edges'] is None:
+        raise ValueError("Quantiles need an accumulator created with quantile bin edges.")
+    # The outer bins are closed off with the smallest and largest value seen so every value sits inside a finite bin.
+    bin_edges = np.concatenate(([min(accumulator['minimum'], accumulator['quantile_bin_edges'][0])], accumulator['quantile_bin_edges'],
+                                [max(accumulator['maximum'], accumulator['quantile_bin_edges'][-1])]))
+    cumulative_counts = np.concatenate(([0], np.cumsum(accumulator['quantile_bin_counts'])))
+    for each_quantile in quantiles:
+        if not 0 <= each_quantile <= 1:
+            raise ValueError("Quantiles must be between 0 and 1.")
+        quantile_estimate = np.interp(each_quantile*accumulator['count'], cumulative_counts, bin_edges)
+        summary['quantiles'][each_quantile] = float(np.clip(quantile_estimate, accumulator['minimum'], accumulator['maximum']))
+    return summary
@@ -0,0 +1,292 @@
+# Synthetic Grain Surfaces
+# This is used to make AFM-like height fields of any size and grain density, with their true grain sizes, for load testing and for checking
+# how well the grain diameters are measured. No real scan is needed and every surface is the same for the same seed.
+#
+# Two grain models:
+#   voronoi   - every pixel belongs to its nearest grain seed, found for a block of rows at a time with one KD-tree query (scipy.spatial.cKDTree).
+#               The seeds are weighted (a power diagram), so a grain with a larger radius takes more of the surface and the grain sizes follow
+#               the log-normal radius distribution. Each grain is a dome falling to 0 nm exactly on its boundary, so the relative minima of a
+#               cross section sit on the grain boundaries the way ExtractDistancesBetweenRelativeMinima_GrainDiameter() expects.
+#   gaussian  - a Gaussian bump per seed, full width at half maximum equal to the grain diameter. Each bump is added only to the pixels within four widths
+#               of its middle, as the outer product of two one dimensional Gaussians, so the cost grows with the area of the bumps and not with
+#               the area of the scan times the number of grains. The bumps reaching into a block of rows are found with one KD-tree query and summed
+#               with one sparse matrix product, there is no Python loop over the bumps.
+# The seeds sit on a square grid one mean grain diameter apart, each moved by up to "seed_jitter" of the spacing (0 for a regular grid, 1 for a random one).
+#
+# On top of the grains, AddScanArtifacts() adds a tilted plane, white noise, an offset per scan line and random jumps of the tip partway along a scan line.
+#
+# The ground truth of a surface is a dictionary of flat numpy arrays:
+#   seed_locations           - (row, column) of every grain seed in micrometers
+#   grain_heights            - peak height of every grain in nm (before the artifacts are added)
+#   grain_diameters          - voronoi: diameter of the circle with the same area as the grain, for every grain that does not touch the edge of the scan;
+#                              gaussian: the full width at half maximum of every bump. In micrometers.
+#   chord_row_offsets, chord_lengths - voronoi only: the length of every piece of a cross section between two grain boundaries in micrometers,
+#                              in the same CSR-style (compressed row) layout as grain_intermediate_store.py. These are the distances
+#                              ExtractDistancesBetweenRelativeMinima_GrainDiameter() should measure on a surface without noise, apart from the
+#                              chords only a pixel or two long (a cross section clipping the corner of a grain) that have no minimum of their own.
+#
+# Scans are written as the single line csv of peaks.py (or its binary export) named "<scan>_full.txt", with the ground truth next to them as
+# "<scan>_ground_truth.npz". WriteSyntheticGrainDataset() writes a whole set of scans and a manifest grain_batch_driver.py can run as it is.
+# Run from the command line with "python grain_synthetic_surfaces.py synthetic_scans --scans 8 --size 2048 --noise 0.3".
+#
+# Pipeline:
+# CreateGrainSeeds() -> CreateVoronoiGrainSurface() / CreateGaussianBumpSurface() -> AddScanArtifacts() -> WriteSyntheticGrainScan()
+#                    -> CalculateGroundTruthChordLengths() / CalculateGroundTruthGrainDiameters()
+#
+
+import argparse
+import csv
+import os
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+
+from grain_data_loader import WriteGwyddionExport, WriteGrainBinaryExport
+
+
+# Every setting of a synthetic surface, lengths in micrometers and heights in nm. The spreads are the standard deviation of the log of the value.
+default_synthetic_surface_settings = {
+    'grain_model': 'voronoi',
+    'mean_grain_diameter_in_micrometers': 0.1,
+    'grain_diameter_spread': 0.25,
+    'seed_jitter': 1.0,
+    'mean_grain_height_in_nanometers': 10.0,
+    'grain_height_spread': 0.2,
+    'tilt_in_nanometers_per_micrometer': [0.0, 0.0],
+    'noise_in_nanometers': 0.0,
+    'scan_line_offset_in_nanometers': 0.0,
+    'scan_line_jump_probability': 0.0,
+    'scan_line_jump_in_nanometers': 2.0,
+}
+grain_models = ['voronoi', 'gaussian']
+default_rows_per_block = 256
+default_gaussian_rows_per_block = 64
+# CreateGaussianBumpSurface() leaves out what is left of a bump this many widths (standard deviations) from its middle, the same cut off gaussian_filter() makes.
+gaussian_bump_truncate = 4.0
+
+
+# Expected input: Mean of the values, the standard deviation of their log, how many to draw and a numpy random generator.
+# Expected Output: Array of log-normal values with that mean, all equal to the mean when the spread is 0.
+def _DrawLogNormal(mean_value, spread, number_of_values, random_generator):
+    if spread <= 0:
+        return np.full(number_of_values, float(mean_value))
+    return random_generator.lognormal(np.log(mean_value) - spread**2/2, spread, number_of_values)
+
+# Expected input: Number of rows and columns of the scan, the spacing of the seeds in pixels, how far each seed may be moved as a fraction of the spacing
+# and a numpy random generator.
+# Expected Output: (number of seeds, 2) array of (row, column) seed locations in pixels. The grid reaches one spacing past every edge, so the grains
+# at the edge of the scan are cut off the way they are in a real scan.
+def CreateGrainSeeds(number_of_rows, number_of_columns, seed_spacing_in_pixels, seed_jitter, random_generator):
+    if seed_spacing_in_pixels <= 0:
+        raise ValueError("Grains must be larger than 0 pixels.")
+    seed_rows = np.arange(-seed_spacing_in_pixels, number_of_rows + seed_spacing_in_pixels, seed_spacing_in_pixels)
+    seed_columns = np.arange(-seed_spacing_in_pixels, number_of_columns + seed_spacing_in_pixels, seed_spacing_in_pixels)
+    seed_locations = np.stack(np.meshgrid(seed_rows, seed_columns, indexing='ij'), axis=-1).reshape(-1, 2)
+    return seed_locations + random_generator.uniform(-0.5, 0.5, seed_locations.shape)*seed_jitter*seed_spacing_in_pixels
+
+# Expected input: Number of rows and columns, the seed locations in pixels from CreateGrainSeeds(), the radius (pixels) and height (nm) of every grain
+# and the number of rows to work out at once.
+# Expected Output: The height matrix in nm and a matrix of the same shape holding the index of the grain (seed) every pixel belongs to.
+# A pixel belongs to the seed with the smallest power distance (distance² - radius²), found as the nearest neighbour of the seeds lifted into a third
+# dimension by sqrt(largest radius² - radius²). The height falls from the grain height in the middle to 0 where the two nearest power distances are equal.
+def CreateVoronoiGrainSurface(number_of_rows, number_of_columns, seed_locations, grain_radii, grain_heights, rows_per_block=default_rows_per_block):
+    grain_weights = grain_radii**2
+    lifted_seed_locations = np.column_stack([seed_locations, np.sqrt(grain_weights.max() - grain_weights)])
+    seed_tree = cKDTree(lifted_seed_locations)
+    number_of_neighbours = min(2, len(seed_locations))
+
+    height_matrix = np.empty((number_of_rows, number_of_columns))
+    grain_labels = np.empty((number_of_rows, number_of_columns), dtype=np.int32)
+    column_locations = np.arange(number_of_columns, dtype=float)
+    for first_row in range(0, number_of_rows, rows_per_block):
+        block_rows = np.arange(first_row, min(first_row + rows_per_block, number_of_rows), dtype=float)
+        pixel_locations = np.column_stack([np.repeat(block_rows, number_of_columns), np.tile(column_locations, len(block_rows)),
+                                           np.zeros(len(block_rows)*number_of_columns)])
+        lifted_distances, nearest_seeds = seed_tree.query(pixel_locations, k=number_of_neighbours, workers=-1)
+        lifted_distances = lifted_distances.reshape(len(pixel_locations), -1)
+        nearest_seeds = nearest_seeds.reshape(len(pixel_locations), -1)
+        # lifted distance² = power distance + largest radius², so the difference of the two is the difference of the power distances.
+        power_distance_gap = lifted_distances[:, -1]**2 - lifted_distances[:, 0]**2
+        grain_of_each_pixel = nearest_seeds[:, 0]
+        block_heights = grain_heights[grain_of_each_pixel]*(1 - np.exp(-2*power_distance_gap/np.maximum(grain_weights[grain_of_each_pixel], 1)))
+        height_matrix[first_row:first_row + len(block_rows)] = block_heights.reshape(len(block_rows), number_of_columns)
+        grain_labels[first_row:first_row + len(block_rows)] = grain_of_each_pixel.reshape(len(block_rows), number_of_columns)
+    return height_matrix, grain_labels
+
+# Expected input: Number of rows and columns, the seed locations in pixels from CreateGrainSeeds(), the diameter (full width at half maximum, pixels)
+# and height (nm) of every bump, and the number of rows to work out at once.
+# Expected Output: The height matrix in nm, the sum of every bump. The bumps are centred on the seeds exactly, not on the nearest pixel.
+# For each block of rows one KD-tree query finds the bumps whose window reaches into the block. Each bump is the outer product of a row and a column
+# Gaussian, so the block is (row Gaussians of the block x bumps) @ (bumps x column Gaussians), the column Gaussians a sparse matrix holding only the columns
+# of every window. All bumps of the block are summed by that one product, the windows are the same as adding every bump to its own square.
+def CreateGaussianBumpSurface(number_of_rows, number_of_columns, seed_locations, grain_diameters, grain_heights, rows_per_block=default_gaussian_rows_per_block):
+    bump_widths = grain_diameters/(2*np.sqrt(2*np.log(2)))
+    window_radii = np.ceil(gaussian_bump_truncate*bump_widths).astype(np.int64)
+    window_middles = np.floor(seed_locations).astype(np.int64)
+    seed_row_tree = cKDTree(seed_locations[:, :1])
+
+    height_matrix = np.empty((number_of_rows, number_of_columns))
+    for first_row in range(0, number_of_rows, rows_per_block):
+        block_rows = np.arange(first_row, min(first_row + rows_per_block, number_of_rows))
+        block_middle, block_half_height = (block_rows[0] + block_rows[-1])/2, (block_rows[-1] - block_rows[0])/2
+        nearby_bumps = np.array(seed_row_tree.query_ball_point([block_middle], block_half_height + window_radii.max() + 1), dtype=np.intp)
+        nearby_bumps = nearby_bumps[(window_middles[nearby_bumps, 0] + window_radii[nearby_bumps] >= block_rows[0])
+                                    & (window_middles[nearby_bumps, 0] - window_radii[nearby_bumps] <= block_rows[-1])]
+
+        # The column Gaussians as a CSR matrix, one row per bump holding the columns of its window.
+        first_columns = np.maximum(window_middles[nearby_bumps, 1] - window_radii[nearby_bumps], 0)
+        last_columns = np.minimum(window_middles[nearby_bumps, 1] + window_radii[nearby_bumps] + 1, number_of_columns)
+        window_row_offsets = np.zeros(len(nearby_bumps) + 1, dtype=np.int64)
+        np.cumsum(np.maximum(last_columns - first_columns, 0), out=window_row_offsets[1:])
+        bump_of_each_column = np.repeat(np.arange(len(nearby_bumps)), np.diff(window_row_offsets))
+        window_columns = first_columns[bump_of_each_column] + np.arange(window_row_offsets[-1]) - window_row_offsets[bump_of_each_column]
+        column_gaussians = np.exp(-0.5*((window_columns - seed_locations[nearby_bumps[bump_of_each_column], 1])/bump_widths[nearby_bumps[bump_of_each_column]])**2)
+        column_gaussians = csr_matrix((column_gaussians, window_columns, window_row_offsets), shape=(len(nearby_bumps), number_of_columns))
+
+        row_gaussians = grain_heights[nearby_bumps]*np.exp(-0.5*((block_rows[:, np.newaxis] - seed_locations[nearby_bumps, 0])/bump_widths[nearby_bumps])**2)
+        row_gaussians[np.abs(block_rows[:, np.newaxis] - window_middles[nearby_bumps, 0]) > window_radii[nearby_bumps]] = 0
+        height_matrix[first_row:first_row + len(block_rows)] = row_gaussians @ column_gaussians
+    return height_matrix
+
+# Expected input: Height matrix in nm (changed in place), the surface settings (see default_synthetic_surface_settings), the size of one pixel
+# in micrometers and a numpy random generator.
+# Expected Output: The same height matrix with the tilt, noise, scan line offsets and scan line jumps of the settings added.
+def AddScanArtifacts(height_matrix, surface_settings, pixel_size_in_micrometers, random_generator):
+    number_of_rows, number_of_columns = height_matrix.shape
+    tilt_across, tilt_down = surface_settings['tilt_in_nanometers_per_micrometer']
+    if tilt_across or tilt_down:
+        height_matrix += (np.arange(number_of_columns)*tilt_across*pixel_size_in_micrometers)[np.newaxis, :]
+        height_matrix += (np.arange(number_of_rows)*tilt_down*pixel_size_in_micrometers)[:, np.newaxis]
+    if surface_settings['noise_in_nanometers'] > 0:
+        for first_row in range(0, number_of_rows, default_rows_per_block):
+            block_of_rows = height_matrix[first_row:first_row + default_rows_per_block]
+            block_of_rows += random_generator.normal(0, surface_settings['noise_in_nanometers'], block_of_rows.shape)
+    if surface_settings['scan_line_offset_in_nanometers'] > 0:
+        height_matrix += random_generator.normal(0, surface_settings['scan_line_offset_in_nanometers'], (number_of_rows, 1))
+    if surface_settings['scan_line_jump_probability'] > 0:
+        rows_with_a_jump = np.flatnonzero(random_generator.random(number_of_rows) < surface_settings['scan_line_jump_probability'])
+        column_of_each_jump = random_generator.integers(0, number_of_columns, len(rows_with_a_jump))
+        size_of_each_jump = random_generator.choice([-1.0, 1.0], len(rows_with_a_jump))*surface_settings['scan_line_jump_in_nanometers']
+        for each_row, each_column, each_jump in zip(rows_with_a_jump, column_of_each_jump, size_of_each_jump):
+            height_matrix[each_row, each_column:] += each_jump
+    return height_matrix
+
+# Expected input: Grain label matrix from CreateVoronoiGrainSurface() and the size of one pixel in micrometers.
+# Expected Output: Row offsets and chord lengths (micrometers) in the CSR-style layout, the distance between every two neighbouring grain boundaries
+# of each cross section. A boundary lies halfway between the last pixel of one grain and the first pixel of the next; the pieces cut off by the
+# edge of the scan are left out, the same way the distances before the first and after the last minimum are never measured.
+def CalculateGroundTruthChordLengths(grain_labels, pixel_size_in_micrometers):
+    row_of_each_boundary, column_of_each_boundary = np.nonzero(grain_labels[:, 1:] != grain_labels[:, :-1])
+    # Neighbouring boundaries of the same row make a chord, the last boundary of a row and the first of the next do not.
+    is_chord = row_of_each_boundary[1:] == row_of_each_boundary[:-1]
+    chord_lengths = np.diff(column_of_each_boundary)[is_chord]*pixel_size_in_micrometers
+    boundaries_of_each_row = np.bincount(row_of_each_boundary, minlength=grain_labels.shape[0])
+    chord_row_offsets = np.concatenate([[0], np.cumsum(np.maximum(boundaries_of_each_row - 1, 0))])
+    return chord_row_offsets, chord_lengths
+
+# Expected input: Grain label matrix from CreateVoronoiGrainSurface() and the size of one pixel in micrometers.
+# Expected Output: Diameter (micrometers) of the circle with the same area as each grain that lies fully inside the scan, in grain index order.
+def CalculateGroundTruthGrainDiameters(grain_labels, pixel_size_in_micrometers):
+    area_of_each_grain = np.bincount(grain_labels.ravel())
+    grains_on_the_edge = np.unique(np.concatenate([grain_labels[0], grain_labels[-1], grain_labels[:, 0], grain_labels[:, -1]]))
+    area_of_each_grain[grains_on_the_edge] = 0
+    return 2*np.sqrt(area_of_each_grain[area_of_each_grain > 0]/np.pi)*pixel_size_in_micrometers
+
+# Expected input: Pixel dimension of the square scan, its physical length in micrometers, the surface settings (missing keys are taken from
+# default_synthetic_surface_settings), a seed (or np.random.SeedSequence) and the number of rows to work out at once.
+# Expected Output: The height matrix in nm, (pixel_dimension_of_image-1) x pixel_dimension_of_image the same way the Pygwy script exports a scan,
+# and its ground truth dictionary (see the top of this file).
+def CreateSyntheticGrainSurface(pixel_dimension_of_image=512, length_in_micrometers=6, surface_settings=None, seed=0, rows_per_block=default_rows_per_block):
+    surface_settings = dict(default_synthetic_surface_settings, **(surface_settings or {}))
+    if surface_settings['grain_model'] not in grain_models:
+        raise ValueError("Grain model must be one of {}.".format(", ".join(grain_models)))
+    random_generator = np.random.default_rng(seed)
+    pixel_size_in_micrometers = length_in_micrometers/pixel_dimension_of_image
+    number_of_rows, number_of_columns = pixel_dimension_of_image - 1, pixel_dimension_of_image
+
+    mean_grain_diameter_in_pixels = surface_settings['mean_grain_diameter_in_micrometers']/pixel_size_in_micrometers
+    seed_locations = CreateGrainSeeds(number_of_rows, number_of_columns, mean_grain_diameter_in_pixels, surface_settings['seed_jitter'], random_generator)
+    grain_diameters = _DrawLogNormal(mean_grain_diameter_in_pixels, surface_settings['grain_diameter_spread'], len(seed_locations), random_generator)
+    grain_heights = _DrawLogNormal(surface_settings['mean_grain_height_in_nanometers'], surface_settings['grain_height_spread'], len(seed_locations), random_generator)
+
+    ground_truth = {'grain_model': surface_settings['grain_model'], 'seed_locations': seed_locations*pixel_size_in_micrometers, 'grain_heights': grain_heights}
+    if surface_settings['grain_model'] == 'voronoi':
+        height_matrix, grain_labels = CreateVoronoiGrainSurface(number_of_rows, number_of_columns, seed_locations, grain_diameters/2, grain_heights, rows_per_block)
+        ground_truth['grain_diameters'] = CalculateGroundTruthGrainDiameters(grain_labels, pixel_size_in_micrometers)
+        ground_truth['chord_row_offsets'], ground_truth['chord_lengths'] = CalculateGroundTruthChordLengths(grain_labels, pixel_size_in_micrometers)
+        del grain_labels
+    else:
+        height_matrix = CreateGaussianBumpSurface(number_of_rows, number_of_columns, seed_locations, grain_diameters, grain_heights)
+        ground_truth['grain_diameters'] = grain_diameters*pixel_size_in_micrometers
+    AddScanArtifacts(height_matrix, surface_settings, pixel_size_in_micrometers, random_generator)
+    return height_matrix, ground_truth
+
+# Expected input: Folder to write to (made if needed), the name of the scan, the height matrix and ground truth from CreateSyntheticGrainSurface(),
+# the physical length of the scan in micrometers and "csv" or "binary".
+# Expected Output: Path of the scan written, "<scan>_full.txt" (csv) or "<scan>_full.gwyg" (binary), with "<scan>_ground_truth.npz" next to it.
+def WriteSyntheticGrainScan(output_folder, scan_name, height_matrix, ground_truth, length_in_micrometers=6, export_format='csv'):
+    os.makedirs(output_folder, exist_ok=True)
+    if export_format == 'csv':
+        scan_path = os.path.join(output_folder, "{}_full.txt".format(scan_name))
+        WriteGwyddionExport(scan_path, height_matrix)
+    elif export_format == 'binary':
+        scan_path = os.path.join(output_folder, "{}_full.gwyg".format(scan_name))
+        WriteGrainBinaryExport(scan_path, height_matrix, length_in_micrometers, dtype=np.float64)
+    else:
+        raise ValueError("Export format must be \"csv\" or \"binary\".")
+    np.savez(os.path.join(output_folder, "{}_ground_truth.npz".format(scan_name)), **ground_truth)
+    return scan_path
+
+# Expected input: Path of a "<scan>_ground_truth.npz" written by WriteSyntheticGrainScan().
+# Expected Output: The ground truth dictionary, the same keys CreateSyntheticGrainSurface() gives.
+def LoadSyntheticGroundTruth(ground_truth_path):
+    with np.load(ground_truth_path) as ground_truth_file:
+        return {key: (ground_truth_file[key].item() if ground_truth_file[key].ndim == 0 else ground_truth_file[key]) for key in ground_truth_file.files}
+
+# Expected input: Folder to write to, the number of scans, their pixel dimension and length in micrometers, the surface settings, a seed and
+# "csv" or "binary".
+# Expected Output: Path of the manifest written to the folder, synthetic_manifest.csv, listing every scan as molecule "synthetic" at times 1, 2, 3, ...
+# with its pixel dimension and length, ready for grain_batch_driver.py. Every scan has its own random stream spawned from the seed.
+def WriteSyntheticGrainDataset(output_folder, number_of_scans=4, pixel_dimension_of_image=512, length_in_micrometers=6, surface_settings=None, seed=0, export_format='csv'):
+    os.makedirs(output_folder, exist_ok=True)
+    manifest_path = os.path.join(output_folder, "synthetic_manifest.csv")
+    with open(manifest_path, 'w', newline='') as manifest_file:
+        manifest_writer = csv.writer(manifest_file)
+        manifest_writer.writerow(['molecule', 'time_in_minutes', 'file_path', 'pixel_dimension_of_image', 'length_in_micrometers'])
+        for scan_index, each_seed in enumerate(np.random.SeedSequence(seed).spawn(number_of_scans), start=1):
+            height_matrix, ground_truth = CreateSyntheticGrainSurface(pixel_dimension_of_image, length_in_micrometers, surface_settings, each_seed)
+            scan_path = WriteSyntheticGrainScan(output_folder, "synthetic_{}".format(scan_index), height_matrix, ground_truth, length_in_micrometers, export_format)
+            manifest_writer.writerow(['synthetic', scan_index, os.path.basename(scan_path), pixel_dimension_of_image, length_in_micrometers])
+    return manifest_path
+
+
+if __name__ == '__main__':
+    argument_parser = argparse.ArgumentParser(description="Write synthetic AFM grain scans with their ground truth and a manifest.")
+    argument_parser.add_argument('output_folder', help="folder the scans, ground truth and synthetic_manifest.csv are written to")
+    argument_parser.add_argument('--scans', type=int, default=4, help="number of scans (default 4)")
+    argument_parser.add_argument('--size', type=int, default=512, help="pixel dimension of every scan (default 512)")
+    argument_parser.add_argument('--length', type=float, default=6, help="physical length of every scan in micrometers (default 6)")
+    argument_parser.add_argument('--model', choices=grain_models, default=default_synthetic_surface_settings['grain_model'], help="grain model (default voronoi)")
+    argument_parser.add_argument('--diameter', type=float, default=default_synthetic_surface_settings['mean_grain_diameter_in_micrometers'],
+                                 help="mean grain diameter in micrometers (default 0.1)")
+    argument_parser.add_argument('--diameter-spread', type=float, default=default_synthetic_surface_settings['grain_diameter_spread'],
+                                 help="standard deviation of the log of the grain diameters (default 0.25)")
+    argument_parser.add_argument('--jitter', type=float, default=default_synthetic_surface_settings['seed_jitter'], help="seed jitter, 0 for a regular grid (default 1)")
+    argument_parser.add_argument('--height', type=float, default=default_synthetic_surface_settings['mean_grain_height_in_nanometers'], help="mean grain height in nm (default 10)")
+    argument_parser.add_argument('--tilt', type=float, nargs=2, default=default_synthetic_surface_settings['tilt_in_nanometers_per_micrometer'], metavar=('ACROSS', 'DOWN'),
+                                 help="tilt of the surface in nm per micrometer (default 0 0)")
+    argument_parser.add_argument('--noise', type=float, default=default_synthetic_surface_settings['noise_in_nanometers'], help="white noise in nm (default 0)")
+    argument_parser.add_argument('--scan-line-offset', type=float, default=default_synthetic_surface_settings['scan_line_offset_in_nanometers'],
+                                 help="standard deviation of the offset of every scan line in nm (default 0)")
+    argument_parser.add_argument('--jump-probability', type=float, default=default_synthetic_surface_settings['scan_line_jump_probability'],
+                                 help="chance of every scan line to have a tip jump (default 0)")
+    argument_parser.add_argument('--format', choices=['csv', 'binary'], default='csv', help="export format (default csv)")
+    argument_parser.add_argument('--seed', type=int, default=0, help="random seed (default 0)")
+    arguments = argument_parser.parse_args()
+
+    surface_settings = {'grain_model': arguments.model, 'mean_grain_diameter_in_micrometers': arguments.diameter, 'grain_diameter_spread': arguments.diameter_spread,
+                        'seed_jitter': arguments.jitter, 'mean_grain_height_in_nanometers': arguments.height, 'tilt_in_nanometers_per_micrometer': arguments.tilt,
+                        'noise_in_nanometers': arguments.noise, 'scan_line_offset_in_nanometers': arguments.scan_line_offset,
+                        'scan_line_jump_probability': arguments.jump_probability}
+    manifest_path = WriteSyntheticGrainDataset(arguments.output_folder, arguments.scans, arguments.size, arguments.length, surface_settings, arguments.seed, arguments.format)
+    print("Success! {} synthetic scans written, manifest at {}.".format(arguments.scans, manifest_path))
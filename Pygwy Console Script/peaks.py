@@ -8,15 +8,46 @@
 # 4.) Change the "destination" variable to the file path where you want your raw data csv, and give the output file a name by adding/replacing the last cell of the path
 # 5.) Change the "image_pixel_size" variable to the pixel length of your image
 # 6.) Your "scaling_factor" variable should be an integer that will be placed in as "x" to a 10^x clause, the points extracted by Gwyddion will be in meters by default. Scale them up to micrometers (x10^6) or nanometers (x10^9) by scaling them up accordingly.  
-# 7.) Run the script 
+# 7.) Leave "export_mode" as "bulk" to copy the whole data field out in one call (seconds, even for a 2048x2048 scan), or set it to "profile" to extract one
+#     cross section at a time with get_profile() the way this script always has. Both write the same rows in the same order.
+# 8.) Leave "export_format" as "csv" for the single comma separated row the analysis has always read, or set it to "binary" to write raw little-endian floats
+#     ("binary_precision" of "float32" or "float64") behind a small header holding the rows, columns, physical size, units and scaling factor.
+#     A float32 binary export is under a quarter of the size of the csv, loads with no parsing at all, and the analysis reads the pixel dimension and length from its header.
+# 9.) Run the script 
 # 
+# Batch mode (exports many scans in one run instead of one open scan at a time):
+# - Set "batch_mode" to "open_channels" to export every channel of every file open in Gwyddion, or to "directory" to load every .gwy/.spm file
+#   (see "batch_file_extensions") in "batch_source_directory" and export every channel in it. "destination" and "image_pixel_size" are not used,
+#   each channel is written to "batch_destination_folder" at its own pixel size, named <file>_<channel id>_<channel title>_full.txt (or .gwyg).
+#   When that name is already taken in the same run (two untitled images, same-named files from different folders, scan.gwy and scan.spm) a number
+#   is added before "_full", e.g. scan_0_Height_2_full.txt. A channel that is not square is cropped to its top left square, a message is printed and the
+#   index keeps its full x_resolution and y_resolution.
+# - Set "batch_level_images" to True to have every channel plane leveled and its zero fixed before it is exported, instead of doing step 2 by hand.
+#   In "open_channels" mode this changes the open images.
+# - An index of everything exported is written next to the exports as batch_index_manifest.csv. It has the columns the grain analysis batch driver reads,
+#   fill in the molecule and time_in_minutes of each line and pass it to grain_batch_driver.py. grain_incremental.py watching the destination folder
+#   picks every filled in line up by itself, batch exports are never matched by file name because their names hold no molecule or time.
 #
 
+import array
 import csv
+import json
+import os
+import struct
+import sys
 
 destination = "C:\Users\lemle\gwyddion_scripts\gwy_data\output.txt"
 image_pixel_size = 512
 scaling_factor = 9
+export_mode = "bulk"
+export_format = "csv"
+binary_precision = "float32"
+
+batch_mode = "off"
+batch_source_directory = "C:\Users\lemle\gwyddion_scripts\gwy_scans"
+batch_destination_folder = "C:\Users\lemle\gwyddion_scripts\gwy_data"
+batch_file_extensions = [".gwy", ".spm"]
+batch_level_images = False
 
 
 def get_cross_sectional_data(destination,image_pixel_size,scaling_factor):
@@ -33,20 +64,197 @@ def get_cross_sectional_data(destination,image_pixel_size,scaling_factor):
 		image_pixel_size = image_pixel_size
 		scaling_factor = scaling_factor
 
+	export_data_field(active_image,destination,image_pixel_size,scaling_factor)
+
+
+# Extracts the cross sections of one data field the way "export_mode" asks for and writes them to destination in "export_format".
+def export_data_field(active_image,destination,image_pixel_size,scaling_factor):
+	if export_mode == "bulk":
+		output = get_full_field_data(active_image,image_pixel_size,scaling_factor)
+	elif export_mode == "profile":
+		output = get_profile_data(active_image,image_pixel_size,scaling_factor)
+	else:
+		raise ValueError("Export mode must be \"bulk\" or \"profile\".")
+
+	if export_format == "csv":
+		with open(destination,'w') as data_file:
+			data_writer = csv.writer(data_file, delimiter=',')
+			data_writer.writerow(output)
+	elif export_format == "binary":
+		write_binary_export(destination,output,active_image,image_pixel_size,scaling_factor)
+	else:
+		raise ValueError("Export format must be \"csv\" or \"binary\".")
+	print("Success! Your raw csv is located at {} with {} cross sections extracted!".format(destination,image_pixel_size))
+
+
+# Extracts rows 1 to image_pixel_size-1 one horizontal profile at a time, scaling every z-value as it is appended.
+def get_profile_data(active_image,image_pixel_size,scaling_factor):
+	scale = 10**scaling_factor
 	image_pixel_length = range(1,image_pixel_size,1)
 	output = []
 
 	for each_row_of_pixels in image_pixel_length:
 		extracted_profile = active_image.get_profile(0,each_row_of_pixels,image_pixel_size-1,each_row_of_pixels,-1,1,interpolation=INTERPOLATION_LINEAR)
 		z_values = extracted_profile.get_data()
-		for each_z_value in z_values:
-			output.append(each_z_value*(10**scaling_factor))
+		output.extend([each_z_value*scale for each_z_value in z_values])
+	return output
 
-	with open(destination,'w') as data_file:
-		data_writer = csv.writer(data_file, delimiter=',')
-		data_writer.writerow(output)
-	print("Success! Your raw csv is located at {} with {} cross sections extracted!".format(destination,image_pixel_size))
+
+# Copies the whole data field out in one get_data() call after scaling it in one multiply() call on a duplicate, so the open image is left untouched.
+# get_data() returns the field row after row, the same order the profiles are appended in, so only the rows the profile mode skips are cut off:
+# the first row, and any rows/columns past image_pixel_size.
+def get_full_field_data(active_image,image_pixel_size,scaling_factor):
+	if active_image.get_xres() < image_pixel_size or active_image.get_yres() < image_pixel_size:
+		raise ValueError("Image pixel size is larger than the {}x{} image.".format(active_image.get_xres(),active_image.get_yres()))
+
+	scaled_image = active_image.duplicate()
+	scaled_image.multiply(10**scaling_factor)
+	z_values = scaled_image.get_data()
+
+	x_resolution = active_image.get_xres()
+	if x_resolution == image_pixel_size:
+		return z_values[image_pixel_size:image_pixel_size*image_pixel_size]
+	output = []
+	for each_row_of_pixels in range(1,image_pixel_size,1):
+		output.extend(z_values[each_row_of_pixels*x_resolution:each_row_of_pixels*x_resolution+image_pixel_size])
+	return output
+
+
+# Writes the exported z-values as raw little-endian floats behind a header (layout described at the top of grain_data_loader.py):
+# the text GWYGRAIN, the header length as a 4 byte little-endian unsigned integer, the JSON header padded with spaces so the z-values start
+# on a 16 byte boundary, then the z-values row after row.
+def write_binary_export(destination,output,active_image,image_pixel_size,scaling_factor):
+	if binary_precision == "float32":
+		typecode, dtype = 'f', "<f4"
+	elif binary_precision == "float64":
+		typecode, dtype = 'd', "<f8"
+	else:
+		raise ValueError("Binary precision must be \"float32\" or \"float64\".")
+
+	z_values = array.array(typecode, output)
+	if sys.byteorder != 'little':
+		z_values.byteswap()
+
+	number_of_rows = len(output)//image_pixel_size
+	header = {
+		"format_version": 1,
+		"rows": number_of_rows,
+		"columns": image_pixel_size,
+		"dtype": dtype,
+		"physical_width": active_image.get_xreal()*image_pixel_size/active_image.get_xres(),
+		"physical_height": active_image.get_yreal()*number_of_rows/active_image.get_yres(),
+		"xy_unit": active_image.get_si_unit_xy().get_unit_string(),
+		"z_unit": active_image.get_si_unit_z().get_unit_string(),
+		"z_scaling_exponent": scaling_factor,
+	}
+	header_text = json.dumps(header, sort_keys=True)
+	header_text = header_text + " "*(-(12 + len(header_text)) % 16)
+
+	with open(destination,'wb') as data_file:
+		data_file.write(b"GWYGRAIN")
+		data_file.write(struct.pack('<I', len(header_text)))
+		data_file.write(header_text.encode('ascii'))
+		z_values.tofile(data_file)
+
+
+# Exports every channel of one Gwyddion container (an open or loaded file) to destination_folder, leveling it first if "batch_level_images" is set.
+# "used_output_names" is the set of names already written in this batch, shared by every container: a name that is taken (two untitled containers,
+# same-named files from different folders, scan.gwy next to scan.spm) gets a number added before "_full" instead of overwriting the first export.
+# A channel that is not square is cropped to its top left min(xres, yres) square, this is printed and its full resolution is kept in the index.
+# Returns one index manifest line per exported channel.
+def export_all_channels_of_container(container,destination_folder,scaling_factor,used_output_names,source_path=None):
+	if source_path is None:
+		if container.contains_by_name("/filename"):
+			source_path = container.get_string_by_name("/filename")
+		else:
+			source_path = "untitled"
+	source_name = os.path.splitext(os.path.basename(source_path))[0]
+	extension = ".gwyg" if export_format == "binary" else ".txt"
+
+	index_entries = []
+	for each_channel_id in gwy.gwy_app_data_browser_get_data_ids(container):
+		if batch_level_images:
+			gwy.gwy_app_data_browser_select_data_field(container,each_channel_id)
+			gwy.gwy_process_func_run("level",container,gwy.RUN_IMMEDIATE)
+			gwy.gwy_process_func_run("fix_zero",container,gwy.RUN_IMMEDIATE)
+
+		data_field = container[gwy.gwy_app_get_data_key_for_id(each_channel_id)]
+		channel_title = gwy.gwy_app_get_data_field_title(container,each_channel_id)
+		safe_channel_title = "".join([each_character if each_character.isalnum() else "_" for each_character in channel_title])
+		image_pixel_size = min(data_field.get_xres(),data_field.get_yres())
+		output_stem = "{}_{}_{}".format(source_name,each_channel_id,safe_channel_title)
+		output_name = "{}_full{}".format(output_stem,extension)
+		duplicate_number = 1
+		while output_name.lower() in used_output_names:
+			duplicate_number += 1
+			output_name = "{}_{}_full{}".format(output_stem,duplicate_number,extension)
+		used_output_names.add(output_name.lower())
+		if data_field.get_xres() != data_field.get_yres():
+			print("Channel {} ({}) of {} is {}x{}, only its top left {}x{} square is exported to {}.".format(each_channel_id,channel_title,source_path,
+				data_field.get_xres(),data_field.get_yres(),image_pixel_size,image_pixel_size,output_name))
+
+		export_data_field(data_field,os.path.join(destination_folder,output_name),image_pixel_size,scaling_factor)
+
+		if data_field.get_si_unit_xy().get_unit_string() == "m":
+			length_in_micrometers = data_field.get_xreal()*image_pixel_size/data_field.get_xres()*10**6
+		else:
+			length_in_micrometers = ""
+		index_entries.append({"molecule": "", "time_in_minutes": "", "file_path": output_name, "pixel_dimension_of_image": image_pixel_size,
+			"length_in_micrometers": length_in_micrometers, "source_file": source_path, "channel_id": each_channel_id, "channel_title": channel_title,
+			"x_resolution": data_field.get_xres(), "y_resolution": data_field.get_yres()})
+	return index_entries
+
+
+# Writes the index of a batch export to batch_index_manifest.csv in destination_folder.
+# The csv module of Python 2.7 (pygwy) needs the file opened in binary mode, in text mode Windows puts a blank line after every row.
+def write_index_manifest(destination_folder,index_entries):
+	index_columns = ["molecule","time_in_minutes","file_path","pixel_dimension_of_image","length_in_micrometers","source_file","channel_id","channel_title",
+		"x_resolution","y_resolution"]
+	index_path = os.path.join(destination_folder,"batch_index_manifest.csv")
+	with open(index_path,'wb') as index_file:
+		index_writer = csv.DictWriter(index_file,fieldnames=index_columns)
+		index_writer.writeheader()
+		for each_entry in index_entries:
+			index_writer.writerow(each_entry)
+	print("Success! {} channels exported, the index is located at {}".format(len(index_entries),index_path))
+
+
+# Batch mode "open_channels": every channel of every file open in Gwyddion.
+def export_all_open_channels(destination_folder,scaling_factor):
+	index_entries = []
+	used_output_names = set()
+	for each_container in gwy.gwy_app_data_browser_get_containers():
+		index_entries.extend(export_all_channels_of_container(each_container,destination_folder,scaling_factor,used_output_names))
+	write_index_manifest(destination_folder,index_entries)
+
+
+# Batch mode "directory": every file in source_directory with one of the "batch_file_extensions", loaded through Gwyddion one at a time.
+# Each file is added to the data browser while it is exported (so the leveling functions can run on it) and removed again afterwards.
+def export_all_files_in_directory(source_directory,destination_folder,scaling_factor):
+	index_entries = []
+	used_output_names = set()
+	for each_file_name in sorted(os.listdir(source_directory)):
+		if os.path.splitext(each_file_name)[1].lower() not in batch_file_extensions:
+			continue
+		source_path = os.path.join(source_directory,each_file_name)
+		container = gwy.gwy_file_load(source_path,gwy.RUN_NONINTERACTIVE)
+		if container is None:
+			print("Skipping {}, Gwyddion could not load it.".format(source_path))
+			continue
+		gwy.gwy_app_data_browser_add(container)
+		try:
+			index_entries.extend(export_all_channels_of_container(container,destination_folder,scaling_factor,used_output_names,source_path))
+		finally:
+			gwy.gwy_app_data_browser_remove(container)
+	write_index_manifest(destination_folder,index_entries)
 
 
-get_cross_sectional_data(destination=destination, image_pixel_size=image_pixel_size, scaling_factor=scaling_factor)
+if batch_mode == "off":
+	get_cross_sectional_data(destination=destination, image_pixel_size=image_pixel_size, scaling_factor=scaling_factor)
+elif batch_mode == "open_channels":
+	export_all_open_channels(batch_destination_folder,scaling_factor)
+elif batch_mode == "directory":
+	export_all_files_in_directory(batch_source_directory,batch_destination_folder,scaling_factor)
+else:
+	raise ValueError("Batch mode must be \"off\", \"open_channels\" or \"directory\".")
 